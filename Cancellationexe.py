@@ -1,12 +1,20 @@
 import os
-import pandas as pd
-from datetime import datetime
-import pdfplumber
-from openpyxl import load_workbook, Workbook
 import customtkinter as ctk
-from tkinter import messagebox, scrolledtext
+from tkinter import ttk, messagebox
 import threading
 import traceback
+import multiprocessing
+from reportprocessor.registry import LazyModule
+from reportprocessor.logs import LogSink
+
+# Engine (pandas, pdfplumber) loads when processing starts, not when the screen opens
+cancellation = LazyModule("reportprocessor.cancellation")
+tableview = LazyModule("reportprocessor.tableview")
+
+# Data preview: Treeview row height (px) and the filter menu's "search everywhere" entry
+PREVIEW_ROW_HEIGHT = 22
+PREVIEW_HEADING_HEIGHT = 26
+ALL_COLUMNS = "All columns"
 
 class CancellationReportModule:
     def __init__(self, parent_frame=None, back_callback=None, root_window=None):
@@ -14,15 +22,24 @@ class CancellationReportModule:
         self.back_callback = back_callback
         self.root_window = root_window  # Reference to main window for threading
         
-        # Data storage
-        self.combined_df = pd.DataFrame()
+        # Data storage (None until reports are processed)
+        self.combined_df = None
         self.processing = False
         
+        # Preview state: TableView over combined_df, first row on screen, rows that fit
+        self.preview = None
+        self.preview_top = 0
+        self.preview_rows = 20
+        
         # Directory setup
         self.setup_directories()
         
+        # Status messages go through the sink; the label shows the newest one on each UI tick
+        self.sink = LogSink("cancellation")
+        
         # Create GUI
         self.create_gui()
+        self.sink.attach(self.status_label, lambda lines: self.status_label.configure(text=lines[-1]))
         
     def setup_directories(self):
         """Setup directory paths"""
@@ -31,6 +48,7 @@ class CancellationReportModule:
         self.cancel_dir = os.path.join(self.input_dir, 'CancellationReport')
         self.pickup_dir = os.path.join(self.input_dir, 'PickupReportfiles')
         self.output_file_path = os.path.join(self.base_dir, 'OutputDIR', 'Cancel_product_report.xlsx')
+        self.cache_dir = os.path.join(self.base_dir, 'Cache')  # Parsed Manifest.pdf rows, shared with the Pickup module
         
         # Create directories
         os.makedirs(self.cancel_dir, exist_ok=True)
@@ -230,19 +248,141 @@ class CancellationReportModule:
         )
         data_label.pack(pady=(30, 20))
         
-        # Data text widget
-        self.data_text = ctk.CTkTextbox(
-            right_panel,
-            font=ctk.CTkFont(family="Courier", size=10),
-            fg_color="#f8f9fa",
-            text_color="#495057",
-            corner_radius=8,
-            wrap="none"
-        )
-        self.data_text.pack(fill="both", expand=True, padx=30, pady=(0, 30))
+        # Data preview
+        self.create_preview(right_panel)
         
         # Initial message
-        self.data_text.insert("1.0", "No data processed yet. Click 'Process Reports' to begin.")
+        self.show_preview_message("No data processed yet. Click 'Process Reports' to begin.")
+    
+    def create_preview(self, parent):
+        """Create the data preview: filter bar, table and row counter"""
+        filter_frame = ctk.CTkFrame(parent, fg_color="transparent")
+        filter_frame.pack(fill="x", padx=30, pady=(0, 10))
+        
+        self.filter_entry = ctk.CTkEntry(filter_frame, placeholder_text="Filter rows...", width=260)
+        self.filter_entry.pack(side="left")
+        self.filter_entry.bind("<Return>", lambda event: self.apply_filter())
+        
+        self.filter_column_menu = ctk.CTkOptionMenu(
+            filter_frame,
+            values=[ALL_COLUMNS],
+            width=180,
+            fg_color="#6c757d",
+            button_color="#545b62",
+            command=lambda value: self.apply_filter()
+        )
+        self.filter_column_menu.pack(side="left", padx=(10, 0))
+        
+        for text, command in (("Filter", self.apply_filter), ("Clear", self.clear_filter)):
+            ctk.CTkButton(
+                filter_frame,
+                text=text,
+                font=ctk.CTkFont(size=12),
+                fg_color="#6c757d",
+                hover_color="#545b62",
+                text_color="white",
+                corner_radius=6,
+                height=28,
+                width=70,
+                command=command
+            ).pack(side="left", padx=(10, 0))
+        
+        # Only the rows on screen exist as Treeview items; the scrollbar drives preview_top
+        table_frame = ctk.CTkFrame(parent, fg_color="#f8f9fa", corner_radius=8)
+        table_frame.pack(fill="both", expand=True, padx=30)
+        
+        ttk.Style().configure("Preview.Treeview", rowheight=PREVIEW_ROW_HEIGHT)
+        self.preview_tree = ttk.Treeview(table_frame, show="headings", selectmode="browse", style="Preview.Treeview")
+        self.preview_scroll = ttk.Scrollbar(table_frame, orient="vertical", command=self.scroll_preview)
+        self.preview_scroll.pack(side="right", fill="y")
+        self.preview_tree.pack(side="left", fill="both", expand=True)
+        
+        self.preview_tree.bind("<Configure>", self.on_preview_resize)
+        self.preview_tree.bind("<MouseWheel>", lambda event: self.scroll_preview("scroll", -3 if event.delta > 0 else 3, "units"))
+        self.preview_tree.bind("<Button-4>", lambda event: self.scroll_preview("scroll", -3, "units"))
+        self.preview_tree.bind("<Button-5>", lambda event: self.scroll_preview("scroll", 3, "units"))
+        self.preview_tree.bind("<Prior>", lambda event: self.scroll_preview("scroll", -1, "pages"))
+        self.preview_tree.bind("<Next>", lambda event: self.scroll_preview("scroll", 1, "pages"))
+        
+        self.preview_label = ctk.CTkLabel(
+            parent,
+            text="",
+            font=ctk.CTkFont(size=12),
+            text_color="#6c757d"
+        )
+        self.preview_label.pack(pady=(5, 25))
+    
+    def show_preview_message(self, message):
+        """Empty the preview and show message under it"""
+        self.preview = None
+        self.preview_tree.delete(*self.preview_tree.get_children())
+        self.preview_tree.configure(columns=())
+        self.preview_scroll.set(0, 1)
+        self.preview_label.configure(text=message)
+    
+    def show_preview_rows(self, top):
+        """Fill the table with the rows of the view starting at top"""
+        if self.preview is None:
+            return
+        total = len(self.preview)
+        self.preview_top = max(0, min(top, total - self.preview_rows))
+        
+        self.preview_tree.delete(*self.preview_tree.get_children())
+        for values in self.preview.rows(self.preview_top, self.preview_rows):
+            self.preview_tree.insert("", "end", values=values)
+        
+        if total:
+            self.preview_scroll.set(self.preview_top / total, min(1.0, (self.preview_top + self.preview_rows) / total))
+            shown = f"Rows {self.preview_top + 1:,}-{min(total, self.preview_top + self.preview_rows):,} of {total:,}"
+        else:
+            self.preview_scroll.set(0, 1)
+            shown = "No rows match the filter"
+        if total != self.preview.total:
+            shown += f" (filtered from {self.preview.total:,})"
+        self.preview_label.configure(text=shown)
+    
+    def scroll_preview(self, action, amount, unit=None):
+        """Scrollbar command: ("moveto", fraction) or ("scroll", count, "units"/"pages")"""
+        if self.preview is None:
+            return
+        if action == "moveto":
+            top = int(float(amount) * len(self.preview))
+        else:
+            step = self.preview_rows if unit == "pages" else 1
+            top = self.preview_top + int(amount) * step
+        self.show_preview_rows(top)
+    
+    def on_preview_resize(self, event):
+        """Re-render when the number of rows that fit changes"""
+        rows = max(1, (event.height - PREVIEW_HEADING_HEIGHT) // PREVIEW_ROW_HEIGHT)
+        if rows != self.preview_rows:
+            self.preview_rows = rows
+            self.show_preview_rows(self.preview_top)
+    
+    def sort_preview(self, column):
+        """Sort on column (again to reverse) and go back to the first row"""
+        if self.preview is None:
+            return
+        self.preview.sort_by(column)
+        for name in self.preview.columns:
+            arrow = ""
+            if name == self.preview.sort_column:
+                arrow = " ▲" if self.preview.ascending else " ▼"
+            self.preview_tree.heading(str(name), text=f"{name}{arrow}")
+        self.show_preview_rows(0)
+    
+    def apply_filter(self):
+        """Filter the preview on the entry's text in the chosen column"""
+        if self.preview is None:
+            return
+        column = self.filter_column_menu.get()
+        self.preview.set_filter(self.filter_entry.get(), None if column == ALL_COLUMNS else column)
+        self.show_preview_rows(0)
+    
+    def clear_filter(self):
+        self.filter_entry.delete(0, "end")
+        self.filter_column_menu.set(ALL_COLUMNS)
+        self.apply_filter()
     
     def create_file_status_section(self, parent):
         """Create file status indicators"""
@@ -372,16 +512,8 @@ class CancellationReportModule:
     def process_reports(self):
         """Main processing function (runs in separate thread)"""
         try:
-            self.update_status("Starting report processing...")
-            
-            # Process Meesho data
-            meesho_cancelled_df = self.process_meesho_data()
-            
-            # Process Flipkart data
-            flipkart_df_list = self.process_flipkart_data()
-            
-            # Combine all data
-            self.combine_cancelled_data(meesho_cancelled_df, flipkart_df_list)
+            self.combined_df = cancellation.process_cancellations(
+                self.cancel_dir, self.pickup_dir, self.cache_dir, log=self.update_status)
             
             # Update GUI in main thread
             self.schedule_gui_update(self.processing_complete)
@@ -402,81 +534,28 @@ class CancellationReportModule:
     
     def process_meesho_data(self):
         """Process Meesho PDF and CSV data"""
-        pdf_path = os.path.join(self.pickup_dir, 'Manifest.pdf')
-        vlookup_file_path = os.path.join(self.cancel_dir, 'Meesho_data.csv')
-        
-        if os.path.exists(pdf_path) and os.path.exists(vlookup_file_path):
-            self.update_status("Processing Meesho PDF data...")
-            df_extracted = self.extract_data_from_pdf(pdf_path)
-            
-            self.update_status("Performing VLOOKUP for Meesho data...")
-            _, meesho_cancelled_df = self.perform_vlookup(df_extracted, vlookup_file_path)
-            
-            return meesho_cancelled_df
-        else:
-            self.update_status("Meesho files not found, skipping...")
-            return pd.DataFrame()
+        return cancellation.process_meesho_data(self.cancel_dir, self.pickup_dir, self.cache_dir, self.update_status)
     
     def process_flipkart_data(self):
         """Process Flipkart cancellation data"""
-        flipkart_df_list = []
-        
-        self.update_status("Processing Flipkart cancellation data...")
-        
-        if not os.path.exists(self.cancel_dir):
-            return flipkart_df_list
-        
-        for file in os.listdir(self.cancel_dir):
-            if file.endswith('.csv') and 'Flipkart' in file:
-                cancel_path = os.path.join(self.cancel_dir, file)
-                pickup_path = os.path.join(self.pickup_dir, file)
-                
-                if os.path.exists(pickup_path):
-                    sale_channel = 'Flipkart LL' if 'LL' in file else 'Flipkart KC'
-                    fk_df = self.flipkart_cancelled_orders(cancel_path, pickup_path, sale_channel)
-                    flipkart_df_list.append(fk_df)
-                    self.update_status(f"Processed {file}")
-                else:
-                    self.update_status(f"Warning: Pickup file not found for {file}")
-        
-        return flipkart_df_list
+        return cancellation.process_flipkart_data(self.cancel_dir, self.pickup_dir, self.update_status, self.cache_dir)
     
     def combine_cancelled_data(self, meesho_cancelled_df, flipkart_df_list):
         """Combine all cancelled data"""
-        self.update_status("Combining all cancellation data...")
-        
-        all_data = []
-        
-        # Add Meesho data
-        if meesho_cancelled_df is not None and not meesho_cancelled_df.empty:
-            meesho_cancelled_df = meesho_cancelled_df.copy()
-            meesho_cancelled_df['SaleChannel'] = 'Meesho'
-            meesho_cancelled_df.rename(columns={'AWB': 'Tracking ID'}, inplace=True)
-            all_data.append(meesho_cancelled_df[['SaleChannel', 'Sub Order Number', 'Tracking ID', 'Status of the product', 'SKU', 'QTY', 'Invoice Amount']])
-        
-        # Add Flipkart data
-        for df in flipkart_df_list:
-            if df is not None and not df.empty:
-                all_data.append(df)
-        
-        if all_data:
-            self.combined_df = pd.concat(all_data, ignore_index=True)
-        else:
-            self.combined_df = pd.DataFrame()
+        self.combined_df = cancellation.combine_cancelled_data(meesho_cancelled_df, flipkart_df_list, self.update_status)
     
     def processing_complete(self):
         """Called when processing is complete"""
         self.processing = False
         self.process_btn.configure(state="normal", text="🔄 Process Reports")
         
-        if not self.combined_df.empty:
+        if self.has_data():
             self.save_btn.configure(state="normal")
             self.display_data()
             self.update_status(f"Processing complete! Found {len(self.combined_df)} cancelled products.")
         else:
             self.update_status("Processing complete but no cancelled products found.")
-            self.data_text.delete("1.0", "end")
-            self.data_text.insert("1.0", "No cancelled products found in the processed files.")
+            self.show_preview_message("No cancelled products found in the processed files.")
     
     def processing_error(self, error_msg):
         """Called when processing encounters an error"""
@@ -487,56 +566,32 @@ class CancellationReportModule:
             messagebox.showerror("Processing Error", error_msg)
     
     def display_data(self):
-        """Display processed data in the text widget"""
-        if self.combined_df.empty:
-            self.data_text.delete("1.0", "end")
-            self.data_text.insert("1.0", "No data to display.")
+        """Show the processed data in the preview table; only the rows on screen are rendered"""
+        if not self.has_data():
+            self.show_preview_message("No data to display.")
             return
         
-        # Clear existing content
-        self.data_text.delete("1.0", "end")
-        
-        # Create formatted table
-        output_lines = []
-        
-        # Headers
-        headers = list(self.combined_df.columns)
-        header_line = " | ".join(f"{header:<15}" for header in headers)
-        separator_line = "-" * len(header_line)
-        
-        output_lines.append(header_line)
-        output_lines.append(separator_line)
-        
-        # Data rows (limit to first 100 for display performance)
-        display_rows = min(100, len(self.combined_df))
-        for _, row in self.combined_df.head(display_rows).iterrows():
-            data_line = " | ".join(f"{str(value):<15}" for value in row.values)
-            output_lines.append(data_line)
-        
-        # Add summary
-        output_lines.append("")
-        output_lines.append(f"Total Records: {len(self.combined_df)}")
-        if len(self.combined_df) > display_rows:
-            output_lines.append(f"(Showing first {display_rows} records)")
-        
-        # Insert into text widget
-        content = "\n".join(output_lines)
-        self.data_text.insert("1.0", content)
+        self.preview = tableview.TableView(self.combined_df)
+        columns = [str(name) for name in self.preview.columns]
+        self.preview_tree.configure(columns=columns)
+        for name, column in zip(self.preview.columns, columns):
+            self.preview_tree.heading(column, text=column, command=lambda name=name: self.sort_preview(name))
+            self.preview_tree.column(column, width=120, minwidth=60, stretch=True, anchor="w")
+        
+        self.filter_column_menu.configure(values=[ALL_COLUMNS] + columns)
+        self.filter_column_menu.set(ALL_COLUMNS)
+        self.filter_entry.delete(0, "end")
+        self.show_preview_rows(0)
     
     def save_report(self):
         """Save the processed data to Excel file"""
-        if self.combined_df.empty:
+        if not self.has_data():
             if messagebox:
                 messagebox.showwarning("No Data", "No data to save. Please process reports first.")
             return
         
         try:
-            # Ensure output directory exists
-            os.makedirs(os.path.dirname(self.output_file_path), exist_ok=True)
-            
-            # Save to Excel file
-            with pd.ExcelWriter(self.output_file_path, engine='openpyxl') as writer:
-                self.combined_df.to_excel(writer, index=False, sheet_name='Cancel products')
+            cancellation.save_report(self.combined_df, self.output_file_path)
             
             if messagebox:
                 messagebox.showinfo("Success", f"Report saved successfully to:\n{self.output_file_path}")
@@ -548,115 +603,34 @@ class CancellationReportModule:
                 messagebox.showerror("Save Error", error_msg)
             self.update_status(error_msg)
     
+    def has_data(self):
+        """True when processing produced at least one cancelled product"""
+        return self.combined_df is not None and not self.combined_df.empty
+    
     def clear_data(self):
         """Clear all processed data"""
-        self.combined_df = pd.DataFrame()
-        self.data_text.delete("1.0", "end")
-        self.data_text.insert("1.0", "Data cleared. Click 'Process Reports' to begin.")
+        self.combined_df = None
+        self.show_preview_message("Data cleared. Click 'Process Reports' to begin.")
         self.save_btn.configure(state="disabled")
         self.update_status("Data cleared")
     
     def update_status(self, message):
         """Update status label (thread-safe)"""
-        def update():
-            if hasattr(self, 'status_label') and self.status_label.winfo_exists():
-                self.status_label.configure(text=message)
-        
-        self.schedule_gui_update(update)
+        self.sink.log(message, None)
     
-    # ========== Original Processing Functions ==========
+    # ========== Original Processing Functions (implemented in reportprocessor.cancellation) ==========
     
     def extract_data_from_pdf(self, pdf_path):
         """Extract data from Meesho PDF"""
-        courier_data = {}
-        with pdfplumber.open(pdf_path) as reader:
-            for i, page in enumerate(reader.pages[1:], start=2):
-                tables = page.extract_tables()
-                if tables:
-                    page_text = page.extract_text()
-                    courier_name = "Unknown Courier"
-                    if "Courier :" in page_text:
-                        courier_name = page_text.split("Courier :")[1].split("\n")[0].strip()
-
-                    if courier_name not in courier_data:
-                        courier_data[courier_name] = []
-
-                    for table in tables:
-                        sub_order_data = [str(row[1]).replace("\n", "").strip() if len(row) > 1 else "" for row in table[1:]]
-                        awb_data = [str(row[2]).strip() if len(row) > 2 else "123" for row in table[1:]]
-                        combined_data = list(zip(sub_order_data, awb_data))
-                        courier_data[courier_name].extend(combined_data)
-
-        data_list = [{'Courier': courier, 'AWB': awb, 'Sub Order Number': sub_order} for courier, entries in courier_data.items() for sub_order, awb in entries]
-        return pd.DataFrame(data_list)
+        return cancellation.extract_data_from_pdf(pdf_path, self.cache_dir)
 
     def perform_vlookup(self, df_extracted, vlookup_file_path):
         """Perform VLOOKUP for Meesho data"""
-        vlookup_data = pd.read_csv(vlookup_file_path)
-
-        vlookup_data.rename(columns={
-            'Reason for Credit Entry': 'Status of the product',
-            'Sub Order No': 'Sub Order Number',
-            'SKU': 'SKU',
-            'Quantity': 'QTY',
-            'Supplier Listed Price (Incl. GST + Commission)': 'Invoice Amount'
-        }, inplace=True)
-
-        merged_df = pd.merge(
-            df_extracted,
-            vlookup_data[['Sub Order Number', 'Status of the product', 'SKU', 'QTY', 'Invoice Amount']],
-            on='Sub Order Number',
-            how='left'
-        )
-
-        filtered_df = merged_df[merged_df['Status of the product'].astype(str).str.strip().str.upper() == 'CANCELLED']
-        return merged_df, filtered_df
+        return cancellation.perform_vlookup(df_extracted, vlookup_file_path, self.cache_dir)
 
     def flipkart_cancelled_orders(self, fk_cancel_path, fk_pickup_path, sale_channel):
         """Process Flipkart cancelled orders"""
-        df_cancel = pd.read_csv(fk_cancel_path)
-        df_pickup = pd.read_csv(fk_pickup_path)
-
-        # Rename Cancel file columns
-        df_cancel.rename(columns={
-            df_cancel.columns[0]: 'Order Cancellation Date',
-            df_cancel.columns[2]: 'OrderID',
-            df_cancel.columns[5]: 'Cancellation Type'
-        }, inplace=True)
-
-        # Filter today's cancellations
-        df_cancel['Order Cancellation Date'] = pd.to_datetime(df_cancel['Order Cancellation Date'], errors='coerce').dt.date
-        today = datetime.today().date()
-        df_cancel = df_cancel[df_cancel['Order Cancellation Date'] == today]
-
-        # Filter by "Cancelled by buyer"
-        df_cancel = df_cancel[df_cancel['Cancellation Type'].str.strip().str.lower() == 'cancelled by buyer']
-
-        # Extract relevant Order IDs
-        order_ids = df_cancel['OrderID'].astype(str).str.strip().unique()
-
-        # Rename Pickup file columns
-        df_pickup.rename(columns={
-            df_pickup.columns[3]: 'OrderID',
-            'SKU': 'SKU',
-            'Tracking ID': 'Tracking ID',
-            'Quantity': 'QTY',
-            'Invoice Amount': 'Invoice Amount'
-        }, inplace=True)
-
-        # Match Order IDs
-        df_pickup['OrderID'] = df_pickup['OrderID'].astype(str).str.strip()
-        df_filtered = df_pickup[df_pickup['OrderID'].isin(order_ids)]
-
-        # Merge and return result
-        df_result = pd.merge(
-            df_filtered[['OrderID', 'Tracking ID', 'SKU', 'QTY', 'Invoice Amount']],
-            df_cancel[['OrderID', 'Cancellation Type']],
-            on='OrderID', how='left'
-        )
-        df_result['SaleChannel'] = sale_channel
-
-        return df_result[['SaleChannel', 'OrderID', 'Tracking ID', 'Cancellation Type', 'SKU', 'QTY', 'Invoice Amount']]
+        return cancellation.flipkart_cancelled_orders(fk_cancel_path, fk_pickup_path, sale_channel)
 
     def run(self):
         """Run the standalone application"""
@@ -665,5 +639,6 @@ class CancellationReportModule:
 
 # For standalone execution
 if __name__ == "__main__":
+    multiprocessing.freeze_support()
     app = CancellationReportModule()
     app.run()
\ No newline at end of file
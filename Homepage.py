@@ -1,12 +1,18 @@
+import time
+STARTUP_T0 = time.perf_counter()  # Before any other import, so cold start includes them
+
 import tkinter as tk
 from tkinter import ttk, messagebox
-import sys
 import os
 import shutil
 from pathlib import Path
-import importlib.util
+import multiprocessing
 import customtkinter as ctk
 import traceback
+from reportprocessor.registry import ModuleRegistry, prewarm_in_background
+
+# Import pandas/openpyxl/pdfplumber/Pillow on a background thread once the homepage is up
+PREWARM_IMPORTS = True
 
 class ReportProcessorHomepage:
     def __init__(self):
@@ -27,6 +33,10 @@ class ReportProcessorHomepage:
         self.current_module = None
         self.current_frame = None
         
+        # Module files are loaded once and reused on later navigations
+        self.modules = ModuleRegistry()
+        self.startup_timings = {}
+        
         # Create the main container with scrollable frame
         #self.main_container = ctk.CTkScrollableFrame(self.root, fg_color="#f8f9fa", corner_radius=0)
         self.main_container = ctk.CTkFrame(self.root, fg_color="#f8f9fa", corner_radius=0)
@@ -34,6 +44,27 @@ class ReportProcessorHomepage:
         
         # Show homepage initially
         self.show_homepage()
+        self.startup_timings["window_built"] = time.perf_counter() - STARTUP_T0
+        
+        # First idle callback runs once the homepage has been drawn and accepts input
+        self.root.after_idle(self.on_first_idle)
+        
+    def on_first_idle(self):
+        """Report startup timing and start pre-warming the processing imports"""
+        self.startup_timings["first_interaction"] = time.perf_counter() - STARTUP_T0
+        print(f"[startup] window built in {self.startup_timings['window_built']:.2f}s, "
+              f"interactive after {self.startup_timings['first_interaction']:.2f}s")
+        
+        if PREWARM_IMPORTS:
+            prewarm_start = time.perf_counter()
+            
+            def prewarm_done(timings):
+                self.startup_timings["prewarm"] = time.perf_counter() - prewarm_start
+                failed = [name for name, seconds in timings.items() if seconds is None]
+                print(f"[startup] processing imports pre-warmed in {self.startup_timings['prewarm']:.2f}s"
+                      + (f" (failed: {', '.join(failed)})" if failed else ""))
+            
+            prewarm_in_background(on_done=prewarm_done)
         
     def center_window(self):
         """Center the window on the screen"""
@@ -427,27 +458,10 @@ class ReportProcessorHomepage:
             module_name = module_config["title"].replace('\n', ' ')
             expected_class = module_config["module_class"]
             
-            # Get the module name without extension
-            module_name_clean = os.path.splitext(os.path.basename(module_file))[0]
-            
-            # Load module dynamically
-            spec = importlib.util.spec_from_file_location(module_name_clean, module_file)
-            if spec is None:
-                raise ImportError(f"Could not load spec for {module_file}")
-            
-            module = importlib.util.module_from_spec(spec)
-            
-            # Add the module's directory to sys.path temporarily
-            original_path = sys.path.copy()
-            module_dir = os.path.dirname(os.path.abspath(module_file))
-            if module_dir not in sys.path:
-                sys.path.insert(0, module_dir)
-            
-            try:
-                spec.loader.exec_module(module)
-            finally:
-                # Restore original sys.path
-                sys.path = original_path
+            # Load module dynamically (cached after the first visit)
+            start = time.perf_counter()
+            cached = self.modules.is_loaded(module_file)
+            module = self.modules.load(module_file)
             
             # Check if the module has the expected class
             if not hasattr(module, expected_class):
@@ -477,6 +491,8 @@ class ReportProcessorHomepage:
                         gui_instance = gui_class()
                 
                 self.current_module = gui_instance
+                print(f"[startup] {module_name} ready in {time.perf_counter() - start:.2f}s"
+                      f" ({'cached module' if cached else 'first load'})")
                 
             except Exception as constructor_error:
                 messagebox.showerror(
@@ -502,6 +518,8 @@ class ReportProcessorHomepage:
 
 def main():
     """Main function to run the application"""
+    # Modules use worker processes (e.g. Manifest.pdf extraction); required when frozen
+    multiprocessing.freeze_support()
     try:
         app = ReportProcessorHomepage()
         app.run()
@@ -1,11 +1,5 @@
-import re
 import os
 import sys
-import pandas as pd
-import pdfplumber
-import matplotlib.pyplot as plt
-from openpyxl import load_workbook
-from openpyxl.utils import get_column_letter
 from datetime import datetime
 from pathlib import Path
 import threading
@@ -13,26 +7,20 @@ import customtkinter as ctk
 from tkinter import filedialog, messagebox
 import tkinter as tk
 import shutil
-from pdf2image import convert_from_path
-import pypdfium2
+import multiprocessing
+from reportprocessor.registry import LazyModule
+from reportprocessor.logs import LogSink, text_appender
+from reportprocessor.paths import BASE_DIR, PICKUP_INPUT_DIR as INPUT_DIR, TEMPLATE_DIR, OUTPUT_DIR, PIVOT_PNG_DIR, CACHE_DIR
 
 # Set CustomTkinter appearance and color theme
 ctk.set_appearance_mode("light")
 ctk.set_default_color_theme("blue")
 
-# Get the directory where the exe is located
-if getattr(sys, 'frozen', False):
-    BASE_DIR = Path(sys.executable).parent
-else:
-    BASE_DIR = Path(__file__).parent
-
 selected_template_file = None
 
-# Define relative paths
-INPUT_DIR = BASE_DIR / "inputdir" / "PickupReportfiles"
-TEMPLATE_DIR = BASE_DIR / "Template"
-OUTPUT_DIR = BASE_DIR / "Output"
-PIVOT_PNG_DIR = OUTPUT_DIR / "Pivot_PNGs"
+# Engines (pandas, openpyxl, pdfplumber, Pillow) load when processing starts, not when the screen opens
+pickup = LazyModule("reportprocessor.pickup")
+excel = LazyModule("reportprocessor.excel")
 
 # Create directories if they don't exist
 INPUT_DIR.mkdir(parents=True, exist_ok=True)
@@ -40,36 +28,6 @@ TEMPLATE_DIR.mkdir(exist_ok=True)
 OUTPUT_DIR.mkdir(exist_ok=True)
 PIVOT_PNG_DIR.mkdir(exist_ok=True)
 
-# --- Mapping (column → courier source) ---
-prefix_mapping = {
-    "A3": "Sellerflex",
-    "D3": "Flipkart KC",
-    "E3": "Flipkart LL",
-    "F3": "Meesho - Xpressbees",
-    "G3": "Meesho - Ecom Express",
-    "H3": "Meesho - Delhivery",
-    "I3": "Others"
-}
-
-# --- CSV input files with tracking & pivot config ---
-csv_sources = {
-    INPUT_DIR / "Sellerflex.csv": {
-        "tracking_column": "Shipment Tracking ID",
-        "source_name": "Sellerflex",
-        "pivot_columns": ("MSKU", "Units")
-    },
-    INPUT_DIR / "Flipkart KC.csv": {
-        "tracking_column": "Tracking ID",
-        "source_name": "Flipkart KC",
-        "pivot_columns": ("SKU", "Quantity")
-    },
-    INPUT_DIR / "Flipkart LL.csv": {
-        "tracking_column": "Tracking ID",
-        "source_name": "Flipkart LL",
-        "pivot_columns": ("SKU", "Quantity")
-    }
-}
-
 # GUI Color scheme - Orange and White
 COLORS = {
     "primary_orange": "#FF6B35",
@@ -93,16 +51,22 @@ class PickupReportModule:
             parent_frame: The parent frame to embed this module
             back_callback: Function to call when back button is pressed
         """
+        global selected_template_file
+        # The module stays loaded between visits; start each visit without a selected template
+        selected_template_file = None
+
         self.parent_frame = parent_frame
         self.back_callback = back_callback
         self.processing_thread = None
-        self.log_messages = []
+        # Worker threads log into the sink; the UI drains it in batches (last 100 lines kept)
+        self.sink = LogSink("pickup", capacity=100, echo=True)
         
         # Clear the parent frame
         for widget in self.parent_frame.winfo_children():
             widget.destroy()
             
         self.setup_gui()
+        self.sink.attach(self.parent_frame, text_appender(self.log_text, 100), self._show_progress)
         
         # Update file status on startup
         self.parent_frame.after(1000, self.update_file_status)
@@ -355,32 +319,17 @@ class PickupReportModule:
         self.log_text.insert("0.0", "Ready to start processing...\nClick 'Start Processing' to begin.")
         
     def log_message(self, message, level="INFO"):
-        """Add message to log with timestamp"""
-        timestamp = datetime.now().strftime("%H:%M:%S")
-        formatted_msg = f"[{timestamp}] {level}: {message}"
-        self.log_messages.append(formatted_msg)
-        print(formatted_msg)  # Also print to console
-        
-        # Update GUI
-        self.parent_frame.after(0, self._update_log_display)
-        
-    def _update_log_display(self):
-        """Update the log display in the GUI"""
-        # Keep only last 100 messages to prevent memory issues
-        if len(self.log_messages) > 100:
-            self.log_messages.pop(0)
-        
-        self.log_text.delete("0.0", "end")
-        self.log_text.insert("0.0", "\n".join(self.log_messages))
-        self.log_text.see("end")
+        """Add message to log with timestamp (safe from any thread)"""
+        self.sink.log(message, level)
         
     def update_progress(self, value, step_description):
-        """Update progress bar and current step"""
-        def _update():
-            self.progress_bar.set(value)
-            self.status_label.configure(text=step_description)
-            
-        self.parent_frame.after(0, _update)
+        """Update progress bar and current step (safe from any thread)"""
+        self.sink.progress(value, step_description)
+        
+    def _show_progress(self, value, step_description):
+        """Apply the latest progress update; runs on the UI tick"""
+        self.progress_bar.set(value)
+        self.status_label.configure(text=step_description)
         
     def start_processing(self):
         """Start processing in a separate thread"""
@@ -388,7 +337,7 @@ class PickupReportModule:
         self.clear_log_btn.configure(state="disabled")
         
         # Clear previous log messages
-        self.log_messages.clear()
+        self.sink.clear()
         self.log_text.delete("0.0", "end")
         
         # Start processing in separate thread
@@ -432,7 +381,7 @@ class PickupReportModule:
     
     def clear_log(self):
         """Clear the log messages"""
-        self.log_messages.clear()
+        self.sink.clear()
         self.log_text.delete("0.0", "end")
         self.log_text.insert("0.0", "Log cleared. Ready for new processing...")
 
@@ -550,301 +499,54 @@ Base Directory: {BASE_DIR}"""
             threading.Thread(target=self.process_files, daemon=True).start()
 
 
-    # Core processing functions
+    # Core processing functions (implemented in reportprocessor.pickup)
     def extract_from_csv(self, path, tracking_col):
-        try:
-            df = pd.read_csv(path, dtype=str)
-            if tracking_col not in df.columns:
-                self.log_message(f"Warning: Column '{tracking_col}' not found in {path}", "WARN")
-                return [], df
-            tracking_ids = df[tracking_col].dropna().astype(str).tolist()
-            self.log_message(f"Extracted {len(tracking_ids)} tracking IDs from {path.name}")
-            return tracking_ids, df
-        except FileNotFoundError:
-            self.log_message(f"File not found: {path}", "ERROR")
-            return [], pd.DataFrame()
-        except Exception as e:
-            self.log_message(f"Error reading {path}: {e}", "ERROR")
-            return [], pd.DataFrame()
+        return pickup.extract_from_csv(path, tracking_col, self.log_message)
 
     def extract_data_from_pdf(self, pdf_path):
-        if not pdf_path.exists():
-            self.log_message(f"PDF file not found: {pdf_path}", "WARN")
-            return {}
-        
-        known_couriers = ["Delhivery", "Ecom Express", "Xpressbees"]
-        courier_data = {}
-
-        try:
-            with pdfplumber.open(pdf_path) as reader:
-                total_pages = len(reader.pages[1:])
-                for idx, page in enumerate(reader.pages[1:]):
-                    tables = page.extract_tables()
-                    page_text = page.extract_text() or ""
-                    courier_name = "Unknown"
-
-                    if "Courier :" in page_text:
-                        courier_name = page_text.split("Courier :")[1].split("\n")[0].strip()
-
-                    if courier_name not in known_couriers:
-                        courier_name = "Others"
-
-                    if courier_name not in courier_data:
-                        courier_data[courier_name] = []
-
-                    if tables:
-                        for table in tables:
-                            awb_col = 2
-                            for row in table[1:]:
-                                if len(row) > awb_col:
-                                    awb = str(row[awb_col]).strip()
-                                    if awb:
-                                        courier_data[courier_name].append(awb)
-                    
-                    # Update progress for PDF processing
-                    pdf_progress = 0.6 + (0.1 * (idx + 1) / total_pages)
-                    self.update_progress(pdf_progress, f"Processing PDF page {idx + 1}/{total_pages}")
-                    
-            self.log_message(f"Extracted AWB data from PDF: {dict((k, len(v)) for k, v in courier_data.items())}")
-        except Exception as e:
-            self.log_message(f"Error processing PDF {pdf_path}: {e}", "ERROR")
-
-        return courier_data
+        return pickup.extract_data_from_pdf(pdf_path, self.log_message, self.update_progress,
+                                            workers=pickup.PDF_WORKERS, cache_dir=CACHE_DIR)
 
     def create_pivot_image(self, df, pivot_columns, title, filename):
-        try:
-            if df.empty:
-                self.log_message(f"Empty DataFrame for {title}, skipping pivot creation.", "WARN")
-                return
-                
-            sku_col, qty_col = pivot_columns
-            if sku_col not in df.columns or qty_col not in df.columns:
-                self.log_message(f"Required columns '{sku_col}' and '{qty_col}' not found for {title}.", "WARN")
-                return
-
-            df[qty_col] = pd.to_numeric(df[qty_col], errors='coerce').fillna(0)
-            pivot = df.groupby(sku_col, as_index=False)[qty_col].sum()
-            pivot.columns = ['SKU', 'Count']
-
-            row_count = len(pivot)
-            fig_height = max(4, 0.35 * (row_count + 2))
-            fig, ax = plt.subplots(figsize=(8, fig_height))
-            ax.axis('off')
-
-            full_data = [[title, '']] + [pivot.columns.tolist()] + pivot.values.tolist()
-
-            table = ax.table(
-                cellText=full_data,
-                loc='center',
-                cellLoc='center',
-                colWidths=[0.8, 0.2],
-            )
-
-            table.auto_set_font_size(False)
-            table.set_fontsize(12)
-
-            for (row, col), cell in table.get_celld().items():
-                cell.set_linewidth(0.4)
-                if row == 0:
-                    cell.set_text_props(weight='bold', fontsize=14)
-                    cell.set_fontsize(14)
-                    cell.set_facecolor('#FFFFFF')
-                    cell.set_height(0.5)
-                    cell.visible_edges = 'open'
-                elif row == 1:
-                    cell.set_text_props(weight='bold')
-
-            fig.tight_layout(pad=0)
-            plt.savefig(filename, bbox_inches='tight', dpi=300, pad_inches=0.02)
-            plt.close()
-            self.log_message(f"Pivot table saved: {filename.name}")
-
-        except Exception as e:
-            self.log_message(f"Error creating pivot table for {title}: {e}", "ERROR")
-
-    # def save_first_page_of_pdf_as_png(self, pdf_path, output_path):
-    #     try:
-    #         if not pdf_path.exists():
-    #             self.log_message(f"PDF file not found: {pdf_path}", "WARN")
-    #             return
-
-    #         images = convert_from_path(str(pdf_path), first_page=1, last_page=1, dpi=150)
-    #         if images:
-    #             images[0].save(output_path, 'PNG')
-    #             self.log_message(f"Saved first page as PNG: {output_path.name}")
-    #         else:
-    #             self.log_message("No pages found in the PDF", "WARN")
-    #     except Exception as e:
-    #         self.log_message(f"Error saving PDF page as PNG: {e}", "ERROR")
-    
+        pickup.create_pivot_image(df, pivot_columns, title, filename, self.log_message)
 
     def save_first_page_of_pdf_as_png(self, pdf_path, output_path):
-        try:
-            if not pdf_path.exists():
-                self.log_message(f"PDF file not found: {pdf_path}", "WARN")
-                return
-
-            pdf = pypdfium2.PdfDocument(str(pdf_path))
-            page = pdf[0]
-            pil_image = page.render(scale=2).to_pil()
-            pil_image.save(output_path, format="PNG")
-            self.log_message(f"Saved first page as PNG: {output_path.name}")
-        except Exception as e:
-            self.log_message(f"Error saving PDF page as PNG: {e}", "ERROR")
+        pickup.save_first_page_of_pdf_as_png(pdf_path, output_path, self.log_message)
 
     def get_top_left_if_merged(self, ws, cell_coord):
-        for merged_range in ws.merged_cells.ranges:
-            if cell_coord in merged_range:
-                return merged_range.bounds[:2]
-        return None
+        """Return (col, row) of the merged range's top-left cell, or None if not merged"""
+        return excel.merged_top_left(ws, cell_coord)
 
     def safe_write(self, ws, col, row, value):
         try:
-            cell_coord = f"{col}{row}"
-            merged_top_left = self.get_top_left_if_merged(ws, cell_coord)
-            if merged_top_left:
-                top_col, top_row = merged_top_left
-                col_letter = get_column_letter(top_col)
-                ws[f"{col_letter}{top_row}"] = value
-            else:
-                ws[cell_coord] = value
+            excel.write_cell(ws, col, row, value)
         except Exception as e:
             self.log_message(f"Error writing to cell {col}{row}: {e}", "ERROR")
 
+    def write_tracking_column(self, ws, col, start_row, values, numeric=False):
+        """Bulk-write a deduplicated ID list down one column (numeric=True stores all-digit IDs as numbers)"""
+        pickup.write_tracking_column(ws, col, start_row, values, numeric, self.log_message)
+
     def check_required_files(self):
         """Check if all required files exist"""
-        TEMPLATE_FILE = Path(selected_template_file) if selected_template_file else TEMPLATE_DIR / "Pickup Report.xlsx"
-        meesho_pdf = INPUT_DIR / "Manifest.pdf"
-        
-        missing_files = []
-        
-        if not TEMPLATE_FILE.exists():
-            missing_files.append(f"Template: {TEMPLATE_FILE}")
-        
-        for csv_path in csv_sources.keys():
-            if not csv_path.exists():
-                missing_files.append(f"CSV: {csv_path}")
-        
-        if not meesho_pdf.exists():
-            missing_files.append(f"PDF: {meesho_pdf}")
-        
-        return missing_files, TEMPLATE_FILE, meesho_pdf
+        return pickup.check_required_files(selected_template_file, INPUT_DIR)
 
     def process_files(self):
         """Main processing function that runs in a separate thread"""
         try:
-            self.log_message("Starting Pickup Report Processing...")
-            self.update_progress(0.05, "Checking required files...")
-
-            missing_files, TEMPLATE_FILE, meesho_pdf = self.check_required_files()
-
-            if not TEMPLATE_FILE or not TEMPLATE_FILE.exists():
-                self.log_message("Template file is missing or invalid.", "ERROR")
-                self.update_progress(0.0, "Missing template file!")
-                return
-
-            # We allow other files to be missing; only warn
-            if missing_files:
-                self.log_message("Some input files are missing; proceeding with available files.", "WARN")
-                for file in missing_files:
-                    self.log_message(f"  - Missing: {file}", "WARN")
-
-            self.log_message("Proceeding with available files...")
-            self.update_progress(0.1, "Loading template...")
-
             # Modified: Determine output file based on whether template was manually selected
+            output_file = None
             if selected_template_file:
                 # If user manually selected template, save to that template file
-                OUTPUT_FILE = Path(selected_template_file)
-                self.log_message(f"Using manually selected template: {OUTPUT_FILE.name}")
-            else:
-                # Default behavior: save to output directory
-                OUTPUT_FILE = OUTPUT_DIR / f"Pickup_Report_{datetime.today().strftime('%d-%m-%Y')}.xlsx"
-
-            START_ROW = 3
-
-            wb = load_workbook(TEMPLATE_FILE)
-            if "Entry tracking ID" not in wb.sheetnames:
-                raise ValueError("Sheet 'Entry tracking ID' not found in template.")
-
-            ws = wb["Entry tracking ID"]
-            ws["K1"] = datetime.today().strftime('%d-%m-%Y')
+                output_file = Path(selected_template_file)
+                self.log_message(f"Using manually selected template: {output_file.name}")
 
-            col_for = {v: re.match(r"([A-Z]+)", k).group(1) for k, v in prefix_mapping.items()}
-
-            # Process CSVs that are available
-            total_sources = sum(1 for path in csv_sources if path.exists())
-            current_idx = 0
-
-            for path, config in csv_sources.items():
-                if not path.exists():
-                    self.log_message(f"Skipping missing source: {path.name}", "WARN")
-                    continue
-
-                current_idx += 1
-                tracking_col = config["tracking_column"]
-                source_name = config["source_name"]
-                pivot_columns = config["pivot_columns"]
-
-                progress = 0.1 + (0.4 * current_idx / total_sources)
-                self.update_progress(progress, f"Processing {source_name}...")
-
-                self.log_message(f"Processing {source_name} from {path.name}")
-                tracking_ids, df = self.extract_from_csv(path, tracking_col)
-
-                if not tracking_ids:
-                    self.log_message(f"No tracking IDs found for {source_name}", "WARN")
-                    continue
-
-                # Remove duplicates
-                tracking_ids = list(dict.fromkeys(tracking_ids))
-
-                col = col_for.get(source_name)
-                if not col:
-                    self.log_message(f"No column mapping found for {source_name}", "WARN")
-                    continue
-
-                for i, tid in enumerate(tracking_ids, START_ROW):
-                    val = tid if not str(tid).isdigit() else int(tid)
-                    self.safe_write(ws, col, i, val)
-
-                img_path = PIVOT_PNG_DIR / f"{source_name.replace(' ', '_')}_pivot.png"
-                self.create_pivot_image(df, pivot_columns, f"{source_name} Pivot Table", img_path)
-
-            # Meesho PDF Processing
-            if meesho_pdf and meesho_pdf.exists():
-                self.update_progress(0.6, "Processing Meesho PDF...")
-                self.log_message(f"Processing Meesho PDF: {meesho_pdf.name}")
-                courier_data = self.extract_data_from_pdf(meesho_pdf)
-
-                for courier, awbs in courier_data.items():
-                    column_key = f"Meesho - {courier}" if courier != "Others" else "Others"
-                    if column_key not in col_for:
-                        self.log_message(f"Skipping unrecognized courier: {courier}", "WARN")
-                        continue
-                    col = col_for[column_key]
-
-                    # Remove duplicates
-                    awbs = list(dict.fromkeys(awbs))
-
-                    for i, tid in enumerate(awbs, START_ROW):
-                        self.safe_write(ws, col, i, tid)
-
-                self.update_progress(0.8, "Creating Meesho pivot image...")
-                meesho_pivot_image_path = PIVOT_PNG_DIR / "Meesho_Pivot_Page.png"
-                self.save_first_page_of_pdf_as_png(meesho_pdf, meesho_pivot_image_path)
-            else:
-                self.log_message("Meesho PDF not found. Skipping PDF processing.", "WARN")
-
-            # Final steps
-            self.update_progress(0.9, "Saving Excel file...")
-            wb.save(OUTPUT_FILE)
-
-            self.update_progress(1.0, "Processing completed successfully!")
-            self.log_message(f"Pickup report saved: {OUTPUT_FILE.name}")
-            self.log_message(f"All pivot tables saved in: {PIVOT_PNG_DIR}")
-            self.log_message("Processing completed successfully!", "SUCCESS")
+            pickup.process_pickup(selected_template_file, output_file, INPUT_DIR,
+                                  log=self.log_message, progress=self.update_progress)
 
+        except pickup.MissingTemplateError:
+            # Already logged and shown on the progress bar by the engine
+            pass
         except Exception as e:
             self.log_message(f"Fatal error: {e}", "ERROR")
             self.update_progress(0.0, "Processing failed!")
@@ -855,9 +557,9 @@ Base Directory: {BASE_DIR}"""
 
 def main():
     """Main function to run the application"""
-    # Add matplotlib backend for headless operation
-    plt.switch_backend('Agg')
-    
+    # Needed for the PDF worker processes in a frozen (PyInstaller) build
+    multiprocessing.freeze_support()
+
     # Create main window
     root = ctk.CTk()
     root.title("Pickup Report Processing Tool")
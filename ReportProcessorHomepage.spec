@@ -11,6 +11,7 @@ a = Analysis(
         ('Pickupreportexe.py', '.'),       # Include module source files
         ('ReturnsReportexe.py', '.'),
         ('Cancellationexe.py', '.'),
+        ('reportprocessor/sources.json', 'reportprocessor'),  # Marketplace source registry
         ('InputDIR', 'InputDIR'),          # Include your input/output folders
         ('Output', 'Output')
     ],
@@ -27,7 +28,25 @@ a = Analysis(
         'matplotlib',
         'Pickupreportexe',
         'ReturnsReportexe',
-        'Cancellationexe'
+        'Cancellationexe',
+        'reportprocessor',
+        'reportprocessor.backfill',
+        'reportprocessor.cache',
+        'reportprocessor.cancellation',
+        'reportprocessor.excel',
+        'reportprocessor.ingest',
+        'reportprocessor.logs',
+        'reportprocessor.manifest',
+        'reportprocessor.paths',
+        'reportprocessor.pickup',
+        'reportprocessor.pivots',
+        'reportprocessor.registry',
+        'reportprocessor.returns',
+        'reportprocessor.returnstore',
+        'reportprocessor.sources',
+        'reportprocessor.tableview',
+        'reportprocessor.timing',
+        'reportprocessor.xlsxstream'
     ],
     hookspath=[],
     runtime_hooks=[],
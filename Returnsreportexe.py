@@ -1,28 +1,19 @@
 import sys
 import customtkinter as ctk
-from pathlib import Path
-from datetime import datetime
-import pandas as pd
-from openpyxl import load_workbook
-import shutil
 import threading
 import subprocess
 import os
+from reportprocessor.registry import LazyModule
+from reportprocessor.logs import LogSink, text_appender
+from reportprocessor.paths import RETURNS_INPUT_DIR as INPUT_DIR, RETURNS_TEMPLATE as TEMPLATE_PATH, OUTPUT_DIR
+
+# Engine (pandas, openpyxl) loads when processing starts, not when the screen opens
+returns = LazyModule("reportprocessor.returns")
 
 # Set CustomTkinter appearance and color theme
 ctk.set_appearance_mode("light")
 ctk.set_default_color_theme("blue")
 
-# Get the directory where the exe is located
-if getattr(sys, 'frozen', False):
-    BASE_DIR = Path(sys.executable).parent
-else:
-    BASE_DIR = Path(__file__).parent
-
-INPUT_DIR = BASE_DIR / "inputdir" / "Returnsreportfiles"
-TEMPLATE_PATH = BASE_DIR / "Template" / "ReturnsReconcileReport.xlsx"
-OUTPUT_DIR = BASE_DIR / "Output"
-
 # GUI Color scheme - Orange and White (matching main app)
 COLORS = {
     "primary_orange": "#FF6B35",
@@ -77,7 +68,11 @@ class ReturnsReportGUI:
         if not self.is_standalone:
             self.store_original_content()
         
+        # Worker threads log into the sink; the UI drains it in batches on a fixed tick
+        self.sink = LogSink("returns", capacity=1000)
+        
         self.setup_gui()
+        self.sink.attach(self.root, text_appender(self.log_text, 1000), self._show_progress)
         self.update_file_status()
         
     def store_original_content(self):
@@ -420,13 +415,9 @@ class ReturnsReportGUI:
         else:
             self.log_message("✅ All required files found!")
             
-    def log_message(self, message):
-        """Add message to log with timestamp"""
-        timestamp = datetime.now().strftime("%H:%M:%S")
-        log_entry = f"[{timestamp}] {message}\n"
-        self.log_text.insert("end", log_entry)
-        self.log_text.see("end")
-        self.root.update()
+    def log_message(self, message, level=None):
+        """Add message to log with timestamp (safe from any thread)"""
+        self.sink.log(message, level)
         
     def start_processing(self):
         """Start the returns processing in a separate thread"""
@@ -439,182 +430,36 @@ class ReturnsReportGUI:
         processing_thread.daemon = True
         processing_thread.start()
         
+    def update_progress(self, value, step_description):
+        """Update progress bar and status line (safe from any thread)"""
+        self.sink.progress(value, step_description)
+        
+    def _show_progress(self, value, step_description):
+        """Apply the latest progress update; runs on the UI tick"""
+        self.progress_var.set(value)
+        self.status_label.configure(text=step_description)
+
     def process_returns_data(self):
         """Process the returns data (main processing logic)"""
         try:
-            self.log_message("🚀 Starting returns reconciliation process...")
-            
-            # Create output directory
-            OUTPUT_DIR.mkdir(parents=True, exist_ok=True)
-            output_excel_path = OUTPUT_DIR / "Returns Reconcile Report.xlsx"
-            
-            self.progress_var.set(0.1)
-            self.status_label.configure(text="Initializing processing...")
-            
-            all_data = []
-            
-            # Process Meesho CSV
-            self.progress_var.set(0.2)
-            self.status_label.configure(text="Processing Meesho data...")
-            self.log_message("📄 Processing Meesho returns data...")
-            
-            try:
-                meesho_file = INPUT_DIR / "Returns Meesho.csv"
-                df_meesho = pd.read_csv(meesho_file, skiprows=7)
-                selected_columns_meesho = {
-                    "AWB Number": "Return TID",
-                    "Type of Return": "Return Type",
-                    "SKU": "SKU",
-                    "Qty": "Units",
-                    "Courier Partner": "Courier Partner",
-                    "Order Number": "OID",
-                    "Return Reason": "Cx Subject",
-                    "Detailed Return Reason": "Cx Comment"
-                }
-                df_meesho = df_meesho[list(selected_columns_meesho.keys())].rename(columns=selected_columns_meesho)
-                df_meesho["Sales Channel"] = "Meesho"
-                df_meesho["Forward TID"] = ""
-                all_data.append(df_meesho)
-                self.log_message(f"✅ Meesho: {len(df_meesho)} records processed")
-            except Exception as e:
-                self.log_message(f"❌ Error processing Meesho file: {e}")
-                
-            # Process Flipkart KC CSV
-            self.progress_var.set(0.4)
-            self.status_label.configure(text="Processing Flipkart KC data...")
-            self.log_message("📄 Processing Flipkart KC returns data...")
-            
-            try:
-                flipkart_file = INPUT_DIR / "Returns Flipkart KC.csv"
-                df_flipkart = pd.read_csv(flipkart_file)
-                selected_columns_flipkart = {
-                    "Tracking ID": "Return TID",
-                    "Return Type": "Return Type",
-                    "SKU": "SKU",
-                    "Quantity": "Units",
-                    "Order ID": "OID",
-                    "Return Status": "Status of Return at the time of Capture",
-                    "Return Sub-reason": "Cx Comment"
-                }
-                df_flipkart = df_flipkart[list(selected_columns_flipkart.keys())].rename(columns=selected_columns_flipkart)
-                df_flipkart["Courier Partner"] = "Ekart"
-                df_flipkart["Sales Channel"] = "Flipkart KC"
-                df_flipkart["Forward TID"] = ""
-                df_flipkart["Return Type"] = df_flipkart.get("Return Type", df_flipkart.get("Return Type (Column W)", ""))
-                df_flipkart["Cx Subject"] = df_flipkart["Return Type"]
-                all_data.append(df_flipkart)
-                self.log_message(f"✅ Flipkart KC: {len(df_flipkart)} records processed")
-            except Exception as e:
-                self.log_message(f"❌ Error processing Flipkart KC file: {e}")
-                
-            # Process Flipkart LL CSV
-            self.progress_var.set(0.6)
-            self.status_label.configure(text="Processing Flipkart LL data...")
-            self.log_message("📄 Processing Flipkart LL returns data...")
+            returns.process_returns(INPUT_DIR, TEMPLATE_PATH, OUTPUT_DIR / "Returns Reconcile Report.xlsx",
+                                    log=self.log_message, progress=self.update_progress)
             
-            try:
-                flipkartll_file = INPUT_DIR / "Returns Flipkart LL.csv"
-                df_flipkartll = pd.read_csv(flipkartll_file)
-                selected_columns_flipkart_ll = {
-                    "Tracking ID": "Return TID",
-                    "Return Type": "Return Type",
-                    "SKU": "SKU",
-                    "Quantity": "Units",
-                    "Order ID": "OID",
-                    "Return Status": "Status of Return at the time of Capture",
-                    "Return Sub-reason": "Cx Comment"
-                }
-                df_flipkartll = df_flipkartll[list(selected_columns_flipkart_ll.keys())].rename(columns=selected_columns_flipkart_ll)
-                df_flipkartll["Courier Partner"] = "Ekart"
-                df_flipkartll["Sales Channel"] = "Flipkart LL"
-                df_flipkartll["Forward TID"] = ""
-                df_flipkartll["Return Type"] = df_flipkartll.get("Return Type", df_flipkartll.get("Return Type (Column W)", ""))
-                df_flipkartll["Cx Subject"] = df_flipkartll["Return Type"]
-                all_data.append(df_flipkartll)
-                self.log_message(f"✅ Flipkart LL: {len(df_flipkartll)} records processed")
-            except Exception as e:
-                self.log_message(f"❌ Error processing Flipkart LL file: {e}")
-                
-            # Process SellerFlex CSV
-            self.progress_var.set(0.8)
-            self.status_label.configure(text="Processing SellerFlex data...")
-            self.log_message("📄 Processing SellerFlex returns data...")
-            
-            try:
-                sellerflex_file = INPUT_DIR / "Returns SellerFlex.csv"
-                df_sellerflex = pd.read_csv(sellerflex_file)
-                selected_columns_sellerflex = {
-                    "Reverse Leg Tracking ID": "Return TID",
-                    "Return Type": "Return Type",
-                    "mSKU": "SKU",
-                    "Units": "Units",
-                    "Customer Order ID": "OID",
-                    "Forward Leg Tracking ID": "Forward TID",
-                    "Return Status": "Status of Return at the time of Capture"
-                }
-                df_sellerflex = df_sellerflex[list(selected_columns_sellerflex.keys())].rename(columns=selected_columns_sellerflex)
-                df_sellerflex["Courier Partner"] = "ATSIN"
-                df_sellerflex["Sales Channel"] = "Amazon KC -flex"
-                df_sellerflex["Cx Subject"] = ""
-                df_sellerflex["Cx Comment"] = ""
-                all_data.append(df_sellerflex)
-                self.log_message(f"✅ SellerFlex: {len(df_sellerflex)} records processed")
-            except Exception as e:
-                self.log_message(f"❌ Error processing SellerFlex file: {e}")
-                
-            # Combine all data
-            self.progress_var.set(0.9)
-            self.status_label.configure(text="Consolidating data and generating report...")
-            self.log_message("🔄 Combining all data sources...")
-            
-            if all_data:
-                final_df = pd.concat(all_data, ignore_index=True)
-                final_columns = [
-                    "Return TID", "Return Type", "SKU", "Units", "Courier Partner",
-                    "Sales Channel", "OID", "Forward TID", "Status of Return at the time of Capture",
-                    "Cx Subject", "Cx Comment"
-                ]
-                final_df = final_df[final_columns]
-                
-                # Copy template to output location
-                shutil.copy(TEMPLATE_PATH, output_excel_path)
-                
-                # Load workbook and write data
-                wb = load_workbook(output_excel_path)
-                ws = wb["Data"]
-                
-                # Write dataframe starting from A2
-                for row_idx, row in enumerate(final_df.itertuples(index=False), start=2):
-                    for col_idx, value in enumerate(row, start=1):
-                        ws.cell(row=row_idx, column=col_idx, value=value)
-                
-                # Add current date to O7 and O8
-                today_str = datetime.today().strftime('%d-%m-%Y')
-                ws["O7"] = today_str
-                ws["O8"] = today_str
-                
-                wb.save(output_excel_path)
-                
-                self.progress_var.set(1.0)
-                self.status_label.configure(text="✅ Processing completed successfully!")
-                self.log_message(f"✅ Total records processed: {len(final_df)}")
-                self.log_message(f"✅ Output saved to: {output_excel_path}")
-                
-                # Enable output buttons
-                self.open_output_btn.configure(state="normal")
-                self.open_report_btn.configure(state="normal")
-                
-            else:
-                raise Exception("No data was successfully processed from any source")
+            # Enable output buttons
+            self.open_output_btn.configure(state="normal")
+            self.open_report_btn.configure(state="normal")
                 
         except Exception as e:
-            self.progress_var.set(0)
-            self.status_label.configure(text="❌ Processing failed")
+            self.update_progress(0, "❌ Processing failed")
             self.log_message(f"❌ Error during processing: {str(e)}")
             
         finally:
             self.process_btn.configure(state="normal", text="🚀 Start Returns Processing")
             
+    def write_report(self, final_df, output_excel_path):
+        """Write final_df into the template's "Data" sheet from A2 and stamp today's date in O7/O8"""
+        returns.write_report(final_df, output_excel_path, TEMPLATE_PATH, self.log_message)
+            
     def open_output_folder(self):
         """Open the output folder in file explorer"""
         try:
@@ -0,0 +1,73 @@
+"""
+Benchmark: reading a wide Flipkart export, full read vs the schema reader.
+Compares pd.read_csv on the whole file (as the readers did before) with
+reportprocessor.ingest.read_source on the c and pyarrow engines; prints parse
+time and the in-memory size of the resulting frame.
+
+Usage:
+    python benchmarks/bench_ingest.py [--rows 200000] [--extra-columns 30]
+"""
+import argparse
+import csv
+import random
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from reportprocessor import ingest  # noqa: E402
+
+STATUSES = ["Approved", "Ready to dispatch", "Shipped", "Cancelled"]
+
+
+def write_flipkart_export(path, rows, extra_columns, seed=0):
+    """Flipkart pickup export: order/tracking/SKU columns among many others, Order ID in column 4"""
+    rng = random.Random(seed)
+    header = ["Ordered On", "Shipment ID", "ORDER ITEM ID", "Order Id", "Order State", "SKU", "Quantity",
+              "Tracking ID", "Invoice Amount"] + [f"Extra {i}" for i in range(extra_columns)]
+    with open(path, "w", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(header)
+        for i in range(rows):
+            writer.writerow([
+                "2025-01-01 10:00:00", f"SH{i:010d}", f"{rng.randrange(10**15, 10**16)}", f"OD{rng.randrange(10**17, 10**18)}",
+                rng.choice(STATUSES), f"SKU-{rng.randrange(2000):04d}", rng.randint(1, 3),
+                f"FMPP{rng.randrange(10**9, 10**10)}", f"{rng.randrange(100, 5000)}.00",
+            ] + [f"value {rng.randrange(1000)}" for _ in range(extra_columns)])
+
+
+def timed(func):
+    start = time.perf_counter()
+    df = func()
+    return time.perf_counter() - start, df.memory_usage(deep=True).sum()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--rows", type=int, default=200000, help="rows in the export")
+    parser.add_argument("--extra-columns", type=int, default=30, help="columns the reports don't use")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / "Flipkart KC.csv"
+        write_flipkart_export(path, args.rows, args.extra_columns)
+        print(f"{args.rows} rows x {9 + args.extra_columns} columns, {path.stat().st_size / 2**20:.1f} MiB on disk")
+
+        runs = [
+            ("full read_csv", lambda: pd.read_csv(path)),
+            ("schema, c", lambda: ingest.read_source(path, ingest.FLIPKART_PICKUP, engine="c")),
+        ]
+        if ingest.csv_engine("pyarrow") == "pyarrow":
+            runs.append(("schema, pyarrow", lambda: ingest.read_source(path, ingest.FLIPKART_PICKUP, engine="pyarrow")))
+
+        for label, func in runs:
+            seconds, size = timed(func)
+            print(f"{label:<16} {seconds:7.2f} s   {size / 2**20:8.1f} MiB in memory")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,50 @@
+"""
+Benchmark: Manifest.pdf extraction, text-layer fast path vs extract_tables().
+
+Usage:
+    python benchmarks/bench_manifest.py [--pages 300] [--rows 40]
+"""
+import argparse
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from reportprocessor.manifest import iter_manifest_pages  # noqa: E402
+from synthetic import write_manifest_pdf  # noqa: E402
+
+
+def timed(func, *args, **kwargs):
+    start = time.perf_counter()
+    result = list(func(*args, **kwargs))
+    return time.perf_counter() - start, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--pages", type=int, default=300, help="table pages in the synthetic manifest")
+    parser.add_argument("--rows", type=int, default=40, help="rows per table page")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        pdf_path = Path(tmp) / "Manifest.pdf"
+        expected = write_manifest_pdf(pdf_path, args.pages, args.rows)
+        print(f"Synthetic manifest: {args.pages} pages x {args.rows} rows ({pdf_path.stat().st_size / 1e6:.1f} MB)")
+
+        table_time, table_pages = timed(iter_manifest_pages, pdf_path, workers=1, fast=False)
+        fast_time, fast_pages = timed(iter_manifest_pages, pdf_path, workers=1, fast=True)
+
+    want = [(courier, [(row[1], row[2]) for row in rows]) for courier, rows in expected]
+    print(f"extract_tables(): {table_time:8.2f} s  ({args.pages / table_time:6.1f} pages/s)  correct={table_pages == want}")
+    print(f"fast path:        {fast_time:8.2f} s  ({args.pages / fast_time:6.1f} pages/s)  correct={fast_pages == want}")
+    print(f"speed-up:         {table_time / fast_time:8.2f} x")
+
+    if table_pages != fast_pages:
+        print("MISMATCH between fast path and extract_tables() output", file=sys.stderr)
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,73 @@
+"""
+Benchmark: pickup pivot images, matplotlib table vs the Pillow renderer.
+Renders one pivot and then the three pickup pivots concurrently, for matplotlib
+at 300 dpi and Pillow at 300 dpi and PIVOT_DPI; prints wall time and file size.
+
+Usage:
+    python benchmarks/bench_pivots.py [--skus 400] [--rows 8000]
+"""
+import argparse
+import random
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from reportprocessor import pivots  # noqa: E402
+from reportprocessor.pickup import create_pivot_image  # noqa: E402
+
+SOURCES = ["Sellerflex", "Flipkart KC", "Flipkart LL"]
+
+
+def pickup_frame(skus, rows, seed=0):
+    rng = random.Random(seed)
+    return pd.DataFrame({
+        "SKU": [f"SKU-{rng.randrange(skus):05d}-{'XL' if rng.random() < 0.5 else 'M'}" for _ in range(rows)],
+        "Quantity": [rng.randint(1, 3) for _ in range(rows)],
+    })
+
+
+def quiet(message, level="INFO"):
+    if level == "ERROR":
+        print(f"  {level}: {message}")
+
+
+def render(frames, out_dir, renderer, dpi):
+    """Render one image per frame concurrently; returns (seconds, total bytes)"""
+    pivots.PIVOT_DPI = dpi
+    jobs = [(df, ("SKU", "Quantity"), f"{name} Pivot Table", out_dir / f"{renderer}_{dpi}_{name.replace(' ', '_')}_pivot.png")
+            for name, df in frames]
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=len(jobs)) as pool:
+        list(pool.map(lambda job: create_pivot_image(*job, log=quiet, renderer=renderer), jobs))
+    seconds = time.perf_counter() - start
+    size = sum(path.stat().st_size for _, _, _, path in jobs if path.exists())
+    return seconds, size
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--skus", type=int, default=400, help="distinct SKUs per source")
+    parser.add_argument("--rows", type=int, default=8000, help="CSV rows per source")
+    args = parser.parse_args()
+
+    frames = [(name, pickup_frame(args.skus, args.rows, seed)) for seed, name in enumerate(SOURCES)]
+    print(f"{len(SOURCES)} sources, {args.rows} rows and up to {args.skus} SKUs each")
+
+    configs = [("matplotlib", 300), ("pillow", 300), ("pillow", pivots.PIVOT_DPI)]
+    with tempfile.TemporaryDirectory() as tmp:
+        out_dir = Path(tmp)
+        for renderer, dpi in configs:
+            single, single_size = render(frames[:1], out_dir, renderer, dpi)
+            concurrent, total_size = render(frames, out_dir, renderer, dpi)
+            print(f"{renderer:<10} {dpi:>3} dpi:  one {single:6.2f} s ({single_size / 1024:8.0f} KiB)"
+                  f"   three concurrent {concurrent:6.2f} s ({total_size / 1024:8.0f} KiB)")
+
+
+if __name__ == "__main__":
+    main()
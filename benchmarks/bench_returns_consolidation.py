@@ -0,0 +1,80 @@
+"""
+Benchmark: Returns consolidation, whole-frame vs chunked streaming.
+Generates the four return exports and runs process_returns with each
+consolidation mode in its own process, so peak RSS is measured independently.
+
+Usage:
+    python benchmarks/bench_returns_consolidation.py [--rows 250000] [--chunk-rows 50000]
+"""
+import argparse
+import json
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from bench_returns_output import make_template  # noqa: E402
+from synthetic import write_returns_exports  # noqa: E402
+
+
+def max_rss_mb():
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def run_mode(mode, input_dir, template, output, chunk_rows):
+    from reportprocessor import returns
+
+    returns.CHUNK_ROWS = chunk_rows
+    rss_before = max_rss_mb()
+    start = time.perf_counter()
+    returns.process_returns(Path(input_dir), Path(template), Path(output), log=lambda *args: None, consolidation=mode,
+                            store_path=Path(output).with_suffix(".sqlite3"))
+    return {
+        "mode": mode,
+        "seconds": time.perf_counter() - start,
+        "rss_before_mb": rss_before,
+        "peak_rss_mb": max_rss_mb(),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--rows", type=int, default=250000, help="rows per export")
+    parser.add_argument("--chunk-rows", type=int, default=50000, help="rows per chunk in chunked mode")
+    parser.add_argument("--mode", choices=["frame", "chunked"], help=argparse.SUPPRESS)
+    parser.add_argument("--input-dir", help=argparse.SUPPRESS)
+    parser.add_argument("--template", help=argparse.SUPPRESS)
+    parser.add_argument("--output", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.mode:
+        print(json.dumps(run_mode(args.mode, args.input_dir, args.template, args.output, args.chunk_rows)))
+        return
+
+    with tempfile.TemporaryDirectory() as tmp:
+        input_dir = Path(tmp) / "inputs"
+        input_dir.mkdir()
+        write_returns_exports(input_dir, args.rows)
+        template = Path(tmp) / "ReturnsReconcileReport.xlsx"
+        make_template(template)
+        size = sum(path.stat().st_size for path in input_dir.iterdir())
+        print(f"4 exports x {args.rows} rows, {size / 2**20:.0f} MiB of CSV")
+
+        for mode in ("frame", "chunked"):
+            output = Path(tmp) / f"{mode}.xlsx"
+            child = subprocess.run(
+                [sys.executable, __file__, "--mode", mode, "--chunk-rows", str(args.chunk_rows),
+                 "--input-dir", str(input_dir), "--template", str(template), "--output", str(output)],
+                check=True, capture_output=True, text=True
+            )
+            result = json.loads(child.stdout)
+            print(f"{mode:8s} {result['seconds']:8.2f} s   peak RSS {result['peak_rss_mb']:7.1f} MB "
+                  f"(+{result['peak_rss_mb'] - result['rss_before_mb']:.1f} MB over imports)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,114 @@
+"""
+Benchmark: writing the Returns Reconcile Report, streaming template writer vs
+openpyxl load/write/save. Each engine runs in its own process so peak RSS is
+measured independently.
+
+Usage:
+    python benchmarks/bench_returns_output.py [--rows 100000]
+"""
+import argparse
+import json
+import resource
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from synthetic import RETURNS_COLUMNS, returns_rows  # noqa: E402
+
+
+def make_template(path):
+    """Template shaped like ReturnsReconcileReport.xlsx: a styled "Data" header plus a formula sheet"""
+    from openpyxl import Workbook
+    from openpyxl.styles import Font
+
+    wb = Workbook()
+    ws = wb.active
+    ws.title = "Data"
+    for col, name in enumerate(RETURNS_COLUMNS, start=1):
+        ws.cell(row=1, column=col, value=name).font = Font(bold=True)
+    ws["N7"] = "From"
+    ws["N8"] = "To"
+    summary = wb.create_sheet("Summary")
+    summary["A1"] = "Total returns"
+    summary["B1"] = "=COUNTA(Data!A:A)-1"
+    summary["A2"] = "Units"
+    summary["B2"] = "=SUM(Data!D:D)"
+    wb.save(path)
+
+
+def max_rss_mb():
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def run_engine(engine, rows, template, output):
+    import pandas as pd
+
+    final_df = pd.DataFrame(list(returns_rows(rows)), columns=RETURNS_COLUMNS)
+    rss_before = max_rss_mb()
+    today_str = "01-01-2026"
+    start = time.perf_counter()
+
+    if engine == "stream":
+        from reportprocessor.xlsxstream import write_rows_into_template
+
+        write_rows_into_template(
+            template, output, "Data", final_df.itertuples(index=False, name=None),
+            start_row=2, cells={"O7": today_str, "O8": today_str}
+        )
+    else:
+        from openpyxl import load_workbook
+
+        shutil.copy(template, output)
+        wb = load_workbook(output)
+        ws = wb["Data"]
+        for row_idx, row in enumerate(final_df.itertuples(index=False), start=2):
+            for col_idx, value in enumerate(row, start=1):
+                ws.cell(row=row_idx, column=col_idx, value=value)
+        ws["O7"] = today_str
+        ws["O8"] = today_str
+        wb.save(output)
+
+    return {
+        "engine": engine,
+        "seconds": time.perf_counter() - start,
+        "rss_before_mb": rss_before,
+        "peak_rss_mb": max_rss_mb(),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--rows", type=int, default=100000, help="combined returns rows")
+    parser.add_argument("--engine", choices=["stream", "openpyxl"], help=argparse.SUPPRESS)
+    parser.add_argument("--template", help=argparse.SUPPRESS)
+    parser.add_argument("--output", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.engine:
+        print(json.dumps(run_engine(args.engine, args.rows, args.template, args.output)))
+        return
+
+    with tempfile.TemporaryDirectory() as tmp:
+        template = Path(tmp) / "ReturnsReconcileReport.xlsx"
+        make_template(template)
+        print(f"{args.rows} rows x {len(RETURNS_COLUMNS)} columns")
+        for engine in ("openpyxl", "stream"):
+            output = Path(tmp) / f"{engine}.xlsx"
+            child = subprocess.run(
+                [sys.executable, __file__, "--engine", engine, "--rows", str(args.rows),
+                 "--template", str(template), "--output", str(output)],
+                check=True, capture_output=True, text=True
+            )
+            result = json.loads(child.stdout)
+            print(f"{engine:9s} {result['seconds']:8.2f} s   peak RSS {result['peak_rss_mb']:7.1f} MB "
+                  f"(+{result['peak_rss_mb'] - result['rss_before_mb']:.1f} MB over input frame)   "
+                  f"file {output.stat().st_size / 1e6:.1f} MB")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,89 @@
+"""
+Benchmark: tracking-ID writes into a template with many merged ranges.
+Compares the linear merged-range scan (old safe_write), per-cell writes through
+the MergedCellIndex, and the bulk write_column path.
+
+Usage:
+    python benchmarks/bench_safe_write.py [--ids 1000] [--merged 200]
+"""
+import argparse
+import sys
+import time
+from pathlib import Path
+
+from openpyxl import Workbook
+from openpyxl.utils import get_column_letter
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from reportprocessor.excel import merged_index, write_cell, write_column  # noqa: E402
+
+TRACKING_COLUMNS = ["A", "D", "E", "F", "G", "H", "I"]
+START_ROW = 3
+
+
+def make_template(merged_ranges):
+    """Sheet shaped like "Entry tracking ID": merged blocks in the tracking columns and to the right"""
+    wb = Workbook()
+    ws = wb.active
+    ws.title = "Entry tracking ID"
+    ws.merge_cells("A1:I1")
+    for i in range(merged_ranges):
+        row = 2 + (i // 4) * 2
+        col = 11 + (i % 4) * 2
+        ws.merge_cells(start_row=row, start_column=col, end_row=row + 1, end_column=col + 1)
+    return wb, ws
+
+
+def linear_write(ws, col, row, value):
+    """The pre-index safe_write: scan every merged range for every cell"""
+    cell_coord = f"{col}{row}"
+    for merged_range in ws.merged_cells.ranges:
+        if cell_coord in merged_range:
+            top_col, top_row = merged_range.bounds[:2]
+            ws[f"{get_column_letter(top_col)}{top_row}"] = value
+            return
+    ws[cell_coord] = value
+
+
+def indexed_write_numeric(ws, col, row, value):
+    """Per-cell path as process_files used it: isdigit check, then an indexed write"""
+    write_cell(ws, col, row, value if not str(value).isdigit() else int(value))
+
+
+def run(writer, ids, merged_ranges):
+    wb, ws = make_template(merged_ranges)
+    start = time.perf_counter()
+    if writer is not linear_write:
+        merged_index(ws, rebuild=True)
+    for col in TRACKING_COLUMNS:
+        if writer is write_column:
+            write_column(ws, col, START_ROW, ids, numeric=True)
+            continue
+        for row, tid in enumerate(ids, START_ROW):
+            writer(ws, col, row, tid)
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--ids", type=int, default=1000, help="tracking IDs per column")
+    parser.add_argument("--merged", type=int, default=200, help="merged ranges in the template")
+    parser.add_argument("--skip-linear", action="store_true", help="skip the slow linear-scan baseline")
+    args = parser.parse_args()
+
+    ids = [str(10**12 + i) for i in range(args.ids)]
+    cells = args.ids * len(TRACKING_COLUMNS)
+    print(f"{cells} cells across {len(TRACKING_COLUMNS)} columns, {args.merged + 1} merged ranges")
+
+    if not args.skip_linear:
+        linear = run(linear_write, ids, args.merged)
+        print(f"linear scan:  {linear:8.2f} s  ({cells / linear:10.0f} cells/s)")
+    indexed = run(indexed_write_numeric, ids, args.merged)
+    print(f"indexed cell: {indexed:8.2f} s  ({cells / indexed:10.0f} cells/s)")
+    bulk = run(write_column, ids, args.merged)
+    print(f"bulk column:  {bulk:8.2f} s  ({cells / bulk:10.0f} cells/s)")
+
+
+if __name__ == "__main__":
+    main()
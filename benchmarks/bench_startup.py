@@ -0,0 +1,84 @@
+"""
+Benchmark: cost of opening a module screen from the homepage. Each case runs
+in a fresh interpreter, so every import is cold.
+
+  gui only     - loading the module file through ModuleRegistry (what a tile click costs now)
+  with engine  - the same plus the engine import, i.e. what a tile click cost when the
+                 module files imported pandas/openpyxl/pdfplumber/matplotlib at the top
+  cached       - a second navigation to the same module
+  prewarm      - the background import started after the homepage renders
+
+No display is needed: the module files are loaded but their GUI classes are not created.
+
+Usage:
+    python benchmarks/bench_startup.py [--repeat 3]
+"""
+import argparse
+import json
+import statistics
+import subprocess
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+
+MODULES = {
+    "Pickupreportexe.py": "reportprocessor.pickup",
+    "Returnsreportexe.py": "reportprocessor.returns",
+    "Cancellationexe.py": "reportprocessor.cancellation",
+}
+
+CHILD = """
+import importlib, json, sys, time
+sys.path.insert(0, {root!r})
+from reportprocessor.registry import ModuleRegistry, prewarm
+registry = ModuleRegistry()
+result = {{}}
+start = time.perf_counter()
+registry.load({module_file!r})
+result["gui only"] = time.perf_counter() - start
+start = time.perf_counter()
+registry.load({module_file!r})
+result["cached"] = time.perf_counter() - start
+start = time.perf_counter()
+importlib.import_module({engine!r})
+result["with engine"] = result["gui only"] + time.perf_counter() - start
+print(json.dumps(result))
+"""
+
+PREWARM_CHILD = """
+import json, sys, time
+sys.path.insert(0, {root!r})
+import customtkinter
+from reportprocessor.registry import prewarm
+start = time.perf_counter()
+timings = prewarm()
+print(json.dumps({{"prewarm": time.perf_counter() - start, "modules": timings}}))
+"""
+
+
+def run_child(code):
+    child = subprocess.run([sys.executable, "-c", code], cwd=ROOT, check=True, capture_output=True, text=True)
+    return json.loads(child.stdout.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=3, help="fresh interpreters per case (median is reported)")
+    args = parser.parse_args()
+
+    for module_file, engine in MODULES.items():
+        runs = [run_child(CHILD.format(root=str(ROOT), module_file=str(ROOT / module_file), engine=engine))
+                for _ in range(args.repeat)]
+        cells = "   ".join(f"{case} {statistics.median(run[case] for run in runs) * 1000:7.1f} ms"
+                           for case in ("gui only", "with engine", "cached"))
+        print(f"{module_file:22s} {cells}")
+
+    runs = [run_child(PREWARM_CHILD.format(root=str(ROOT))) for _ in range(args.repeat)]
+    print(f"{'prewarm (background)':22s} {statistics.median(run['prewarm'] for run in runs) * 1000:7.1f} ms")
+    slowest = sorted(runs[-1]["modules"].items(), key=lambda item: -(item[1] or 0))[:3]
+    print("  slowest: " + ", ".join(f"{name} {seconds * 1000:.0f} ms" for name, seconds in slowest if seconds))
+
+
+if __name__ == "__main__":
+    main()
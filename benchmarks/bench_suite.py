@@ -0,0 +1,234 @@
+"""
+Benchmark suite: the Pickup, Returns and Cancellation engines end to end on synthetic inputs.
+
+For each scale the suite generates a full set of inputs (Sellerflex and Flipkart
+KC/LL pickup exports, the four return exports, Flipkart cancellation exports,
+Meesho_data.csv and a multi-courier Manifest.pdf) in a scratch folder, then runs
+every report headless in its own process with the engines' folders pointed at
+that scratch folder. Wall time, peak RSS and the per-stage timings
+(reportprocessor.timing) of each run are appended to a JSON Lines results file
+together with the git commit, so runs can be compared across commits.
+
+Scales (rows per CSV export, manifest table pages):
+    small  1,000 rows,    10 pages
+    medium 10,000 rows,  100 pages
+    large  100,000 rows, 1000 pages
+
+Usage:
+    python benchmarks/bench_suite.py [--scales small,medium] [--reports pickup,returns,cancellation]
+                                     [--results benchmarks/results.jsonl] [--note TEXT]
+    python benchmarks/bench_suite.py --compare [--results benchmarks/results.jsonl]
+"""
+import argparse
+import json
+import os
+import platform
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+from bench_returns_output import make_template as make_returns_template  # noqa: E402
+from synthetic import (write_cancellation_inputs, write_manifest_pdf, write_pickup_exports,  # noqa: E402
+                       write_pickup_template, write_returns_exports)
+
+SCALES = {
+    "small": (1_000, 10),
+    "medium": (10_000, 100),
+    "large": (100_000, 1000),
+}
+REPORTS = ("pickup", "returns", "cancellation")
+DEFAULT_RESULTS = Path(__file__).resolve().parent / "results.jsonl"
+
+
+def max_rss_mb():
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def quiet(message, level="INFO"):
+    pass
+
+
+def generate_inputs(workspace, rows, pages):
+    """Write every report's inputs under workspace (the layout run_report() expects)"""
+    pickup_dir = workspace / "pickup"
+    returns_dir = workspace / "returns"
+    cancel_dir = workspace / "cancel"
+    for directory in (pickup_dir, returns_dir, cancel_dir):
+        directory.mkdir(parents=True)
+
+    order_ids = write_pickup_exports(pickup_dir, rows)
+    manifest = write_manifest_pdf(pickup_dir / "Manifest.pdf", pages)
+    write_pickup_template(workspace / "Pickup Report.xlsx")
+
+    write_returns_exports(returns_dir, rows)
+    make_returns_template(workspace / "ReturnsReconcileReport.xlsx")
+
+    write_cancellation_inputs(cancel_dir, order_ids, manifest)
+
+
+def run_report(report, workspace):
+    """
+    Run one report on the inputs in workspace; runs in the child process.
+    Returns:
+        dict with seconds, peak RSS and the run's stage timings
+    """
+    workspace = Path(workspace)
+
+    # Point every folder the engines write to at the workspace, before the engines are imported.
+    # Each report gets its own cache so every run parses its inputs cold.
+    from reportprocessor import paths
+    paths.OUTPUT_DIR = workspace / "Output"
+    paths.PIVOT_PNG_DIR = paths.OUTPUT_DIR / "Pivot_PNGs"
+    paths.CACHE_DIR = workspace / f"Cache-{report}"
+    paths.LOG_FILE = workspace / "Logs" / "reportprocessor.log"
+    paths.CANCEL_OUTPUT_FILE = workspace / "OutputDIR" / "Cancel_product_report.xlsx"
+
+    from reportprocessor import cancellation, pickup, returns, timing
+
+    rss_before = max_rss_mb()
+    start = time.perf_counter()
+    with timing.run(report, quiet) as active:
+        if report == "pickup":
+            pickup.process_pickup(workspace / "Pickup Report.xlsx", paths.OUTPUT_DIR / "Pickup Report.xlsx",
+                                  workspace / "pickup", log=quiet)
+        elif report == "returns":
+            returns.process_returns(workspace / "returns", workspace / "ReturnsReconcileReport.xlsx",
+                                    paths.OUTPUT_DIR / "Returns Reconcile Report.xlsx", log=quiet,
+                                    store_path=workspace / "returns.sqlite3")
+        else:
+            combined_df = cancellation.process_cancellations(workspace / "cancel", workspace / "pickup",
+                                                             paths.CACHE_DIR, log=quiet)
+            cancellation.report_cancellations(combined_df, paths.CANCEL_OUTPUT_FILE, log=quiet)
+    seconds = time.perf_counter() - start
+
+    return {
+        "seconds": round(seconds, 3),
+        "rss_before_mb": round(rss_before, 1),
+        "peak_rss_mb": round(max_rss_mb(), 1),
+        "stages": active.report()["stages"],
+    }
+
+
+def git_revision():
+    """(short commit, True if the tree has uncommitted changes); (None, False) outside a git checkout"""
+    try:
+        commit = subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, check=True,
+                                capture_output=True, text=True).stdout.strip()
+        status = subprocess.run(["git", "status", "--porcelain", "--untracked-files=no"], cwd=ROOT, check=True,
+                                capture_output=True, text=True).stdout
+        return commit, bool(status.strip())
+    except (OSError, subprocess.CalledProcessError):
+        return None, False
+
+
+def run_suite(scales, reports, results_path, note=None):
+    commit, dirty = git_revision()
+    environment = {
+        "commit": commit,
+        "dirty": dirty,
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpus": os.cpu_count(),
+        "note": note,
+    }
+    print(f"commit {commit or '?'}{' (uncommitted changes)' if dirty else ''}, Python {environment['python']}, "
+          f"{environment['cpus']} CPU(s)")
+
+    for scale in scales:
+        rows, pages = SCALES[scale]
+        with tempfile.TemporaryDirectory() as tmp:
+            workspace = Path(tmp)
+            start = time.perf_counter()
+            generate_inputs(workspace, rows, pages)
+            print(f"\n{scale}: {rows:,} rows per export, {pages} manifest pages "
+                  f"(inputs generated in {time.perf_counter() - start:.1f} s)")
+
+            for report in reports:
+                child = subprocess.run([sys.executable, __file__, "--child", report, "--workspace", str(workspace)],
+                                       capture_output=True, text=True)
+                record = {
+                    "timestamp": datetime.now().isoformat(timespec="seconds"),
+                    **environment,
+                    "scale": scale,
+                    "rows": rows,
+                    "pages": pages,
+                    "report": report,
+                }
+                if child.returncode == 0:
+                    record.update(status="ok", **json.loads(child.stdout.splitlines()[-1]))
+                    stages = ", ".join(f"{name} {values['seconds']:.2f}" for name, values in record["stages"].items())
+                    print(f"  {report:<13} {record['seconds']:8.2f} s  peak RSS {record['peak_rss_mb']:7.1f} MB  [{stages}]")
+                else:
+                    error = (child.stderr.strip().splitlines() or ["no output"])[-1]
+                    record.update(status="failed", error=error)
+                    print(f"  {report:<13} failed: {error}")
+
+                with open(results_path, "a", encoding="utf-8") as f:
+                    f.write(json.dumps(record) + "\n")
+
+    print(f"\nResults appended to {results_path}")
+
+
+def compare(results_path):
+    """For each report and scale, the latest result next to the latest one from a different commit"""
+    latest = {}
+    previous = {}
+    with open(results_path, encoding="utf-8") as f:
+        for line in f:
+            record = json.loads(line)
+            if record.get("status") != "ok":
+                continue
+            key = (record["report"], record["scale"])
+            current = latest.get(key)
+            if current is not None and current["commit"] != record["commit"]:
+                previous[key] = current
+            latest[key] = record
+
+    print(f"{'report':<13} {'scale':<7} {'before':>16} {'after':>16} {'time':>8} {'peak RSS':>10}")
+    for key, after in latest.items():
+        before = previous.get(key)
+        label = f"{after['commit']}{'+' if after['dirty'] else ''}"
+        if before is None:
+            print(f"{key[0]:<13} {key[1]:<7} {'-':>16} {label:>16} {after['seconds']:7.2f}s {after['peak_rss_mb']:8.1f}MB")
+            continue
+        time_change = (after["seconds"] - before["seconds"]) / before["seconds"] * 100 if before["seconds"] else 0.0
+        rss_change = after["peak_rss_mb"] - before["peak_rss_mb"]
+        print(f"{key[0]:<13} {key[1]:<7} {before['commit'] + ('+' if before['dirty'] else ''):>16} {label:>16} "
+              f"{time_change:+7.1f}% {rss_change:+8.1f}MB")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--scales", default="small,medium", help=f"comma-separated, from {', '.join(SCALES)}")
+    parser.add_argument("--reports", default=",".join(REPORTS), help=f"comma-separated, from {', '.join(REPORTS)}")
+    parser.add_argument("--results", type=Path, default=DEFAULT_RESULTS, help="JSON Lines file the results are appended to")
+    parser.add_argument("--note", help="free text stored with every result of this run")
+    parser.add_argument("--compare", action="store_true", help="compare the latest results with the previous commit's")
+    parser.add_argument("--child", choices=REPORTS, help=argparse.SUPPRESS)
+    parser.add_argument("--workspace", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        print(json.dumps(run_report(args.child, args.workspace)))
+        return
+    if args.compare:
+        compare(args.results)
+        return
+
+    scales = [scale.strip() for scale in args.scales.split(",") if scale.strip()]
+    reports = [report.strip() for report in args.reports.split(",") if report.strip()]
+    unknown = [name for name in scales if name not in SCALES] + [name for name in reports if name not in REPORTS]
+    if unknown:
+        parser.error(f"unknown scale/report: {', '.join(unknown)}")
+    run_suite(scales, reports, args.results, args.note)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,257 @@
+"""
+Synthetic marketplace inputs for the benchmarks.
+
+Everything here is generated with the standard library only, so the benchmarks
+run offline on a bare Linux box.
+"""
+import csv
+import random
+from datetime import date
+
+RETURNS_COLUMNS = [
+    "Return TID", "Return Type", "SKU", "Units", "Courier Partner",
+    "Sales Channel", "OID", "Forward TID", "Status of Return at the time of Capture",
+    "Cx Subject", "Cx Comment"
+]
+RETURNS_CHANNELS = [("Meesho", "Delhivery"), ("Flipkart KC", "Ekart"), ("Flipkart LL", "Ekart"), ("Amazon KC -flex", "ATSIN")]
+RETURN_TYPES = ["Customer Return", "Courier Return", "RTO"]
+RETURN_STATUSES = ["In Transit", "Delivered", "Out for Delivery", "Return Completed"]
+
+MANIFEST_COURIERS = ["Delhivery", "Ecom Express", "Xpressbees", "Shadowfax"]
+MANIFEST_HEADER = ["S.No", "Sub Order No", "AWB Number", "SKU", "Qty"]
+MANIFEST_COL_WIDTHS = [40, 150, 120, 150, 40]
+
+
+def _pdf_escape(text):
+    return text.replace("\\", "\\\\").replace("(", "\\(").replace(")", "\\)")
+
+
+def _manifest_page_stream(courier, rows):
+    """Content stream for one A4 manifest page: courier line plus a ruled table"""
+    ops = ["BT /F1 11 Tf 40 800 Td (%s) Tj ET" % _pdf_escape(f"Courier : {courier}")]
+
+    row_height = 16
+    left = 40
+    top = 780
+    table_rows = [MANIFEST_HEADER] + rows
+    right = left + sum(MANIFEST_COL_WIDTHS)
+    bottom = top - row_height * len(table_rows)
+
+    ops.append("0.5 w")
+    for i in range(len(table_rows) + 1):
+        y = top - i * row_height
+        ops.append(f"{left} {y} m {right} {y} l S")
+    x = left
+    for width in [0] + MANIFEST_COL_WIDTHS:
+        x += width
+        ops.append(f"{x} {top} m {x} {bottom} l S")
+
+    for i, row in enumerate(table_rows):
+        y = top - (i + 1) * row_height + 5
+        x = left
+        for width, value in zip(MANIFEST_COL_WIDTHS, row):
+            ops.append("BT /F1 8 Tf %d %d Td (%s) Tj ET" % (x + 3, y, _pdf_escape(str(value))))
+            x += width
+    return "\n".join(ops).encode("latin-1")
+
+
+def returns_rows(count, seed=0):
+    """Yield rows in the 11-column consolidated Returns Reconcile layout (RETURNS_COLUMNS)"""
+    rng = random.Random(seed)
+    for i in range(count):
+        channel, courier = RETURNS_CHANNELS[i % len(RETURNS_CHANNELS)]
+        return_type = rng.choice(RETURN_TYPES)
+        yield (
+            str(rng.randrange(10**12, 10**13)),
+            return_type,
+            f"SKU-{rng.randrange(2000):04d}",
+            rng.randint(1, 3),
+            courier,
+            channel,
+            f"OD{rng.randrange(10**15, 10**16)}",
+            str(rng.randrange(10**12, 10**13)) if channel == "Amazon KC -flex" else "",
+            rng.choice(RETURN_STATUSES),
+            return_type,
+            "Size issue" if rng.random() < 0.3 else "",
+        )
+
+
+RETURNS_EXPORT_HEADERS = {
+    "Returns Meesho.csv": ["AWB Number", "Type of Return", "SKU", "Qty", "Courier Partner", "Order Number",
+                           "Return Reason", "Detailed Return Reason"],
+    "Returns Flipkart KC.csv": ["Tracking ID", "Return Type", "SKU", "Quantity", "Order ID", "Return Status",
+                                "Return Sub-reason"],
+    "Returns Flipkart LL.csv": ["Tracking ID", "Return Type", "SKU", "Quantity", "Order ID", "Return Status",
+                                "Return Sub-reason"],
+    "Returns SellerFlex.csv": ["Reverse Leg Tracking ID", "Return Type", "mSKU", "Units", "Customer Order ID",
+                               "Forward Leg Tracking ID", "Return Status"],
+}
+
+
+def write_returns_exports(directory, rows, extra_columns=20, seed=0):
+    """
+    Write the four marketplace return exports into directory, rows each, with
+    extra_columns unused columns per file (the Meesho export gets its 7 preamble lines).
+    """
+    rng = random.Random(seed)
+    for filename, header in RETURNS_EXPORT_HEADERS.items():
+        with open(directory / filename, "w", newline="") as f:
+            if "Meesho" in filename:
+                f.write("Returns report\n" + "\n" * 6)
+            writer = csv.writer(f)
+            writer.writerow(header + [f"Extra {i}" for i in range(extra_columns)])
+            for _ in range(rows):
+                return_type = rng.choice(RETURN_TYPES)
+                values = {
+                    "AWB Number": rng.randrange(10**12, 10**13), "Tracking ID": f"FMPR{rng.randrange(10**9, 10**10)}",
+                    "Reverse Leg Tracking ID": rng.randrange(10**12, 10**13), "Forward Leg Tracking ID": rng.randrange(10**12, 10**13),
+                    "Type of Return": return_type, "Return Type": return_type,
+                    "SKU": f"SKU-{rng.randrange(2000):04d}", "mSKU": f"SKU-{rng.randrange(2000):04d}",
+                    "Qty": rng.randint(1, 3), "Quantity": rng.randint(1, 3), "Units": rng.randint(1, 3),
+                    "Courier Partner": rng.choice(MANIFEST_COURIERS),
+                    "Order Number": rng.randrange(10**15, 10**16), "Order ID": f"OD{rng.randrange(10**15, 10**16)}",
+                    "Customer Order ID": f"408-{rng.randrange(10**6, 10**7)}-{rng.randrange(10**6, 10**7)}",
+                    "Return Status": rng.choice(RETURN_STATUSES), "Return Reason": "Size issue",
+                    "Detailed Return Reason": "Too small", "Return Sub-reason": "Size issue",
+                }
+                writer.writerow([values[name] for name in header] + [f"value {rng.randrange(1000)}" for _ in range(extra_columns)])
+
+
+PICKUP_EXPORT_HEADERS = {
+    "Sellerflex.csv": ["Shipment ID", "Customer Order ID", "Shipment Tracking ID", "MSKU", "Units", "Ship By"],
+    "Flipkart KC.csv": ["Ordered On", "Shipment ID", "ORDER ITEM ID", "Order Id", "Order State", "SKU", "Quantity",
+                        "Tracking ID", "Invoice Amount"],
+    "Flipkart LL.csv": ["Ordered On", "Shipment ID", "ORDER ITEM ID", "Order Id", "Order State", "SKU", "Quantity",
+                        "Tracking ID", "Invoice Amount"],
+}
+PICKUP_TRACKING_COLUMNS = ["Sellerflex", "", "", "Flipkart KC", "Flipkart LL", "Meesho - Xpressbees",
+                           "Meesho - Ecom Express", "Meesho - Delhivery", "Others"]
+CANCELLATION_TYPES = ["Cancelled by buyer", "Cancelled by seller", "Cancelled by marketplace"]
+MEESHO_STATUSES = ["DELIVERED", "CANCELLED", "RTO", "DELIVERED", "DELIVERED"]
+
+
+def write_pickup_exports(directory, rows, extra_columns=10, seed=0):
+    """
+    Write the Sellerflex and Flipkart KC/LL pickup exports into directory, rows each.
+    Returns:
+        dict mapping each Flipkart file name to the Order Ids written to it
+    """
+    rng = random.Random(seed)
+    order_ids = {}
+    for filename, header in PICKUP_EXPORT_HEADERS.items():
+        ids = []
+        with open(directory / filename, "w", newline="") as f:
+            writer = csv.writer(f)
+            writer.writerow(header + [f"Extra {i}" for i in range(extra_columns)])
+            for i in range(rows):
+                order_id = f"OD{rng.randrange(10**17, 10**18)}"
+                ids.append(order_id)
+                values = {
+                    "Ordered On": "2025-01-01 10:00:00", "Ship By": "2025-01-02", "Shipment ID": f"SH{i:010d}",
+                    "Customer Order ID": f"408-{rng.randrange(10**6, 10**7)}-{rng.randrange(10**6, 10**7)}",
+                    "ORDER ITEM ID": rng.randrange(10**15, 10**16), "Order Id": order_id, "Order State": "Approved",
+                    "Shipment Tracking ID": rng.randrange(10**11, 10**12), "Tracking ID": f"FMPP{rng.randrange(10**9, 10**10)}",
+                    "MSKU": f"SKU-{rng.randrange(2000):04d}", "SKU": f"SKU-{rng.randrange(2000):04d}",
+                    "Units": rng.randint(1, 3), "Quantity": rng.randint(1, 3), "Invoice Amount": f"{rng.randrange(100, 5000)}.00",
+                }
+                writer.writerow([values[name] for name in header] + [f"value {rng.randrange(1000)}" for _ in range(extra_columns)])
+        if filename.startswith("Flipkart"):
+            order_ids[filename] = ids
+    return order_ids
+
+
+def write_pickup_template(path):
+    """Template shaped like Pickup Report.xlsx: an "Entry tracking ID" sheet with a header per tracking column"""
+    from openpyxl import Workbook
+
+    wb = Workbook()
+    ws = wb.active
+    ws.title = "Entry tracking ID"
+    ws["A1"] = "Pickup Report"
+    ws["J1"] = "Date"
+    for col, name in enumerate(PICKUP_TRACKING_COLUMNS, start=1):
+        ws.cell(row=2, column=col, value=name)
+    wb.save(path)
+
+
+def write_cancellation_inputs(directory, flipkart_order_ids, manifest_pages, day=None, cancel_share=0.05, seed=0):
+    """
+    Write the Cancellation report's inputs into directory: a Flipkart cancellation export per
+    pickup file (cancel_share of its orders, cancelled on day, by buyer or not) and Meesho_data.csv
+    with a status for every sub order of the manifest.
+    Args:
+        flipkart_order_ids: write_pickup_exports() result
+        manifest_pages: write_manifest_pdf() result
+        day: Cancellation date (datetime.date); today when None
+    """
+    rng = random.Random(seed)
+    day = (day or date.today()).isoformat()
+    for filename, ids in flipkart_order_ids.items():
+        with open(directory / filename, "w", newline="") as f:
+            writer = csv.writer(f)
+            writer.writerow(["Order Cancellation Date", "Order Item ID", "Order Id", "SKU", "Quantity", "Cancellation Type"])
+            for order_id in rng.sample(ids, max(1, int(len(ids) * cancel_share))):
+                writer.writerow([f"{day} {rng.randrange(24):02d}:{rng.randrange(60):02d}:00", rng.randrange(10**15, 10**16),
+                                 order_id, f"SKU-{rng.randrange(2000):04d}", 1, rng.choice(CANCELLATION_TYPES)])
+
+    with open(directory / "Meesho_data.csv", "w", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(["Sub Order No", "Reason for Credit Entry", "SKU", "Quantity",
+                         "Supplier Listed Price (Incl. GST + Commission)"])
+        for _, rows in manifest_pages:
+            for row in rows:
+                writer.writerow([row[1], rng.choice(MEESHO_STATUSES), row[3], row[4], rng.randrange(100, 2000)])
+
+
+def manifest_rows(pages, rows_per_page=40, seed=0):
+    """Yield (courier, rows) for every table page of a synthetic manifest"""
+    rng = random.Random(seed)
+    serial = 1
+    for page in range(pages):
+        courier = MANIFEST_COURIERS[page % len(MANIFEST_COURIERS)]
+        rows = []
+        for _ in range(rows_per_page):
+            sub_order = f"{rng.randrange(10**17, 10**18)}_1"
+            awb = str(rng.randrange(10**12, 10**13))
+            rows.append([serial, sub_order, awb, f"SKU-{rng.randrange(500):03d}", 1])
+            serial += 1
+        yield courier, rows
+
+
+def write_manifest_pdf(path, pages, rows_per_page=40, seed=0):
+    """
+    Write a Meesho-style Manifest.pdf with a summary page followed by `pages` table pages.
+    Returns:
+        list of (courier, rows) that were written, in page order
+    """
+    page_data = list(manifest_rows(pages, rows_per_page, seed))
+    streams = [b"BT /F1 16 Tf 40 800 Td (Manifest Summary) Tj ET"]
+    streams += [_manifest_page_stream(courier, rows) for courier, rows in page_data]
+
+    # Object 1: catalog, 2: page tree, 3: font, then a (page, content) pair per page
+    page_ids = [4 + 2 * i for i in range(len(streams))]
+    objects = [
+        b"<< /Type /Catalog /Pages 2 0 R >>",
+        b"<< /Type /Pages /Kids [%s] /Count %d >>" % (" ".join(f"{pid} 0 R" for pid in page_ids).encode(), len(page_ids)),
+        b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>",
+    ]
+    for pid, stream in zip(page_ids, streams):
+        objects.append(
+            b"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 595 842] "
+            b"/Resources << /Font << /F1 3 0 R >> >> /Contents %d 0 R >>" % (pid + 1)
+        )
+        objects.append(b"<< /Length %d >>\nstream\n%s\nendstream" % (len(stream), stream))
+
+    with open(path, "wb") as f:
+        f.write(b"%PDF-1.4\n")
+        offsets = []
+        for number, body in enumerate(objects, start=1):
+            offsets.append(f.tell())
+            f.write(b"%d 0 obj\n%s\nendobj\n" % (number, body))
+        xref = f.tell()
+        f.write(b"xref\n0 %d\n0000000000 65535 f \n" % (len(objects) + 1))
+        for offset in offsets:
+            f.write(b"%010d 00000 n \n" % offset)
+        f.write(b"trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (len(objects) + 1, xref))
+
+    return page_data
@@ -0,0 +1,6 @@
+"""
+Shared processing helpers for the Report Processing Suite.
+
+Nothing in this package imports tkinter or customtkinter, so the helpers can be
+used from worker processes as well as from the GUI modules.
+"""
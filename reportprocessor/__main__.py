@@ -0,0 +1,9 @@
+import multiprocessing
+import sys
+
+from reportprocessor.cli import main
+
+if __name__ == "__main__":
+    # Needed for the PDF worker processes in a frozen (PyInstaller) build
+    multiprocessing.freeze_support()
+    sys.exit(main())
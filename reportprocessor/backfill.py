@@ -0,0 +1,219 @@
+"""
+Multi-day backfill of the Cancellation report.
+
+Rebuilds the report for every day of a date range, one worker process per day.
+A day's inputs come from CANCEL_BACKFILL_DIR/<YYYY-MM-DD>/, laid out like
+InputDIR (CancellationReport/ and PickupReportfiles/). Days without a folder
+fall back to the everyday InputDIR folders: the Flipkart cancellation export
+there is parsed once, in this process, and split by cancellation date, and the
+Meesho inputs (which carry no dates) are left out. That export changes from day
+to day, so those days are logged and reported as not reproducible.
+
+The days are written either as one file per day in CANCEL_BACKFILL_OUTPUT_DIR
+or as one sheet per day in a single workbook.
+"""
+import os
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from datetime import timedelta
+
+import pandas as pd
+
+from reportprocessor import cancellation
+from reportprocessor.logs import print_log
+from reportprocessor.manifest import read_manifest_rows
+from reportprocessor.paths import (CANCEL_BACKFILL_DIR, CANCEL_BACKFILL_OUTPUT_DIR, CANCEL_INPUT_DIR,
+                                   CANCEL_PICKUP_DIR, CACHE_DIR)
+
+# "files": one Cancel_product_report_<day>.xlsx per day; "sheets": one workbook, a sheet per day
+LAYOUTS = ("files", "sheets")
+LAYOUT = "files"
+
+# Worker processes (None = one per CPU)
+WORKERS = None
+
+# day: datetime.date
+# status: "ok" or "failed"
+# rows: cancelled products found (0 when none or failed)
+# output: file written for the day, or None
+# error: message when failed
+# reproducible: False when the day had no backfill folder and came from the everyday InputDIR export
+DayResult = namedtuple("DayResult", "day status rows output error reproducible", defaults=(True,))
+
+
+def days_in(window):
+    """Every date of a CancelWindow, in order"""
+    return [window.start + timedelta(days=offset) for offset in range((window.end - window.start).days + 1)]
+
+
+def day_inputs(day, backfill_dir=CANCEL_BACKFILL_DIR):
+    """
+    (cancel_dir, pickup_dir) of day's backfill folder
+    Raises:
+        FileNotFoundError if day has no backfill folder
+    """
+    day_dir = os.path.join(backfill_dir, day.isoformat())
+    if not os.path.isdir(day_dir):
+        raise FileNotFoundError(f"No inputs for {day} in {backfill_dir}")
+    return os.path.join(day_dir, "CancellationReport"), os.path.join(day_dir, "PickupReportfiles")
+
+
+def has_inputs(day, backfill_dir=CANCEL_BACKFILL_DIR):
+    return os.path.isdir(os.path.join(backfill_dir, day.isoformat()))
+
+
+def process_day(day, backfill_dir=CANCEL_BACKFILL_DIR, cache_dir=CACHE_DIR):
+    """
+    The cancelled products of one day from its backfill folder; runs in a worker process.
+    Returns:
+        Combined DataFrame, empty when nothing was cancelled that day
+    """
+    cancel_dir, pickup_dir = day_inputs(day, backfill_dir)
+    window = cancellation.CancelWindow(day, day)
+    log = _day_log(day)
+
+    # One process per day already; parse this day's manifest in-process
+    pdf_path = os.path.join(pickup_dir, 'Manifest.pdf')
+    rows = read_manifest_rows(pdf_path, workers=1, cache_dir=cache_dir) if os.path.exists(pdf_path) else None
+    meesho_cancelled_df = cancellation.process_meesho_data(cancel_dir, pickup_dir, cache_dir, log, rows)
+
+    flipkart_df_list = cancellation.process_flipkart_data(cancel_dir, pickup_dir, log, cache_dir, window)
+    return cancellation.combine_cancelled_data(meesho_cancelled_df, flipkart_df_list, log)
+
+
+def shared_days(days, cache_dir=CACHE_DIR, log=print_log):
+    """
+    The cancelled products of days without a backfill folder, from the everyday InputDIR
+    Flipkart export. Each export and pickup file is read once for all of the days.
+    Returns:
+        dict of day -> combined DataFrame, empty when nothing was cancelled that day
+    """
+    window = cancellation.CancelWindow(min(days), max(days))
+    pickup_index = cancellation.PickupOrderIndex(cache_dir)
+    flipkart = {day: [] for day in days}
+
+    for file, cancel_path, pickup_path, sale_channel in cancellation.flipkart_exports(CANCEL_INPUT_DIR,
+                                                                                      CANCEL_PICKUP_DIR, log):
+        df_cancel, dates = cancellation.buyer_cancellations(cancel_path, window)
+        cancel_days = dates.dt.date
+        for day in days:
+            flipkart[day].append(cancellation.match_pickup(df_cancel[cancel_days == day], pickup_path, sale_channel,
+                                                           pickup_index))
+        log(f"Processed {file}")
+
+    return {day: cancellation.combine_cancelled_data(None, flipkart[day], _day_log(day)) for day in days}
+
+
+def _day_log(day):
+    def log(message, level="INFO"):
+        print_log(f"[{day}] {message}", level)
+    return log
+
+
+def day_output_path(day, output_dir=CANCEL_BACKFILL_OUTPUT_DIR):
+    return os.path.join(output_dir, f"Cancel_product_report_{day.isoformat()}.xlsx")
+
+
+def workbook_output_path(window, output_dir=CANCEL_BACKFILL_OUTPUT_DIR):
+    return os.path.join(output_dir, f"Cancel_product_report_{window.start.isoformat()}_to_{window.end.isoformat()}.xlsx")
+
+
+def write_day_sheets(frames, output_file_path):
+    """One sheet per day (named YYYY-MM-DD) in date order; days without rows are left out"""
+    os.makedirs(os.path.dirname(output_file_path), exist_ok=True)
+    with pd.ExcelWriter(output_file_path, engine='openpyxl') as writer:
+        for day in sorted(frames):
+            frames[day].to_excel(writer, index=False, sheet_name=day.isoformat())
+    return output_file_path
+
+
+def backfill_cancellations(window, layout=None, workers=None, backfill_dir=CANCEL_BACKFILL_DIR,
+                           output_dir=CANCEL_BACKFILL_OUTPUT_DIR, cache_dir=CACHE_DIR, log=print_log, on_day=None):
+    """
+    Rebuild the Cancellation report for every day of window.
+    A day that fails is logged and reported; the other days still run. Days without
+    a backfill folder are built here from the everyday InputDIR export (see shared_days)
+    while the worker processes run the others.
+    Args:
+        window: CancelWindow of the days to rebuild
+        layout: "files" or "sheets"; LAYOUT when None
+        workers: Worker processes; WORKERS when None, 1 runs the days in this process
+        on_day: Optional callback(DayResult) as each day finishes (in "sheets" layout its output
+                is the shared workbook, written once every day is done)
+    Returns:
+        list of DayResult in date order
+    """
+    layout = layout or LAYOUT
+    if layout not in LAYOUTS:
+        raise ValueError(f"Unknown backfill layout '{layout}'; expected one of {', '.join(LAYOUTS)}")
+
+    days = days_in(window)
+    own = [day for day in days if has_inputs(day, backfill_dir)]
+    shared = [day for day in days if day not in own]
+    workers = min(workers or WORKERS or os.cpu_count() or 1, max(1, len(own)))
+    log(f"Backfilling cancellations for {len(days)} day(s), {window.start} to {window.end}, with {workers} worker(s)...")
+    for day in shared:
+        log(f"[{day}] No inputs for {day} in {backfill_dir}; using the everyday InputDIR Flipkart export "
+            "(Meesho left out, not reproducible)", "WARN")
+
+    frames = {}
+    results = {}
+
+    def finished(day, df=None, error=None):
+        reproducible = day not in shared
+        if error is not None:
+            log(f"[{day}] Failed: {error}", "ERROR")
+            results[day] = DayResult(day, "failed", 0, None, error, reproducible)
+        elif df.empty:
+            log(f"[{day}] No cancelled products found")
+            results[day] = DayResult(day, "ok", 0, None, None, reproducible)
+        else:
+            output = None
+            if layout == "files":
+                output = cancellation.save_report(df, day_output_path(day, output_dir))
+            else:
+                frames[day] = df
+            results[day] = DayResult(day, "ok", len(df), output, None, reproducible)
+        if on_day and layout == "files":
+            on_day(results[day])
+
+    def run_shared():
+        if not shared:
+            return
+        try:
+            shared_frames = shared_days(shared, cache_dir, log)
+        except Exception as e:
+            for day in shared:
+                finished(day, error=str(e))
+            return
+        for day in shared:
+            finished(day, shared_frames[day])
+
+    if workers <= 1:
+        for day in own:
+            try:
+                finished(day, process_day(day, backfill_dir, cache_dir))
+            except Exception as e:
+                finished(day, error=str(e))
+        run_shared()
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            futures = {pool.submit(process_day, day, backfill_dir, cache_dir): day for day in own}
+            run_shared()
+            for future in as_completed(futures):
+                try:
+                    finished(futures[future], future.result())
+                except Exception as e:
+                    finished(futures[future], error=str(e))
+
+    ordered = [results[day] for day in days]
+    if layout == "sheets":
+        output = write_day_sheets(frames, workbook_output_path(window, output_dir)) if frames else None
+        ordered = [result._replace(output=output) if result.rows else result for result in ordered]
+        if on_day:
+            for result in ordered:
+                on_day(result)
+
+    total = sum(result.rows for result in ordered)
+    log(f"Backfill complete: {total} records over {len(days)} day(s)")
+    return ordered
@@ -0,0 +1,122 @@
+"""
+On-disk cache for parsed input files, keyed by the file's content hash.
+
+Entries are Arrow IPC (Feather v2) files named "<kind>-<sha256>.arrow". Writing
+needs pyarrow; without it nothing is cached and inputs are parsed every run.
+Rendered files (e.g. the manifest snapshot) are cached as-is under their own
+suffix with write_file()/copy_file(), which don't need pyarrow.
+
+Writes are best-effort: an entry that can't be built or saved is logged and
+skipped, so the cache can only speed a run up, never fail it.
+"""
+import hashlib
+import os
+import shutil
+import tempfile
+from pathlib import Path
+
+from reportprocessor.logs import print_log
+
+try:
+    import pyarrow as pa
+    from pyarrow import feather
+except ImportError:
+    pa = None
+
+# Older entries of the same kind beyond this many are deleted on write
+KEEP_ENTRIES = 5
+
+
+def available():
+    """True when pyarrow is installed and the cache can be used"""
+    return pa is not None
+
+
+def file_digest(path, chunk_size=1 << 20):
+    """SHA-256 of the file's content"""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(chunk_size), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def entry_path(cache_dir, kind, digest, suffix=".arrow"):
+    return Path(cache_dir) / f"{kind}-{digest}{suffix}"
+
+
+def read_frame(path):
+    """
+    Read a cache entry written by write_frame().
+    Returns:
+        DataFrame, or None if the entry is missing or unreadable
+    """
+    if not available() or not Path(path).exists():
+        return None
+    try:
+        return feather.read_feather(str(path))
+    except Exception:
+        return None
+
+
+def write_frame(path, df, log=print_log):
+    """
+    Atomically write a DataFrame (without its index) as a cache entry, pruning stale entries.
+    Returns:
+        True if written; False (logged) if pyarrow is missing or the entry couldn't be written
+    """
+    if not available():
+        return False
+    return _write_atomic(path, lambda tmp_path: feather.write_feather(pa.Table.from_pandas(df, preserve_index=False),
+                                                                      tmp_path), log)
+
+
+def write_file(path, source, log=print_log):
+    """Atomically copy the file at source in as a cache entry, pruning stale entries; False (logged) on failure"""
+    return _write_atomic(path, lambda tmp_path: shutil.copyfile(source, tmp_path), log)
+
+
+def copy_file(path, target):
+    """
+    Copy a write_file() entry to target.
+    Returns:
+        True if copied, False if the entry is missing or can't be copied
+    """
+    try:
+        shutil.copyfile(path, target)
+        return True
+    except OSError:
+        return False
+
+
+def _write_atomic(path, write, log=print_log):
+    path = Path(path)
+    tmp_path = None
+    try:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=path.parent, suffix=".tmp")
+        os.close(fd)
+        write(tmp_path)
+        os.replace(tmp_path, path)
+    except Exception as e:
+        # e.g. a column pyarrow can't convert (mixed text and numbers), a full disk or a locked file
+        log(f"Cache entry {path.name} not written: {e}", "WARN")
+        if tmp_path is not None:
+            try:
+                os.remove(tmp_path)
+            except OSError:
+                pass
+        return False
+
+    kind = path.name.rsplit("-", 1)[0]
+    try:
+        stale = sorted(path.parent.glob(f"{kind}-*{path.suffix}"), key=lambda p: p.stat().st_mtime, reverse=True)
+    except OSError:
+        # Another run pruned at the same time
+        return True
+    for old in stale[KEEP_ENTRIES:]:
+        try:
+            old.unlink()
+        except OSError:
+            pass
+    return True
@@ -0,0 +1,371 @@
+"""
+Cancellation report engine.
+
+Matches the Meesho manifest against Meesho_data.csv and the buyer
+cancellations in the Flipkart exports (today's, or those in a CancelWindow)
+against the pickup files, producing one table of cancelled products.
+
+Flipkart pickup files are looked up through a PickupOrderIndex: each file is
+read and its OrderIDs normalised once per run, and the result is cached by
+content hash so an unchanged pickup export isn't parsed again next run.
+Meesho_data.csv is cut down to its CANCELLED rows before the manifest is
+joined to it, and that subset is cached the same way.
+"""
+import os
+from collections import namedtuple
+from datetime import date, timedelta
+
+import numpy as np
+import pandas as pd
+
+from reportprocessor import cache, timing
+from reportprocessor.ingest import read_source, FLIPKART_CANCELLATIONS, FLIPKART_PICKUP, MEESHO_CANCEL_DATA
+from reportprocessor.logs import print_log
+from reportprocessor.manifest import read_manifest_rows, sub_order_rows
+from reportprocessor.paths import CANCEL_INPUT_DIR, CANCEL_PICKUP_DIR, CANCEL_OUTPUT_FILE, CACHE_DIR
+
+OUTPUT_COLUMNS = ['SaleChannel', 'Sub Order Number', 'Tracking ID', 'Status of the product', 'SKU', 'QTY', 'Invoice Amount']
+
+# Cache entry kinds for indexed Flipkart pickup files and Meesho cancelled rows; bump when the stored layout changes
+PICKUP_INDEX_KIND = "fk-pickup-v1"
+MEESHO_INDEX_KIND = "meesho-cancelled-v1"
+MEESHO_CANCELLED = 'cancelled'
+
+# Format of the Flipkart 'Order Cancellation Date' column ("ISO8601" covers "2025-01-15" and
+# "2025-01-15 10:23:45"); values that don't match it fall back to pandas' format inference
+CANCEL_DATE_FORMAT = "ISO8601"
+BUYER_CANCELLATION = 'cancelled by buyer'
+
+# Inclusive range of cancellation dates (datetime.date) to report; see cancel_window()
+CancelWindow = namedtuple("CancelWindow", "start end")
+
+
+def extract_data_from_pdf(pdf_path, cache_dir=CACHE_DIR, manifest_rows=None):
+    """
+    Courier, AWB and Sub Order Number of every manifest row; pass manifest_rows to
+    reuse an earlier read_manifest_rows() result
+    """
+    if manifest_rows is None:
+        manifest_rows = read_manifest_rows(pdf_path, cache_dir=cache_dir)
+    extracted = sub_order_rows(manifest_rows)
+    return extracted.rename(columns={'courier': 'Courier', 'awb': 'AWB', 'sub_order': 'Sub Order Number'})[
+        ['Courier', 'AWB', 'Sub Order Number']]
+
+
+def load_meesho_cancellations(vlookup_file_path, cache_dir=CACHE_DIR):
+    """
+    The CANCELLED rows of Meesho_data.csv with Sub Order Number normalised,
+    from the cache when the file is unchanged.
+    Args:
+        cache_dir: Directory for the cache; None disables caching
+    """
+    if cache_dir is None or not cache.available():
+        entry = None
+    else:
+        entry = cache.entry_path(cache_dir, MEESHO_INDEX_KIND, cache.file_digest(vlookup_file_path))
+        cancelled = cache.read_frame(entry)
+        if cancelled is not None:
+            return cancelled
+
+    vlookup_data = read_source(vlookup_file_path, MEESHO_CANCEL_DATA)
+    cancelled = vlookup_data[matches_category(vlookup_data['Status of the product'], MEESHO_CANCELLED)]
+    cancelled = cancelled[['Sub Order Number', 'Status of the product', 'SKU', 'QTY', 'Invoice Amount']].reset_index(drop=True)
+    cancelled['Sub Order Number'] = normalize_order_ids(cancelled['Sub Order Number'])
+    if entry is not None:
+        cache.write_frame(entry, cancelled)
+    return cancelled
+
+
+def perform_vlookup(df_extracted, vlookup_file_path, cache_dir=CACHE_DIR):
+    """
+    Perform VLOOKUP for Meesho data: the manifest rows whose sub order is CANCELLED in Meesho_data.csv
+    Returns:
+        df_extracted's matching rows (in manifest order) with the status, SKU, QTY and Invoice Amount columns
+    """
+    cancelled = load_meesho_cancellations(vlookup_file_path, cache_dir)
+    df_extracted = df_extracted.assign(**{'Sub Order Number': normalize_order_ids(df_extracted['Sub Order Number'])})
+    return df_extracted.merge(cancelled, on='Sub Order Number', how='inner')
+
+
+def cancel_window(start=None, end=None, days=None, today=None):
+    """
+    The cancellation dates to report: the last `days` days up to today, start to end
+    (end defaults to today), or just today when neither is given.
+    Raises:
+        ValueError for days < 1 or a range that ends before it starts
+    """
+    today = today or date.today()
+    if days is not None:
+        if days < 1:
+            raise ValueError(f"days must be at least 1, got {days}")
+        return CancelWindow(today - timedelta(days=days - 1), today)
+    if start is None:
+        return CancelWindow(today, today)
+    end = end or today
+    if end < start:
+        raise ValueError(f"Cancellation window ends ({end}) before it starts ({start})")
+    return CancelWindow(start, end)
+
+
+def parse_cancel_dates(series, date_format=None):
+    """
+    series as naive datetime64, parsed with date_format (CANCEL_DATE_FORMAT when None).
+    A UTC offset in a value is dropped, keeping the local time as written, so the
+    dates compare with a CancelWindow's days.
+    """
+    dates = _wall_times(series, date_format or CANCEL_DATE_FORMAT)
+    # Values in another layout: parse just those one by one rather than the whole column
+    unparsed = dates.isna() & series.notna()
+    if unparsed.any():
+        dates[unparsed] = _wall_times(series[unparsed], 'mixed')
+    return dates
+
+
+def _wall_times(series, date_format):
+    """pd.to_datetime() with any UTC offset dropped rather than applied"""
+    try:
+        dates = pd.to_datetime(series, format=date_format, errors='coerce')
+    except ValueError:
+        # Different offsets in one column (or some values without one): one value at a time
+        return pd.to_datetime(series.map(lambda value: _wall_time(value, date_format)))
+    if dates.dt.tz is not None:
+        dates = dates.dt.tz_localize(None)
+    return dates
+
+
+def _wall_time(value, date_format):
+    try:
+        stamp = pd.to_datetime(value, format=date_format)
+    except (ValueError, TypeError):
+        return pd.NaT
+    return stamp.tz_localize(None) if stamp is not pd.NaT and stamp.tzinfo is not None else stamp
+
+
+def in_window(dates, window):
+    """Mask of the datetime64 dates that fall on a day of window"""
+    return (dates >= pd.Timestamp(window.start)) & (dates < pd.Timestamp(window.end + timedelta(days=1)))
+
+
+def matches_category(series, value):
+    """Mask of the rows equal to value ignoring case and surrounding spaces, compared once per category rather than per row"""
+    series = series.astype('category')
+    categories = series.cat.categories.astype(str).str.strip().str.lower()
+    return pd.Series(np.isin(series.cat.codes, np.flatnonzero(categories == value.lower())), index=series.index)
+
+
+def normalize_order_ids(series):
+    """OrderIDs as stripped strings, the form both sides of the Flipkart match use"""
+    return series.astype(str).str.strip()
+
+
+def load_pickup_rows(pickup_path, cache_dir=CACHE_DIR):
+    """
+    A Flipkart pickup file's FLIPKART_PICKUP columns with OrderID normalised,
+    from the cache when the file is unchanged.
+    Args:
+        cache_dir: Directory for the cache; None disables caching
+    """
+    if cache_dir is None or not cache.available():
+        entry = None
+    else:
+        entry = cache.entry_path(cache_dir, PICKUP_INDEX_KIND, cache.file_digest(pickup_path))
+        df_pickup = cache.read_frame(entry)
+        if df_pickup is not None:
+            return df_pickup
+
+    df_pickup = read_source(pickup_path, FLIPKART_PICKUP)
+    df_pickup['OrderID'] = normalize_order_ids(df_pickup['OrderID'])
+    if entry is not None:
+        cache.write_frame(entry, df_pickup)
+    return df_pickup
+
+
+class PickupOrderIndex:
+    """
+    Flipkart pickup rows by normalised OrderID, shared by the cancel files of a run.
+    Each pickup file is loaded (see load_pickup_rows) the first time it is matched against.
+    """
+
+    def __init__(self, cache_dir=CACHE_DIR):
+        self.cache_dir = cache_dir
+        self._rows = {}
+
+    def rows(self, pickup_path):
+        key = os.path.abspath(pickup_path)
+        if key not in self._rows:
+            self._rows[key] = load_pickup_rows(pickup_path, self.cache_dir)
+        return self._rows[key]
+
+    def match(self, pickup_path, df_cancel):
+        """
+        Join df_cancel's orders to the pickup rows in a single pass.
+        Returns:
+            The pickup rows of the cancelled orders, in pickup file order, with their 'Cancellation Type'
+        """
+        cancelled = df_cancel[['OrderID', 'Cancellation Type']].assign(OrderID=normalize_order_ids(df_cancel['OrderID']))
+        return self.rows(pickup_path).merge(cancelled, on='OrderID', how='inner')
+
+
+def flipkart_cancelled_orders(fk_cancel_path, fk_pickup_path, sale_channel, pickup_index=None, window=None):
+    """
+    Process Flipkart cancelled orders
+    Args:
+        pickup_index: PickupOrderIndex to match against; a new one (cached in CACHE_DIR) when None
+        window: CancelWindow of the cancellation dates to keep; today when None
+    """
+    df_cancel, _ = buyer_cancellations(fk_cancel_path, window or cancel_window())
+    return match_pickup(df_cancel, fk_pickup_path, sale_channel, pickup_index)
+
+
+def buyer_cancellations(fk_cancel_path, window):
+    """
+    The buyer cancellations of a Flipkart cancel export dated inside window.
+    Returns:
+        (rows, their cancellation dates as naive datetime64)
+    """
+    df_cancel = read_source(fk_cancel_path, FLIPKART_CANCELLATIONS)
+    dates = parse_cancel_dates(df_cancel['Order Cancellation Date'])
+    keep = in_window(dates, window) & matches_category(df_cancel['Cancellation Type'], BUYER_CANCELLATION)
+    return df_cancel[keep], dates[keep]
+
+
+def match_pickup(df_cancel, fk_pickup_path, sale_channel, pickup_index=None):
+    """
+    Match df_cancel's Order IDs against the pickup rows.
+    Args:
+        pickup_index: PickupOrderIndex to match against; a new one (cached in CACHE_DIR) when None
+    """
+    pickup_index = pickup_index if pickup_index is not None else PickupOrderIndex()
+    df_result = pickup_index.match(fk_pickup_path, df_cancel)
+    df_result['SaleChannel'] = sale_channel
+
+    return df_result[['SaleChannel', 'OrderID', 'Tracking ID', 'Cancellation Type', 'SKU', 'QTY', 'Invoice Amount']]
+
+
+def process_meesho_data(cancel_dir=CANCEL_INPUT_DIR, pickup_dir=CANCEL_PICKUP_DIR, cache_dir=CACHE_DIR, log=print_log,
+                        manifest_rows=None):
+    """Process Meesho PDF and CSV data"""
+    pdf_path = os.path.join(pickup_dir, 'Manifest.pdf')
+    vlookup_file_path = os.path.join(cancel_dir, 'Meesho_data.csv')
+
+    if os.path.exists(pdf_path) and os.path.exists(vlookup_file_path):
+        log("Processing Meesho PDF data...")
+        df_extracted = extract_data_from_pdf(pdf_path, cache_dir, manifest_rows)
+
+        log("Performing VLOOKUP for Meesho data...")
+        meesho_cancelled_df = perform_vlookup(df_extracted, vlookup_file_path, cache_dir)
+
+        return meesho_cancelled_df
+    else:
+        log("Meesho files not found, skipping...")
+        return pd.DataFrame()
+
+
+def process_flipkart_data(cancel_dir=CANCEL_INPUT_DIR, pickup_dir=CANCEL_PICKUP_DIR, log=print_log, cache_dir=CACHE_DIR,
+                          window=None):
+    """
+    Process Flipkart cancellation data
+    Args:
+        cache_dir: Directory for the pickup index cache; None disables caching
+        window: CancelWindow of the cancellation dates to report; today when None
+    """
+    flipkart_df_list = []
+    pickup_index = PickupOrderIndex(cache_dir)
+    window = window or cancel_window()
+
+    log("Processing Flipkart cancellation data...")
+    if window.start != window.end:
+        log(f"Cancellation window: {window.start} to {window.end}")
+
+    for file, cancel_path, pickup_path, sale_channel in flipkart_exports(cancel_dir, pickup_dir, log):
+        fk_df = flipkart_cancelled_orders(cancel_path, pickup_path, sale_channel, pickup_index, window)
+        flipkart_df_list.append(fk_df)
+        log(f"Processed {file}")
+
+    return flipkart_df_list
+
+
+def flipkart_exports(cancel_dir=CANCEL_INPUT_DIR, pickup_dir=CANCEL_PICKUP_DIR, log=print_log):
+    """(file, cancel_path, pickup_path, sale_channel) of every Flipkart cancel export in cancel_dir with a pickup file"""
+    if not os.path.exists(cancel_dir):
+        return
+
+    for file in os.listdir(cancel_dir):
+        if file.endswith('.csv') and 'Flipkart' in file:
+            cancel_path = os.path.join(cancel_dir, file)
+            pickup_path = os.path.join(pickup_dir, file)
+
+            if os.path.exists(pickup_path):
+                yield file, cancel_path, pickup_path, 'Flipkart LL' if 'LL' in file else 'Flipkart KC'
+            else:
+                log(f"Warning: Pickup file not found for {file}")
+
+
+def combine_cancelled_data(meesho_cancelled_df, flipkart_df_list, log=print_log):
+    """Combine all cancelled data into one DataFrame (empty when nothing was cancelled)"""
+    log("Combining all cancellation data...")
+
+    all_data = []
+
+    # Add Meesho data
+    if meesho_cancelled_df is not None and not meesho_cancelled_df.empty:
+        meesho_cancelled_df = meesho_cancelled_df.copy()
+        meesho_cancelled_df['SaleChannel'] = 'Meesho'
+        meesho_cancelled_df.rename(columns={'AWB': 'Tracking ID'}, inplace=True)
+        all_data.append(meesho_cancelled_df[OUTPUT_COLUMNS])
+
+    # Add Flipkart data
+    for df in flipkart_df_list:
+        if df is not None and not df.empty:
+            all_data.append(df)
+
+    if all_data:
+        return pd.concat(all_data, ignore_index=True)
+    return pd.DataFrame()
+
+
+def save_report(combined_df, output_file_path=CANCEL_OUTPUT_FILE):
+    """Save the processed data to Excel file"""
+    # Ensure output directory exists
+    os.makedirs(os.path.dirname(output_file_path), exist_ok=True)
+
+    # Save to Excel file
+    with timing.stage(timing.WORKBOOK_SAVE), pd.ExcelWriter(output_file_path, engine='openpyxl') as writer:
+        combined_df.to_excel(writer, index=False, sheet_name='Cancel products')
+    return output_file_path
+
+
+def report_cancellations(combined_df, output_file_path=CANCEL_OUTPUT_FILE, log=print_log):
+    """
+    Save combined_df as the cancel product report unless it is empty.
+    Returns:
+        Path of the saved workbook, or None when there was nothing to save
+    """
+    if combined_df.empty:
+        log("Processing complete but no cancelled products found.")
+        return None
+    save_report(combined_df, output_file_path)
+    log(f"Report saved: {len(combined_df)} records")
+    return output_file_path
+
+
+@timing.timed_run("cancellation")
+def process_cancellations(cancel_dir=CANCEL_INPUT_DIR, pickup_dir=CANCEL_PICKUP_DIR, cache_dir=CACHE_DIR, log=print_log,
+                          window=None):
+    """
+    Build the table of cancelled products from the Meesho and Flipkart inputs.
+    Args:
+        window: CancelWindow of the Flipkart cancellation dates to report; today when None
+    Returns:
+        Combined DataFrame; empty when no cancelled products were found
+    """
+    log("Starting report processing...")
+
+    # Process Meesho data
+    meesho_cancelled_df = process_meesho_data(cancel_dir, pickup_dir, cache_dir, log)
+
+    # Process Flipkart data
+    flipkart_df_list = process_flipkart_data(cancel_dir, pickup_dir, log, cache_dir, window)
+
+    # Combine all data
+    return combine_cancelled_data(meesho_cancelled_df, flipkart_df_list, log)
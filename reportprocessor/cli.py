@@ -0,0 +1,234 @@
+"""
+Headless entry point: python -m reportprocessor run [--pickup] [--returns] [--cancellation] [--serial]
+                                                   [--pivots png|sheet|both] [--returns-mode full|delta]
+                                                   [--cancel-days N | --cancel-from DATE [--cancel-to DATE]]
+                                                   [--profile cprofile|pyinstrument]
+                      python -m reportprocessor backfill (--days N | --from DATE [--to DATE])
+                                                        [--layout files|sheets] [--workers N]
+
+By default the selected reports run through the pipeline scheduler
+(reportprocessor.pipeline), so independent stages overlap; --serial runs one
+report after the other.
+
+Logs go to stderr. stdout carries one JSON object per stage followed by a
+summary line, e.g.
+    {"stage": "pickup", "status": "ok", "seconds": 4.21, "output": "Output/Pickup_Report_01-01-2025.xlsx"}
+    {"stage": "summary", "status": "ok", "seconds": 9.87, "failed": []}
+The exit code is 1 when any stage fails (or, in the pipeline, is skipped).
+Each report also gets a per-stage timing breakdown (reportprocessor.timing),
+logged and saved next to it as <report>.timing.json.
+
+backfill rebuilds the Cancellation report for each day of a range in worker
+processes (reportprocessor.backfill) and prints one JSON object per day, e.g.
+    {"day": "2025-01-01", "status": "ok", "rows": 12, "output": "OutputDIR/Backfill/Cancel_product_report_2025-01-01.xlsx"}
+"""
+import argparse
+import json
+import sys
+import time
+import traceback
+from datetime import date
+
+from reportprocessor.logs import print_log
+
+STAGES = ("pickup", "returns", "cancellation")
+
+
+def run_pickup(pivot_output=None):
+    from reportprocessor import pickup
+    return pickup.process_pickup(pivot_output=pivot_output)
+
+
+def run_returns(returns_mode=None):
+    from reportprocessor import returns
+    return returns.process_returns(report_mode=returns_mode)
+
+
+def run_cancellation(cancel_window=None):
+    from reportprocessor import cancellation, timing
+    # One timing run around both, so the save is part of the report; its JSON goes
+    # next to the report only when one was saved
+    with timing.run("cancellation") as active:
+        active.output = cancellation.report_cancellations(cancellation.process_cancellations(window=cancel_window))
+        return active.output
+
+
+RUNNERS = {
+    "pickup": run_pickup,
+    "returns": run_returns,
+    "cancellation": run_cancellation,
+}
+
+
+def emit(record):
+    print(json.dumps(record), flush=True)
+
+
+def run_stage(name, **options):
+    """Run one stage; returns its JSON record"""
+    start = time.perf_counter()
+    try:
+        output = RUNNERS[name](**options)
+        status, error = "ok", None
+    except Exception as e:
+        print_log(f"{name} failed: {e}", "ERROR")
+        traceback.print_exc(file=sys.stderr)
+        output, status, error = None, "failed", str(e)
+
+    record = {
+        "stage": name,
+        "status": status,
+        "seconds": round(time.perf_counter() - start, 3),
+        "output": str(output) if output is not None else None,
+    }
+    if error is not None:
+        record["error"] = error
+    return record
+
+
+def run_serial(stages, pivot_output=None, returns_mode=None, cancel_window=None):
+    """Run the selected reports one after the other; returns the failed report names"""
+    options = {"pickup": {"pivot_output": pivot_output}, "returns": {"returns_mode": returns_mode},
+               "cancellation": {"cancel_window": cancel_window}}
+    failed = []
+    for name in stages:
+        record = run_stage(name, **options.get(name, {}))
+        emit(record)
+        if record["status"] != "ok":
+            failed.append(name)
+    return failed
+
+
+def run_pipeline(selected, pivot_output=None, returns_mode=None, cancel_window=None):
+    """Run the selected reports through the stage scheduler; returns the failed stage names"""
+    from reportprocessor.pipeline import build_report_stages, run_stages
+
+    stages, reports = build_report_stages(**{name: name in selected for name in STAGES},
+                                          pivot_output=pivot_output, returns_mode=returns_mode,
+                                          cancel_window=cancel_window)
+    executors = {stage.name: stage.executor for stage in stages}
+
+    def on_result(result):
+        record = {
+            "stage": result.name,
+            "status": result.status,
+            "executor": executors[result.name],
+            "seconds": round(result.seconds, 3),
+            "output": str(result.value) if result.name in reports and result.value is not None else None,
+        }
+        if result.error is not None:
+            record["error"] = result.error
+        emit(record)
+
+    results = run_stages(stages, on_result=on_result)
+    return [name for name, result in results.items() if result.status != "ok"]
+
+
+def cmd_backfill(args):
+    from reportprocessor.backfill import backfill_cancellations
+
+    def on_day(result):
+        record = {
+            "day": result.day.isoformat(),
+            "status": result.status,
+            "rows": result.rows,
+            "output": str(result.output) if result.output is not None else None,
+        }
+        if result.error is not None:
+            record["error"] = result.error
+        if not result.reproducible:
+            # Built from the everyday InputDIR export, not the day's own backfill folder
+            record["reproducible"] = False
+        emit(record)
+
+    start = time.perf_counter()
+    results = backfill_cancellations(args.cancel_window, args.layout, args.workers, on_day=on_day)
+    failed = [result.day.isoformat() for result in results if result.status != "ok"]
+
+    emit({
+        "stage": "summary",
+        "status": "failed" if failed else "ok",
+        "seconds": round(time.perf_counter() - start, 3),
+        "failed": failed,
+    })
+    return 1 if failed else 0
+
+
+def parse_cancel_window(args):
+    """CancelWindow from the --cancel-* options, or None for the engine's default (today)"""
+    if args.cancel_days is None and args.cancel_from is None:
+        return None
+    from reportprocessor.cancellation import cancel_window
+    return cancel_window(args.cancel_from, args.cancel_to, args.cancel_days)
+
+
+def cmd_run(args):
+    stages = [name for name in STAGES if getattr(args, name)] or list(STAGES)
+    if args.profile:
+        from reportprocessor import timing
+        timing.PROFILE = args.profile
+
+    start = time.perf_counter()
+    if args.serial:
+        failed = run_serial(stages, args.pivots, args.returns_mode, args.cancel_window)
+    else:
+        failed = run_pipeline(stages, args.pivots, args.returns_mode, args.cancel_window)
+
+    emit({
+        "stage": "summary",
+        "status": "failed" if failed else "ok",
+        "seconds": round(time.perf_counter() - start, 3),
+        "failed": failed,
+    })
+    return 1 if failed else 0
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog="python -m reportprocessor", description="Run the report pipeline without the GUI.")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    run = commands.add_parser("run", help="Run report stages (all of them when none is selected)")
+    run.add_argument("--pickup", action="store_true", help="Pickup report from inputdir/PickupReportfiles")
+    run.add_argument("--returns", action="store_true", help="Returns Reconcile Report from inputdir/Returnsreportfiles")
+    run.add_argument("--cancellation", action="store_true", help="Cancel product report from InputDIR")
+    run.add_argument("--serial", action="store_true", help="Run the reports one at a time instead of through the pipeline scheduler")
+    run.add_argument("--pivots", choices=("png", "sheet", "both"),
+                     help="Pickup pivots as PNG images, sheets in the report, or both (default: the engine's PIVOT_OUTPUT)")
+    run.add_argument("--returns-mode", choices=("full", "delta"),
+                     help="Returns report with every row, or only new/status-changed returns from the return store "
+                          "(default: the engine's REPORT_MODE)")
+    run.add_argument("--profile", choices=("cprofile", "pyinstrument"),
+                     help="Also profile each report, saved next to it (.prof for cProfile, .profile.html for pyinstrument)")
+    window = run.add_mutually_exclusive_group()
+    window.add_argument("--cancel-days", type=int, metavar="N",
+                        help="Flipkart cancellations from the last N days, today included (default: today only)")
+    window.add_argument("--cancel-from", type=date.fromisoformat, metavar="YYYY-MM-DD",
+                        help="First Flipkart cancellation date to report")
+    run.add_argument("--cancel-to", type=date.fromisoformat, metavar="YYYY-MM-DD",
+                     help="Last Flipkart cancellation date to report with --cancel-from (default: today)")
+    run.set_defaults(func=cmd_run)
+
+    backfill = commands.add_parser("backfill", help="Rebuild the Cancellation report for every day of a date range")
+    days = backfill.add_mutually_exclusive_group(required=True)
+    days.add_argument("--days", dest="cancel_days", type=int, metavar="N", help="The last N days, today included")
+    days.add_argument("--from", dest="cancel_from", type=date.fromisoformat, metavar="YYYY-MM-DD", help="First day to rebuild")
+    backfill.add_argument("--to", dest="cancel_to", type=date.fromisoformat, metavar="YYYY-MM-DD",
+                          help="Last day to rebuild with --from (default: today)")
+    backfill.add_argument("--layout", choices=("files", "sheets"),
+                          help="One report file per day, or one workbook with a sheet per day (default: the engine's LAYOUT)")
+    backfill.add_argument("--workers", type=int, metavar="N", help="Worker processes (default: one per CPU)")
+    backfill.set_defaults(func=cmd_backfill)
+    return parser
+
+
+def main(argv=None):
+    parser = build_parser()
+    args = parser.parse_args(argv)
+    if args.command in ("run", "backfill"):
+        if args.cancel_to and not args.cancel_from:
+            parser.error("--cancel-to needs --cancel-from" if args.command == "run" else "--to needs --from")
+        try:
+            args.cancel_window = parse_cancel_window(args)
+        except ValueError as e:
+            parser.error(str(e))
+    return args.func(args)
@@ -0,0 +1,91 @@
+"""
+openpyxl helpers for writing into report templates.
+"""
+import weakref
+
+from openpyxl.cell.cell import Cell
+from openpyxl.utils.cell import column_index_from_string, coordinate_from_string
+
+# One index per loaded worksheet; entries go away with the worksheet
+_merged_indexes = weakref.WeakKeyDictionary()
+
+
+class MergedCellIndex:
+    """Maps every cell covered by a merged range to that range's top-left anchor"""
+
+    def __init__(self, ws):
+        self.anchors = {}
+        for merged_range in ws.merged_cells.ranges:
+            min_col, min_row, max_col, max_row = merged_range.bounds
+            for row in range(min_row, max_row + 1):
+                for col in range(min_col, max_col + 1):
+                    self.anchors[(row, col)] = (min_row, min_col)
+
+    def anchor(self, row, col):
+        """(row, col) of the cell that actually holds the value for (row, col)"""
+        return self.anchors.get((row, col), (row, col))
+
+    def __contains__(self, cell):
+        return cell in self.anchors
+
+
+def merged_index(ws, rebuild=False):
+    """
+    Return the worksheet's MergedCellIndex, building it on first use.
+    Pass rebuild=True after merging or unmerging cells on the sheet.
+    """
+    index = None if rebuild else _merged_indexes.get(ws)
+    if index is None:
+        index = MergedCellIndex(ws)
+        _merged_indexes[ws] = index
+    return index
+
+
+def merged_top_left(ws, cell_coord):
+    """Return (col, row) of the merged range's top-left cell for an "A1"-style coordinate, or None if not merged"""
+    col_letter, row = coordinate_from_string(cell_coord)
+    cell = (row, column_index_from_string(col_letter))
+    index = merged_index(ws)
+    if cell not in index:
+        return None
+    top_row, top_col = index.anchor(*cell)
+    return top_col, top_row
+
+
+def write_cell(ws, col, row, value):
+    """Write value to column letter col / row, redirecting merged cells to their anchor"""
+    anchor_row, anchor_col = merged_index(ws).anchor(row, column_index_from_string(col))
+    ws.cell(row=anchor_row, column=anchor_col, value=value)
+
+
+def numeric_ids(values):
+    """Convert all-digit IDs to int (as Excel numbers) and leave everything else as text"""
+    return [int(v) if v.isdigit() else v for v in map(str, values)]
+
+
+def write_column(ws, col, start_row, values, numeric=False):
+    """
+    Write values down column letter col from start_row in one pass.
+    Cells go straight into the worksheet's cell store; cells that already exist
+    keep their template styling, and merged cells are redirected to their anchor.
+    Args:
+        numeric: Convert all-digit IDs to int first (see numeric_ids)
+    Returns:
+        Number of values written
+    """
+    if numeric:
+        values = numeric_ids(values)
+    col_idx = column_index_from_string(col)
+    anchors = merged_index(ws).anchors
+    cells = ws._cells
+
+    count = 0
+    for row, value in enumerate(values, start_row):
+        key = anchors.get((row, col_idx), (row, col_idx))
+        cell = cells.get(key)
+        if cell is None:
+            ws._add_cell(Cell(ws, row=key[0], column=key[1], value=value))
+        else:
+            cell.value = value
+        count += 1
+    return count
@@ -0,0 +1,160 @@
+"""
+Typed CSV ingestion for the marketplace exports.
+
+Each source declares a CsvSchema: the columns to read (by header name or, for
+exports whose headers vary, by position) and what to call them, which of them
+to keep as text, which to read as categoricals and which are numeric. Only the
+declared columns are parsed, so wide Flipkart exports cost a fraction of a
+full read.
+"""
+import importlib.util
+import os
+from collections import namedtuple
+
+import pandas as pd
+
+from reportprocessor.timing import stage, timed, CSV_READ
+
+# "c" (pandas' own parser) or "pyarrow" (multithreaded; used only when pyarrow is installed)
+CSV_ENGINE = "c"
+
+# columns: {source column name or 0-based position: output name}, in output order
+# text: output columns kept as strings (IDs with leading zeros, long tracking numbers)
+# categories: output columns read as categoricals (channel, courier, status, ...)
+# numeric: output columns converted to numbers when every value parses
+# skiprows: lines before the header row
+CsvSchema = namedtuple("CsvSchema", "columns text categories numeric skiprows", defaults=((), (), (), 0))
+
+
+# --- Cancellation inputs ---
+# Flipkart cancellation export: headers vary between exports, so columns are taken by position
+FLIPKART_CANCELLATIONS = CsvSchema(
+    columns={0: 'Order Cancellation Date', 2: 'OrderID', 5: 'Cancellation Type'},
+    text=('Order Cancellation Date', 'OrderID'),
+    categories=('Cancellation Type',),
+)
+
+FLIPKART_PICKUP = CsvSchema(
+    columns={3: 'OrderID', 'Tracking ID': 'Tracking ID', 'SKU': 'SKU', 'Quantity': 'QTY', 'Invoice Amount': 'Invoice Amount'},
+    text=('OrderID',),
+    numeric=('QTY', 'Invoice Amount'),
+)
+
+MEESHO_CANCEL_DATA = CsvSchema(
+    columns={
+        'Sub Order No': 'Sub Order Number',
+        'Reason for Credit Entry': 'Status of the product',
+        'SKU': 'SKU',
+        'Quantity': 'QTY',
+        'Supplier Listed Price (Incl. GST + Commission)': 'Invoice Amount'
+    },
+    text=('Sub Order Number',),
+    categories=('Status of the product',),
+    numeric=('QTY', 'Invoice Amount'),
+)
+
+
+def pickup_schema(tracking_col, pivot_columns):
+    """Pickup CSV: tracking IDs as text plus the SKU/quantity pair the pivot needs"""
+    sku_col, qty_col = pivot_columns
+    return CsvSchema(
+        columns={tracking_col: tracking_col, sku_col: sku_col, qty_col: qty_col},
+        text=(tracking_col, sku_col),
+        numeric=(qty_col,),
+    )
+
+
+def csv_engine(engine=None):
+    engine = engine or CSV_ENGINE
+    if engine == "pyarrow" and importlib.util.find_spec("pyarrow") is None:
+        return "c"
+    return engine
+
+
+def read_header(path, skiprows=0):
+    return list(pd.read_csv(path, nrows=0, skiprows=skiprows).columns)
+
+
+def to_numeric(series):
+    """series as numbers if every non-empty value parses, else unchanged"""
+    converted = pd.to_numeric(series, errors="coerce")
+    if converted.isna().sum() > series.isna().sum():
+        return series
+    return converted
+
+
+def _resolve_columns(path, schema, required):
+    """(source header name -> output name, read_csv dtypes) for the schema's columns present in path"""
+    header = read_header(path, schema.skiprows)
+
+    names = {}  # source header name -> output name
+    missing = []
+    for source, output in schema.columns.items():
+        if isinstance(source, int):
+            if source < len(header):
+                names[header[source]] = output
+            else:
+                missing.append(f"column {source + 1}")
+        elif source in header:
+            names[source] = output
+        else:
+            missing.append(source)
+
+    if missing and required:
+        raise KeyError(f"Column(s) not found in {getattr(path, 'name', path)}: {', '.join(map(str, missing))}")
+
+    dtypes = {}
+    for source, output in names.items():
+        if output in schema.text:
+            dtypes[source] = str
+        elif output in schema.categories:
+            dtypes[source] = "category"
+    return names, dtypes
+
+
+def _shape(df, schema, names):
+    df = df.rename(columns=names)[[output for output in schema.columns.values() if output in names.values()]]
+    for column in schema.numeric:
+        if column in df.columns:
+            df[column] = to_numeric(df[column])
+    return df
+
+
+@timed(CSV_READ)
+def read_source(path, schema, engine=None, required=True):
+    """
+    Read the schema's columns from a CSV export, renamed and typed.
+    Args:
+        required: Raise when a declared column is missing; otherwise leave it out
+    Returns:
+        DataFrame with the output columns in schema order
+    Raises:
+        KeyError for missing columns (required=True); any pandas read error
+    """
+    names, dtypes = _resolve_columns(path, schema, required)
+    df = pd.read_csv(path, usecols=list(names), dtype=dtypes, skiprows=schema.skiprows, engine=csv_engine(engine))
+    return _shape(df, schema, names)
+
+
+def iter_source(path, schema, chunk_rows, required=True):
+    """
+    read_source() in chunks of chunk_rows rows (always on the C parser, which is the one that can chunk).
+    Numeric columns are converted per chunk.
+    Yields:
+        (chunk DataFrame, fraction of the file read so far)
+    Raises:
+        KeyError for missing columns before the first chunk; any pandas read error
+    """
+    names, dtypes = _resolve_columns(path, schema, required)
+    size = os.path.getsize(path) or 1
+    with open(path, "rb") as f:
+        reader = iter(pd.read_csv(f, usecols=list(names), dtype=dtypes, skiprows=schema.skiprows, chunksize=chunk_rows))
+        while True:
+            # Only the parse counts as csv_read, not what the caller does between chunks
+            with stage(CSV_READ):
+                chunk = next(reader, None)
+                if chunk is not None:
+                    chunk = _shape(chunk, schema, names)
+            if chunk is None:
+                return
+            yield chunk, min(1.0, f.tell() / size)
@@ -0,0 +1,167 @@
+"""
+Log and progress callbacks for the engines.
+
+Engine functions take log(message, level="INFO") and progress(value, description)
+callbacks. Headless callers get print_log/no_progress; the GUI modules use a
+LogSink, which lets worker threads log without touching Tk: records go onto a
+queue and the UI drains them in batches on a fixed tick.
+
+Every record (CLI and GUI) is also written to a rotating file, Logs/reportprocessor.log,
+with millisecond timestamps for later performance analysis.
+"""
+import logging
+import queue
+import sys
+import threading
+from collections import deque
+from datetime import datetime
+from logging.handlers import RotatingFileHandler
+
+from reportprocessor.paths import LOG_FILE
+
+LOG_FILE_MAX_BYTES = 2 * 1024 * 1024
+LOG_FILE_BACKUPS = 5
+
+_file_logger = None
+_file_logger_lock = threading.Lock()
+
+
+def file_logger():
+    """
+    The shared "reportprocessor" logger writing to LOG_FILE, set up on first use.
+    If the log folder can't be created the logger has no handler and records are dropped.
+    """
+    global _file_logger
+    with _file_logger_lock:
+        if _file_logger is None:
+            logger = logging.getLogger("reportprocessor")
+            logger.setLevel(logging.INFO)
+            logger.propagate = False
+            try:
+                LOG_FILE.parent.mkdir(parents=True, exist_ok=True)
+                handler = RotatingFileHandler(LOG_FILE, maxBytes=LOG_FILE_MAX_BYTES,
+                                              backupCount=LOG_FILE_BACKUPS, encoding="utf-8")
+                handler.setFormatter(logging.Formatter("%(asctime)s.%(msecs)03d | %(source)s | %(kind)s | %(message)s",
+                                                       "%Y-%m-%d %H:%M:%S"))
+                logger.addHandler(handler)
+            except OSError:
+                pass
+            _file_logger = logger
+        return _file_logger
+
+
+def write_record(source, kind, message):
+    """Append one record to the rotating log file; kind is a level ("INFO", "ERROR", ...) or "PROGRESS" """
+    file_logger().info(message, extra={"source": source, "kind": kind})
+
+
+def print_log(message, level="INFO"):
+    """Timestamped log line on stderr, keeping stdout free for machine-readable output"""
+    timestamp = datetime.now().strftime("%H:%M:%S")
+    # One write per line, so lines from concurrent stages don't interleave
+    print(f"[{timestamp}] {level}: {message}\n", end="", file=sys.stderr, flush=True)
+    write_record("cli", level, message)
+
+
+def no_progress(value, description):
+    """Progress callback that ignores updates"""
+
+
+class LogSink:
+    """
+    Thread-safe log/progress sink for one GUI module.
+    log() and progress() may be called from any thread; they only enqueue.
+    attach() drains the queue on the Tk thread every interval_ms, hands the new
+    lines to on_lines in one batch and only the latest progress to on_progress.
+    The last `capacity` lines are kept in `lines`.
+    """
+
+    def __init__(self, source, capacity=500, echo=False):
+        """
+        Args:
+            source: Name recorded in the log file (e.g. "pickup")
+            capacity: Lines kept in memory
+            echo: Also print each line to stdout
+        """
+        self.source = source
+        self.echo = echo
+        self.lines = deque(maxlen=capacity)
+        self._queue = queue.SimpleQueue()
+
+    def format(self, message, level):
+        timestamp = datetime.now().strftime("%H:%M:%S")
+        return f"[{timestamp}] {level}: {message}" if level else f"[{timestamp}] {message}"
+
+    def log(self, message, level="INFO"):
+        line = self.format(message, level)
+        self._queue.put(("log", line))
+        write_record(self.source, level or "INFO", message)
+        if self.echo:
+            print(line)
+
+    def progress(self, value, description):
+        self._queue.put(("progress", (value, description)))
+        write_record(self.source, "PROGRESS", f"{value:.3f} {description}")
+
+    def drain(self):
+        """
+        Take everything queued so far.
+        Returns:
+            (new lines, latest (value, description) or None)
+        """
+        new_lines = []
+        latest_progress = None
+        while True:
+            try:
+                kind, payload = self._queue.get_nowait()
+            except queue.Empty:
+                break
+            if kind == "log":
+                new_lines.append(payload)
+            else:
+                latest_progress = payload
+        self.lines.extend(new_lines)
+        return new_lines, latest_progress
+
+    def clear(self):
+        self.drain()
+        self.lines.clear()
+
+    def attach(self, widget, on_lines=None, on_progress=None, interval_ms=100):
+        """
+        Drain on widget's Tk thread every interval_ms until the widget is destroyed.
+        Args:
+            on_lines: callback(list of new lines), called once per tick with new lines
+            on_progress: callback(value, description) with the latest progress of the tick
+        """
+        def tick():
+            try:
+                if not widget.winfo_exists():
+                    return
+            except Exception:
+                return
+            new_lines, latest_progress = self.drain()
+            if new_lines and on_lines:
+                on_lines(new_lines)
+            if latest_progress and on_progress:
+                on_progress(*latest_progress)
+            widget.after(interval_ms, tick)
+
+        widget.after(interval_ms, tick)
+
+
+def text_appender(text_widget, max_lines):
+    """
+    on_lines callback for LogSink.attach that appends to a Tk/CTk text widget,
+    dropping the oldest lines beyond max_lines.
+    """
+    def append(new_lines):
+        text = "\n".join(new_lines) + "\n"
+        if text_widget.index("end-1c") != "1.0" and text_widget.get("end-2c", "end-1c") != "\n":
+            text = "\n" + text  # Existing text (e.g. a placeholder) without a trailing newline
+        text_widget.insert("end", text)
+        line_count = int(text_widget.index("end-1c").split(".")[0])
+        if line_count > max_lines:
+            text_widget.delete("1.0", f"{line_count - max_lines + 1}.0")
+        text_widget.see("end")
+    return append
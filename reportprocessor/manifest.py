@@ -0,0 +1,349 @@
+"""
+Meesho Manifest.pdf extraction.
+
+Page 1 of the manifest is the summary sheet. Every following page carries a
+"Courier : <name>" line and a fixed-layout table whose column 1 holds the Sub
+Order No and column 2 the AWB number.
+
+Pages are read with a text-layer fast path: words are extracted once and binned
+into the table's column x-ranges and ruled rows. The layout is calibrated from
+the first page parsed with pdfplumber's table finder, and any page that fails
+validation is re-read with extract_tables().
+
+Pages are parsed by one generator, iter_manifest_pages(), and collected into a
+columnar frame (read_manifest_rows()) that the pickup and cancellation reports
+take their views from. Parsed rows can be cached on disk by the PDF's content
+hash, so the two runs parse a given manifest only once.
+"""
+import math
+import os
+import re
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import numpy as np
+import pandas as pd
+import pdfplumber
+
+from reportprocessor import cache
+from reportprocessor.timing import timed, PDF_PARSE
+
+KNOWN_COURIERS = ["Delhivery", "Ecom Express", "Xpressbees"]
+SUB_ORDER_COL = 1
+AWB_COL = 2
+
+AWB_PATTERN = re.compile(r"^[A-Za-z0-9-]{6,30}$")
+
+# Below this many pages the pool start-up costs more than it saves
+MIN_PAGES_FOR_POOL = 20
+
+# Words whose tops are this close (in points) sit on the same text line
+LINE_TOLERANCE = 3
+
+# Bump when the cached row layout or the parsing rules change
+CACHE_KIND = "manifest-v1"
+
+# Columns of read_manifest_rows()
+ROW_COLUMNS = ["page", "courier", "sub_order", "awb"]
+
+# Column x-ranges of the manifest table plus the AWB header text that marks the header row
+TableLayout = namedtuple("TableLayout", ["columns", "awb_header"])
+
+
+def parse_courier_name(page_text, default):
+    """Return the courier named on the page's "Courier :" line, or default"""
+    if "Courier :" in page_text:
+        return page_text.split("Courier :")[1].split("\n")[0].strip()
+    return default
+
+
+def _group_lines(words):
+    """Group words into text lines (top to bottom), each line sorted left to right"""
+    lines = []
+    for word in sorted(words, key=lambda w: (w["top"], w["x0"])):
+        if lines and word["top"] - lines[-1][0]["top"] <= LINE_TOLERANCE:
+            lines[-1].append(word)
+        else:
+            lines.append([word])
+    return [sorted(line, key=lambda w: w["x0"]) for line in lines]
+
+
+def _cell_text(words):
+    """Rebuild a cell's text the way extract_tables() would: words joined by spaces, lines by newlines"""
+    return "\n".join(" ".join(w["text"] for w in line) for line in _group_lines(words))
+
+
+def _table_rows(tables):
+    """(sub_order, awb) pairs from extract_tables()-style output"""
+    rows = []
+    for table in tables:
+        for row in table[1:]:
+            if len(row) > AWB_COL:
+                sub_order = str(row[SUB_ORDER_COL] or "").replace("\n", "").strip()
+                awb = str(row[AWB_COL] or "").strip()
+                rows.append((sub_order, awb))
+    return rows
+
+
+def _calibrate(found_tables, tables):
+    """Learn the column layout from the first table the table finder resolved cleanly"""
+    for found, table in zip(found_tables, tables):
+        header_cells = found.rows[0].cells if found.rows else []
+        if len(header_cells) <= AWB_COL or any(cell is None for cell in header_cells):
+            continue
+        awb_header = " ".join(str(table[0][AWB_COL] or "").split()) if table else ""
+        if not awb_header:
+            continue
+        columns = tuple((cell[0], cell[2]) for cell in header_cells)
+        return TableLayout(columns, awb_header)
+    return None
+
+
+def _read_page_tables(page):
+    """Slow path: pdfplumber table detection. Returns (page_text, rows, layout)"""
+    found_tables = page.find_tables()
+    tables = [found.extract() for found in found_tables]
+    page_text = page.extract_text() or ""
+    return page_text, _table_rows(tables), _calibrate(found_tables, tables)
+
+
+def _column_for(x, columns):
+    for idx, (x0, x1) in enumerate(columns):
+        if x0 <= x < x1:
+            return idx
+    return None
+
+
+def _read_page_words(page, layout):
+    """
+    Fast path: bin the page's words into the calibrated columns and ruled rows.
+    Returns (page_text, rows), or None when the page does not validate.
+    """
+    words = page.extract_words()
+    page_text = "\n".join(" ".join(w["text"] for w in line) for line in _group_lines(words))
+
+    # Row bands come from the horizontal rulings crossing the AWB column
+    awb_x0, awb_x1 = layout.columns[AWB_COL]
+    awb_mid = (awb_x0 + awb_x1) / 2
+    ys = sorted({round(edge["top"], 1) for edge in page.horizontal_edges if edge["x0"] <= awb_mid <= edge["x1"]})
+    bands = [(top, bottom) for top, bottom in zip(ys, ys[1:]) if bottom - top > 1]
+    if not bands:
+        return None
+
+    band_cells = [{} for _ in bands]
+    band_idx = 0
+    for word in sorted(words, key=lambda w: w["top"]):
+        col = _column_for((word["x0"] + word["x1"]) / 2, layout.columns)
+        if col not in (SUB_ORDER_COL, AWB_COL):
+            continue
+        middle = (word["top"] + word["bottom"]) / 2
+        while band_idx < len(bands) and middle >= bands[band_idx][1]:
+            band_idx += 1
+        if band_idx == len(bands):
+            break
+        if middle > bands[band_idx][0]:
+            band_cells[band_idx].setdefault(col, []).append(word)
+
+    header_idx = None
+    for idx, cells in enumerate(band_cells):
+        if " ".join(_cell_text(cells.get(AWB_COL, [])).split()) == layout.awb_header:
+            header_idx = idx
+            break
+    if header_idx is None:
+        return None
+
+    rows = []
+    awb_words = 0
+    for cells in band_cells[header_idx + 1:]:
+        if not cells:
+            continue
+        sub_order = _cell_text(cells.get(SUB_ORDER_COL, [])).replace("\n", "").strip()
+        awb = _cell_text(cells.get(AWB_COL, [])).strip()
+        if not sub_order or not AWB_PATTERN.match(awb):
+            return None
+        awb_words += len(cells[AWB_COL])
+        rows.append((sub_order, awb))
+
+    # One AWB word per ruled row, otherwise a ruling line was missed and rows merged
+    if not rows or awb_words != len(rows):
+        return None
+
+    return page_text, rows
+
+
+def _read_page(page, layout, fast):
+    """Read one page. Returns (courier_name or None, rows, layout, used_fast_path)"""
+    result = _read_page_words(page, layout) if fast and layout else None
+    used_fast = result is not None
+    if result:
+        page_text, rows = result
+        if "Courier :" not in page_text:
+            # Word spacing differs from extract_text(); ask pdfplumber for the courier line
+            page_text = page.extract_text() or ""
+    else:
+        page_text, rows, page_layout = _read_page_tables(page)
+        layout = page_layout or layout
+
+    courier_name = parse_courier_name(page_text, None)
+
+    # Drop cached chars/objects so long manifests don't pile up in memory
+    page.close()
+    return courier_name, rows, layout, used_fast
+
+
+def _read_page_range(pdf_path, start, stop, fast=True):
+    """Worker entry point: read pages [start, stop) with its own pdfplumber handle"""
+    results = []
+    layout = None
+    with pdfplumber.open(pdf_path) as reader:
+        for i in range(start, stop):
+            courier_name, rows, layout, _ = _read_page(reader.pages[i], layout, fast)
+            results.append((courier_name, rows))
+    return start, results
+
+
+class RowBuffer:
+    """
+    Columnar accumulator for read_manifest_rows(). Page number and courier are kept once
+    per page and repeated when the frame is built; sub orders and AWBs are extended a
+    page at a time, so no per-row objects are made beyond the parsed strings.
+    """
+
+    def __init__(self):
+        self.page_numbers = []
+        self.couriers = []
+        self.counts = []
+        self.sub_orders = []
+        self.awbs = []
+
+    def add(self, page_no, courier_name, rows):
+        if rows:
+            sub_orders, awbs = zip(*rows)
+            self.sub_orders.extend(sub_orders)
+            self.awbs.extend(awbs)
+        else:
+            self.sub_orders.append(None)
+            self.awbs.append(None)
+        self.page_numbers.append(page_no)
+        self.couriers.append(courier_name)
+        self.counts.append(max(1, len(rows)))
+
+    def frame(self):
+        counts = np.asarray(self.counts, dtype=np.int64)
+        couriers = np.empty(len(self.couriers), dtype=object)
+        couriers[:] = self.couriers
+        return pd.DataFrame({
+            "page": np.repeat(np.asarray(self.page_numbers, dtype=np.int64), counts),
+            "courier": np.repeat(couriers, counts),
+            "sub_order": self.sub_orders,
+            "awb": self.awbs,
+        }, columns=ROW_COLUMNS)
+
+
+def iter_manifest_pages(pdf_path, workers=None, progress=None, fast=True):
+    """
+    Parse every manifest page after the first, yielding them in page order as they are read.
+    Args:
+        workers: Worker processes to use; None means one per CPU, 1 forces the serial path
+        progress: Optional callback(pages_done, total_pages)
+        fast: Use the text-layer fast path; False runs extract_tables() on every page
+    Yields:
+        (courier_name or None, [(sub_order, awb), ...]) per page
+    """
+    if workers is None:
+        workers = os.cpu_count() or 1
+
+    with pdfplumber.open(pdf_path) as reader:
+        page_count = len(reader.pages)
+        total_pages = page_count - 1
+
+        if workers <= 1 or total_pages < MIN_PAGES_FOR_POOL:
+            layout = None
+            for idx, page in enumerate(reader.pages[1:]):
+                courier_name, rows, layout, _ = _read_page(page, layout, fast)
+                if progress:
+                    progress(idx + 1, total_pages)
+                yield courier_name, rows
+            return
+
+    # Several chunks per worker keeps the pool busy and the progress bar moving
+    chunk_size = max(1, math.ceil(total_pages / (workers * 4)))
+    starts = list(range(1, page_count, chunk_size))
+    chunks = {}
+    next_chunk = 0
+    pages_done = 0
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = [
+            pool.submit(_read_page_range, pdf_path, start, min(start + chunk_size, page_count), fast)
+            for start in starts
+        ]
+        for future in as_completed(futures):
+            start, results = future.result()
+            chunks[start] = results
+            pages_done += len(results)
+            if progress:
+                progress(pages_done, total_pages)
+            # Hand on every chunk that is now next in page order
+            while next_chunk < len(starts) and starts[next_chunk] in chunks:
+                yield from chunks.pop(starts[next_chunk])
+                next_chunk += 1
+
+
+@timed(PDF_PARSE)
+def read_manifest_rows(pdf_path, workers=None, progress=None, fast=True, cache_dir=None):
+    """
+    Read every manifest page after the first into one columnar frame.
+    Args:
+        pdf_path: Path to Manifest.pdf
+        workers, progress, fast: As for iter_manifest_pages()
+        cache_dir: Directory for the parse cache; None disables caching
+    Returns:
+        DataFrame with ROW_COLUMNS, one row per table row in page order; a page without
+        table rows keeps one row with null sub_order and awb
+    """
+    if cache_dir is None or not cache.available():
+        return _parse_manifest_rows(pdf_path, workers, progress, fast)
+
+    entry = cache.entry_path(cache_dir, CACHE_KIND, cache.file_digest(pdf_path))
+    rows = cache.read_frame(entry)
+    if rows is not None:
+        if progress and len(rows):
+            total_pages = int(rows["page"].iloc[-1]) + 1
+            progress(total_pages, total_pages)
+        return rows
+
+    rows = _parse_manifest_rows(pdf_path, workers, progress, fast)
+    cache.write_frame(entry, rows)
+    return rows
+
+
+def _parse_manifest_rows(pdf_path, workers, progress, fast):
+    """Parse the manifest into a RowBuffer without touching the cache"""
+    buffer = RowBuffer()
+    for page_no, (courier_name, rows) in enumerate(iter_manifest_pages(str(pdf_path), workers, progress, fast)):
+        buffer.add(page_no, courier_name, rows)
+    return buffer.frame()
+
+
+def courier_awbs(rows):
+    """Pickup view of read_manifest_rows(): {courier ("Others" if unknown): [awb, ...]}, in page order"""
+    couriers = rows["courier"].where(rows["courier"].isin(KNOWN_COURIERS), "Others")
+    awbs = rows["awb"]
+    keep = awbs.notna() & (awbs != "")
+    kept = awbs[keep].groupby(couriers[keep], sort=False).agg(list)
+    return {courier: kept.get(courier, []) for courier in couriers.unique()}
+
+
+def sub_order_rows(rows):
+    """
+    Cancellation view of read_manifest_rows(): its table rows grouped by courier ("Unknown Courier"
+    when missing) in order of first appearance, page order within each.
+    Returns:
+        DataFrame with courier, sub_order and awb columns
+    """
+    rows = rows[rows["sub_order"].notna()]
+    named = rows["courier"].notna() & (rows["courier"] != "")
+    couriers = rows["courier"].where(named, "Unknown Courier")
+    order = np.argsort(pd.factorize(couriers)[0], kind="stable")
+    return rows.assign(courier=couriers).iloc[order][["courier", "sub_order", "awb"]].reset_index(drop=True)
@@ -0,0 +1,35 @@
+"""
+Input, template and output locations shared by the GUI modules and the CLI.
+"""
+import sys
+from pathlib import Path
+
+# Get the directory where the exe is located
+if getattr(sys, 'frozen', False):
+    BASE_DIR = Path(sys.executable).parent
+else:
+    BASE_DIR = Path(__file__).resolve().parent.parent
+
+TEMPLATE_DIR = BASE_DIR / "Template"
+OUTPUT_DIR = BASE_DIR / "Output"
+CACHE_DIR = BASE_DIR / "Cache"  # Parsed inputs keyed by file hash, shared across modules
+LOG_FILE = BASE_DIR / "Logs" / "reportprocessor.log"  # Rotating record of every log line and progress update
+SOURCES_OVERRIDE = BASE_DIR / "sources.json"  # Replaces the bundled marketplace source registry when present
+
+# Pickup report
+PICKUP_INPUT_DIR = BASE_DIR / "inputdir" / "PickupReportfiles"
+PICKUP_TEMPLATE = TEMPLATE_DIR / "Pickup Report.xlsx"
+PIVOT_PNG_DIR = OUTPUT_DIR / "Pivot_PNGs"
+
+# Returns reconciliation
+RETURNS_INPUT_DIR = BASE_DIR / "inputdir" / "Returnsreportfiles"
+RETURNS_TEMPLATE = TEMPLATE_DIR / "ReturnsReconcileReport.xlsx"
+RETURNS_OUTPUT_FILE = OUTPUT_DIR / "Returns Reconcile Report.xlsx"
+RETURNS_STORE_FILE = BASE_DIR / "Data" / "returns.sqlite3"  # Every return seen so far, for the delta report
+
+# Cancellation report
+CANCEL_INPUT_DIR = BASE_DIR / "InputDIR" / "CancellationReport"
+CANCEL_PICKUP_DIR = BASE_DIR / "InputDIR" / "PickupReportfiles"
+CANCEL_OUTPUT_FILE = BASE_DIR / "OutputDIR" / "Cancel_product_report.xlsx"
+CANCEL_BACKFILL_DIR = BASE_DIR / "InputDIR" / "Backfill"  # Per-day input folders (YYYY-MM-DD) for backfill runs
+CANCEL_BACKFILL_OUTPUT_DIR = BASE_DIR / "OutputDIR" / "Backfill"
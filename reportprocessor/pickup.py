@@ -0,0 +1,527 @@
+"""
+Pickup report engine.
+
+Writes the tracking IDs from the marketplace CSVs and the Meesho Manifest.pdf
+into the "Entry tracking ID" sheet of the pickup template and renders the
+per-source pivot images.
+"""
+import re
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import datetime
+from pathlib import Path
+
+import pandas as pd
+from openpyxl import load_workbook
+from openpyxl.styles import Font
+
+from reportprocessor.excel import merged_index, write_column
+from reportprocessor.ingest import read_source, pickup_schema
+from reportprocessor.logs import print_log, no_progress
+from reportprocessor.manifest import courier_awbs, read_manifest_rows
+from reportprocessor.paths import PICKUP_INPUT_DIR, PICKUP_TEMPLATE, OUTPUT_DIR, PIVOT_PNG_DIR, CACHE_DIR
+from reportprocessor.sources import pickup_sources
+from reportprocessor import cache, pivots, timing
+
+# Worker processes for Manifest.pdf extraction (None = one per CPU, 1 = serial)
+PDF_WORKERS = None
+
+# Pivot image renderer: "pillow" (fast, see reportprocessor.pivots) or "matplotlib" (300 dpi table)
+PIVOT_RENDERER = "pillow"
+
+# Where the per-source SKU/Count pivots go: "png" (Pivot_PNGs images), "sheet" (a sheet
+# per source in the pickup report) or "both"
+PIVOT_OUTPUT = "png"
+PIVOT_OUTPUTS = ("png", "sheet", "both")
+
+# First page of Manifest.pdf saved as the Meesho pivot image: render scale (1 = 72 dpi) and format
+# ("png", "jpeg" or "webp"). Renders are cached in CACHE_DIR by the PDF's content hash
+SNAPSHOT_SCALE = 2
+SNAPSHOT_FORMAT = "png"
+SNAPSHOT_KIND = "manifest-snapshot-v1"
+MANIFEST_SNAPSHOT = "Meesho_Pivot_Page"
+
+TRACKING_SHEET = "Entry tracking ID"
+START_ROW = 3
+
+# --- Mapping (column → courier source) ---
+prefix_mapping = {
+    "A3": "Sellerflex",
+    "D3": "Flipkart KC",
+    "E3": "Flipkart LL",
+    "F3": "Meesho - Xpressbees",
+    "G3": "Meesho - Ecom Express",
+    "H3": "Meesho - Delhivery",
+    "I3": "Others"
+}
+
+# CSV input files with their tracking & pivot config come from the source registry
+# (reportprocessor/sources.json, see reportprocessor.sources.pickup_sources)
+
+MANIFEST_FILE = "Manifest.pdf"
+
+
+class MissingTemplateError(FileNotFoundError):
+    """The pickup template to fill does not exist"""
+
+
+def default_output_file():
+    return OUTPUT_DIR / f"Pickup_Report_{datetime.today().strftime('%d-%m-%Y')}.xlsx"
+
+
+def extract_from_csv(path, tracking_col, log=print_log, pivot_columns=None):
+    """
+    Tracking IDs from one marketplace CSV, plus the frame the pivot is built from.
+    With pivot_columns only the tracking and pivot columns are read (see reportprocessor.ingest);
+    without, every column is read as text.
+    """
+    try:
+        if pivot_columns:
+            df = read_source(path, pickup_schema(tracking_col, pivot_columns), required=False)
+        else:
+            df = pd.read_csv(path, dtype=str)
+        if tracking_col not in df.columns:
+            log(f"Warning: Column '{tracking_col}' not found in {path}", "WARN")
+            return [], df
+        tracking_ids = df[tracking_col].dropna().astype(str).tolist()
+        log(f"Extracted {len(tracking_ids)} tracking IDs from {path.name}")
+        return tracking_ids, df
+    except FileNotFoundError:
+        log(f"File not found: {path}", "ERROR")
+        return [], pd.DataFrame()
+    except Exception as e:
+        log(f"Error reading {path}: {e}", "ERROR")
+        return [], pd.DataFrame()
+
+
+def extract_data_from_pdf(pdf_path, log=print_log, progress=no_progress, workers=PDF_WORKERS, cache_dir=CACHE_DIR,
+                          manifest_rows=None):
+    """Courier -> AWB list from Manifest.pdf; pass manifest_rows to reuse an earlier read_manifest_rows() result"""
+    if manifest_rows is not None:
+        courier_data = courier_awbs(manifest_rows)
+        log(f"Extracted AWB data from PDF: {dict((k, len(v)) for k, v in courier_data.items())}")
+        return courier_data
+
+    if not pdf_path.exists():
+        log(f"PDF file not found: {pdf_path}", "WARN")
+        return {}
+
+    courier_data = {}
+
+    def pdf_progress(pages_done, total_pages):
+        # PDF processing owns the 0.6 - 0.7 slice of the progress bar
+        progress(0.6 + (0.1 * pages_done / total_pages), f"Processing PDF page {pages_done}/{total_pages}")
+
+    try:
+        courier_data = courier_awbs(read_manifest_rows(pdf_path, workers=workers, progress=pdf_progress,
+                                                       cache_dir=cache_dir))
+        log(f"Extracted AWB data from PDF: {dict((k, len(v)) for k, v in courier_data.items())}")
+    except Exception as e:
+        log(f"Error processing PDF {pdf_path}: {e}", "ERROR")
+
+    return courier_data
+
+
+def pivot_counts(df, pivot_columns):
+    """SKU/Count table: pivot_columns[1] summed per pivot_columns[0]"""
+    sku_col, qty_col = pivot_columns
+    quantities = pd.to_numeric(df[qty_col], errors='coerce').fillna(0)
+    pivot = quantities.groupby(df[sku_col]).sum().reset_index()
+    pivot.columns = ['SKU', 'Count']
+    return pivot
+
+
+def source_pivot(df, pivot_columns, title, log=print_log):
+    """pivot_counts() for one source, or None (with a warning) when df can't be pivoted"""
+    if df.empty:
+        log(f"Empty DataFrame for {title}, skipping pivot creation.", "WARN")
+        return None
+
+    sku_col, qty_col = pivot_columns
+    if sku_col not in df.columns or qty_col not in df.columns:
+        log(f"Required columns '{sku_col}' and '{qty_col}' not found for {title}.", "WARN")
+        return None
+
+    return pivot_counts(df, pivot_columns)
+
+
+def create_pivot_image(df, pivot_columns, title, filename, log=print_log, renderer=None):
+    try:
+        pivot = source_pivot(df, pivot_columns, title, log)
+        if pivot is not None:
+            save_pivot_image(pivot, title, filename, log, renderer)
+    except Exception as e:
+        log(f"Error creating pivot table for {title}: {e}", "ERROR")
+
+
+@timing.timed(timing.PIVOT_RENDER)
+def save_pivot_image(pivot, title, filename, log=print_log, renderer=None):
+    """Render a pivot_counts() table to filename; errors are logged"""
+    try:
+        if (renderer or PIVOT_RENDERER) == "matplotlib":
+            render_matplotlib_pivot(pivot, title, filename)
+        else:
+            filename = pivots.render_pivot_table(title, pivot.itertuples(index=False, name=None), filename)
+        log(f"Pivot table saved: {filename.name}")
+
+    except Exception as e:
+        log(f"Error creating pivot table for {title}: {e}", "ERROR")
+
+
+def render_matplotlib_pivot(pivot, title, filename):
+    """Original table renderer: matplotlib table saved at 300 dpi"""
+    # Figure + Agg canvas rather than pyplot: no GUI backend, safe off the main thread
+    from matplotlib.figure import Figure
+    from matplotlib.backends.backend_agg import FigureCanvasAgg
+
+    row_count = len(pivot)
+    fig_height = max(4, 0.35 * (row_count + 2))
+    fig = Figure(figsize=(8, fig_height))
+    FigureCanvasAgg(fig)
+    ax = fig.subplots()
+    ax.axis('off')
+
+    full_data = [[title, '']] + [pivot.columns.tolist()] + pivot.values.tolist()
+
+    table = ax.table(
+        cellText=full_data,
+        loc='center',
+        cellLoc='center',
+        colWidths=[0.8, 0.2],
+    )
+
+    table.auto_set_font_size(False)
+    table.set_fontsize(12)
+
+    for (row, col), cell in table.get_celld().items():
+        cell.set_linewidth(0.4)
+        if row == 0:
+            cell.set_text_props(weight='bold', fontsize=14)
+            cell.set_fontsize(14)
+            cell.set_facecolor('#FFFFFF')
+            cell.set_height(0.5)
+            cell.visible_edges = 'open'
+        elif row == 1:
+            cell.set_text_props(weight='bold')
+
+    fig.tight_layout(pad=0)
+    fig.savefig(filename, bbox_inches='tight', dpi=300, pad_inches=0.02)
+
+
+@timing.timed(timing.PIVOT_RENDER)
+def save_first_page_of_pdf_as_png(pdf_path, output_path, log=print_log, scale=None, fmt=None, cache_dir=CACHE_DIR):
+    """
+    Save the first page of pdf_path as an image; errors are logged.
+    Args:
+        output_path: Target path; its suffix is replaced to match fmt
+        scale: Render scale, SNAPSHOT_SCALE when None
+        fmt: "png", "jpeg" or "webp"; SNAPSHOT_FORMAT when None
+        cache_dir: Directory for the render cache; None always renders
+    Returns:
+        Path of the written image, or None
+    """
+    scale = scale or SNAPSHOT_SCALE
+    fmt = (fmt or SNAPSHOT_FORMAT).lower()
+    try:
+        if not pdf_path.exists():
+            log(f"PDF file not found: {pdf_path}", "WARN")
+            return None
+        if fmt not in pivots.FORMAT_SUFFIX:
+            raise ValueError(f"Unsupported snapshot format: {fmt}")
+        output_path = Path(output_path).with_suffix(pivots.FORMAT_SUFFIX[fmt])
+
+        entry = None
+        if cache_dir is not None:
+            entry = cache.entry_path(cache_dir, f"{SNAPSHOT_KIND}-{scale:g}x", cache.file_digest(pdf_path),
+                                     pivots.FORMAT_SUFFIX[fmt])
+            if cache.copy_file(entry, output_path):
+                log(f"Saved first page as {fmt.upper()} (cached): {output_path.name}")
+                return output_path
+
+        render_first_page(pdf_path, output_path, scale, fmt)
+        if entry is not None:
+            cache.write_file(entry, output_path, log)
+        log(f"Saved first page as {fmt.upper()}: {output_path.name}")
+        return output_path
+    except Exception as e:
+        log(f"Error saving PDF page as image: {e}", "ERROR")
+        return None
+
+
+def render_first_page(pdf_path, output_path, scale, fmt):
+    """Render page 0 with pdfium and save it; the page and document are closed either way"""
+    import pypdfium2
+
+    pdf = pypdfium2.PdfDocument(str(pdf_path))
+    try:
+        page = pdf[0]
+        try:
+            image = page.render(scale=scale).to_pil()
+        finally:
+            page.close()
+    finally:
+        pdf.close()
+
+    if fmt == "jpeg" and image.mode not in ("RGB", "L"):
+        image = image.convert("RGB")
+    image.save(output_path, format=fmt.upper(), **pivots.SAVE_OPTIONS[fmt])
+
+
+def start_manifest_snapshot(pdf_path, log=print_log):
+    """
+    Start save_first_page_of_pdf_as_png() for the Meesho pivot image on a background
+    thread, so it renders while the manifest tables are read.
+    Returns:
+        Future of the written image path (or None)
+    """
+    PIVOT_PNG_DIR.mkdir(parents=True, exist_ok=True)
+    pool = ThreadPoolExecutor(max_workers=1)
+    future = pool.submit(timing.bind(save_first_page_of_pdf_as_png), pdf_path, PIVOT_PNG_DIR / MANIFEST_SNAPSHOT, log)
+    pool.shutdown(wait=False)
+    return future
+
+
+def check_required_files(template_file=None, input_dir=PICKUP_INPUT_DIR):
+    """Check if all required files exist"""
+    template_file = Path(template_file) if template_file else PICKUP_TEMPLATE
+    meesho_pdf = input_dir / MANIFEST_FILE
+
+    missing_files = []
+
+    if not template_file.exists():
+        missing_files.append(f"Template: {template_file}")
+
+    for csv_name in pickup_sources():
+        csv_path = input_dir / csv_name
+        if not csv_path.exists():
+            missing_files.append(f"CSV: {csv_path}")
+
+    if not meesho_pdf.exists():
+        missing_files.append(f"PDF: {meesho_pdf}")
+
+    return missing_files, template_file, meesho_pdf
+
+
+@timing.timed(timing.CELL_WRITE)
+def write_tracking_column(ws, col, start_row, values, numeric=False, log=print_log):
+    """Bulk-write a deduplicated ID list down one column (numeric=True stores all-digit IDs as numbers)"""
+    try:
+        write_column(ws, col, start_row, values, numeric=numeric)
+    except Exception as e:
+        log(f"Error writing column {col} from row {start_row}: {e}", "ERROR")
+
+
+def read_csv_source(path, config, log=print_log):
+    """
+    One pickup CSV (config is its pickup_sources() entry).
+    Returns:
+        (deduplicated tracking IDs or None when there are none, pivot_counts() table or None)
+    """
+    source_name = config["source_name"]
+    pivot_columns = config["pivot_columns"]
+
+    log(f"Processing {source_name} from {path.name}")
+    tracking_ids, df = extract_from_csv(path, config["tracking_column"], log, pivot_columns)
+
+    if not tracking_ids:
+        log(f"No tracking IDs found for {source_name}", "WARN")
+        return None, None
+
+    title = f"{source_name} Pivot Table"
+    try:
+        pivot = source_pivot(df, pivot_columns, title, log)
+    except Exception as e:
+        log(f"Error creating pivot table for {title}: {e}", "ERROR")
+        pivot = None
+
+    # Remove duplicates
+    return list(dict.fromkeys(tracking_ids)), pivot
+
+
+def collect_csv_sources(input_dir=PICKUP_INPUT_DIR, log=print_log, progress=no_progress, pivot_output=None):
+    """
+    Read the marketplace CSVs that are present and compute their SKU/Count pivots,
+    all sources concurrently. With pivot_output "png" or "both" the pivot images
+    are rendered too (concurrently, once all CSVs are read).
+    Returns:
+        (dict mapping source name to its deduplicated tracking IDs,
+         dict mapping source name to its pivot_counts() table)
+    """
+    pivot_output = pivot_output or PIVOT_OUTPUT
+    csv_ids = {}
+    pivot_tables = {}
+    pivot_jobs = []
+
+    # Process CSVs that are available, all at once
+    present = []
+    for csv_name, config in pickup_sources().items():
+        path = input_dir / csv_name
+        if not path.exists():
+            log(f"Skipping missing source: {path.name}", "WARN")
+            continue
+        present.append((path, config))
+
+    results = {}
+    with ThreadPoolExecutor(max_workers=max(1, len(present))) as pool:
+        futures = {pool.submit(timing.bind(read_csv_source), path, config, log): idx for idx, (path, config) in enumerate(present)}
+        for done, future in enumerate(as_completed(futures), start=1):
+            idx = futures[future]
+            results[idx] = future.result()
+            progress(0.1 + (0.4 * done / len(present)), f"Processed {present[idx][1]['source_name']}")
+
+    for idx, (path, config) in enumerate(present):
+        source_name = config["source_name"]
+        tracking_ids, pivot = results[idx]
+        if tracking_ids is None:
+            continue
+        csv_ids[source_name] = tracking_ids
+        if pivot is None:
+            continue
+        pivot_tables[source_name] = pivot
+
+        if pivot_output in ("png", "both"):
+            img_path = PIVOT_PNG_DIR / f"{source_name.replace(' ', '_')}_pivot.png"
+            pivot_jobs.append((pivot, f"{source_name} Pivot Table", img_path, log))
+
+    if pivot_jobs:
+        PIVOT_PNG_DIR.mkdir(parents=True, exist_ok=True)
+        with ThreadPoolExecutor(max_workers=len(pivot_jobs)) as pool:
+            list(pool.map(lambda job: timing.bind(save_pivot_image)(*job), pivot_jobs))
+
+    return csv_ids, pivot_tables
+
+
+@timing.timed(timing.CELL_WRITE)
+def write_pivot_sheets(wb, pivot_tables, log=print_log):
+    """
+    Write each source's pivot as its own "<source> Pivot" sheet: title, a filtered
+    SKU/Count header and one row per SKU. A sheet of that name in the template is replaced.
+    """
+    for source_name, pivot in pivot_tables.items():
+        sheet_name = f"{source_name} Pivot"[:31]
+        if sheet_name in wb.sheetnames:
+            del wb[sheet_name]
+        ws = wb.create_sheet(sheet_name)
+
+        ws.append([f"{source_name} Pivot Table"])
+        ws["A1"].font = Font(bold=True, size=14)
+        ws.append(["SKU", "Count"])
+        ws["A2"].font = ws["B2"].font = Font(bold=True)
+        for row in pivot.itertuples(index=False, name=None):
+            ws.append(row)
+
+        ws.column_dimensions["A"].width = 40
+        ws.column_dimensions["B"].width = 12
+        ws.freeze_panes = "A3"
+        ws.auto_filter.ref = f"A2:B{len(pivot) + 2}"
+        log(f"Pivot sheet written: {sheet_name} ({len(pivot)} SKUs)")
+
+
+@timing.timed_run("pickup")
+def process_pickup(template_file=None, output_file=None, input_dir=PICKUP_INPUT_DIR, log=print_log, progress=no_progress,
+                   csv_ids=None, manifest_rows=None, pivot_tables=None, pivot_output=None, snapshot=None):
+    """
+    Build the day's pickup report.
+    Args:
+        template_file: Workbook to fill; defaults to Template/Pickup Report.xlsx
+        output_file: Where to save; defaults to Output/Pickup_Report_<dd-mm-YYYY>.xlsx
+        csv_ids, pivot_tables: collect_csv_sources() results computed elsewhere; read here when csv_ids is None
+        pivot_output: "png", "sheet" or "both"; PIVOT_OUTPUT when None
+        manifest_rows: read_manifest_rows() result for Manifest.pdf computed elsewhere; read here when None
+        snapshot: start_manifest_snapshot() Future started elsewhere; started here when None
+    Returns:
+        Path of the saved workbook
+    Raises:
+        MissingTemplateError if the template is missing; any fatal processing error
+    """
+    log("Starting Pickup Report Processing...")
+    progress(0.05, "Checking required files...")
+
+    missing_files, template_file, meesho_pdf = check_required_files(template_file, input_dir)
+
+    if not template_file or not template_file.exists():
+        log("Template file is missing or invalid.", "ERROR")
+        progress(0.0, "Missing template file!")
+        raise MissingTemplateError(f"Template file not found: {template_file}")
+
+    # We allow other files to be missing; only warn
+    if missing_files:
+        log("Some input files are missing; proceeding with available files.", "WARN")
+        for file in missing_files:
+            log(f"  - Missing: {file}", "WARN")
+
+    log("Proceeding with available files...")
+    progress(0.1, "Loading template...")
+
+    output_file = Path(output_file) if output_file else default_output_file()
+    OUTPUT_DIR.mkdir(parents=True, exist_ok=True)
+    PIVOT_PNG_DIR.mkdir(parents=True, exist_ok=True)
+
+    with timing.stage(timing.WORKBOOK_LOAD):
+        wb = load_workbook(template_file)
+    if TRACKING_SHEET not in wb.sheetnames:
+        raise ValueError(f"Sheet '{TRACKING_SHEET}' not found in template.")
+
+    ws = wb[TRACKING_SHEET]
+    merged_index(ws, rebuild=True)  # One merged-cell lookup table per template load
+    ws["K1"] = datetime.today().strftime('%d-%m-%Y')
+
+    col_for = {v: re.match(r"([A-Z]+)", k).group(1) for k, v in prefix_mapping.items()}
+
+    pivot_output = pivot_output or PIVOT_OUTPUT
+    if pivot_output not in PIVOT_OUTPUTS:
+        raise ValueError(f"Unknown pivot output '{pivot_output}', expected one of {', '.join(PIVOT_OUTPUTS)}")
+
+    # The manifest snapshot renders alongside the CSV reads and the manifest table scan
+    if snapshot is None and meesho_pdf and meesho_pdf.exists():
+        snapshot = start_manifest_snapshot(meesho_pdf, log)
+
+    if csv_ids is None:
+        csv_ids, pivot_tables = collect_csv_sources(input_dir, log, progress, pivot_output)
+
+    for source_name, tracking_ids in csv_ids.items():
+        col = col_for.get(source_name)
+        if not col:
+            log(f"No column mapping found for {source_name}", "WARN")
+            continue
+
+        write_tracking_column(ws, col, START_ROW, tracking_ids, numeric=True, log=log)
+
+    # Meesho PDF Processing
+    if meesho_pdf and meesho_pdf.exists():
+        progress(0.6, "Processing Meesho PDF...")
+        log(f"Processing Meesho PDF: {meesho_pdf.name}")
+        courier_data = extract_data_from_pdf(meesho_pdf, log, progress, manifest_rows=manifest_rows)
+
+        for courier, awbs in courier_data.items():
+            column_key = f"Meesho - {courier}" if courier != "Others" else "Others"
+            if column_key not in col_for:
+                log(f"Skipping unrecognized courier: {courier}", "WARN")
+                continue
+            col = col_for[column_key]
+
+            # Remove duplicates
+            awbs = list(dict.fromkeys(awbs))
+
+            write_tracking_column(ws, col, START_ROW, awbs, log=log)
+
+        if snapshot is not None:
+            progress(0.8, "Creating Meesho pivot image...")
+            snapshot.result()
+    else:
+        log("Meesho PDF not found. Skipping PDF processing.", "WARN")
+
+    if pivot_output in ("sheet", "both") and pivot_tables:
+        progress(0.85, "Writing pivot sheets...")
+        write_pivot_sheets(wb, pivot_tables, log)
+
+    # Final steps
+    progress(0.9, "Saving Excel file...")
+    with timing.stage(timing.WORKBOOK_SAVE):
+        wb.save(output_file)
+
+    progress(1.0, "Processing completed successfully!")
+    log(f"Pickup report saved: {output_file.name}")
+    if pivot_output in ("png", "both"):
+        log(f"All pivot tables saved in: {PIVOT_PNG_DIR}")
+    log("Processing completed successfully!", "SUCCESS")
+    return output_file
@@ -0,0 +1,269 @@
+"""
+Dependency-graph scheduler for the report stages.
+
+Each stage names the stages it needs; it starts as soon as those have finished
+and receives their results as keyword arguments. pandas/CSV stages run on a
+thread pool, PROCESS stages on a process pool, so independent work overlaps
+and a full run takes about as long as its slowest chain of stages.
+
+A stage whose dependency failed is skipped rather than run.
+
+Every stage records its timing stages (reportprocessor.timing) under collect(),
+in the worker too; a report run started by a stage begins with the totals of
+all the stages upstream of it.
+"""
+import os
+import time
+import traceback
+from collections import namedtuple
+from functools import partial
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor, FIRST_COMPLETED, wait
+from pathlib import Path
+
+from reportprocessor import timing
+from reportprocessor.logs import print_log
+from reportprocessor.paths import PICKUP_INPUT_DIR, CANCEL_PICKUP_DIR, CACHE_DIR
+
+THREAD = "thread"
+PROCESS = "process"
+
+# name: unique stage name, also the keyword its result is passed under
+# func: callable(**dependency_results); must be a module-level function for PROCESS stages
+# deps: names of the stages that have to finish first
+# executor: THREAD or PROCESS
+Stage = namedtuple("Stage", "name func deps executor")
+
+# stages: the stage's own timing totals, {stage: [seconds, calls]}
+StageResult = namedtuple("StageResult", "name status seconds value error stages")
+
+
+def _timed_call(func, kwargs, inherited=None):
+    """
+    Run func(**kwargs) and return (value, seconds, timing totals); runs inside the worker.
+    inherited is handed to any engine run func starts (see timing.collect()).
+    """
+    start = time.perf_counter()
+    with timing.collect(inherited) as collector:
+        value = func(**kwargs)
+    return value, time.perf_counter() - start, collector.totals()
+
+
+def _upstream(stages, name):
+    """Names of every stage name depends on, directly or through other stages"""
+    seen = set()
+    todo = list(stages[name].deps)
+    while todo:
+        dep = todo.pop()
+        if dep not in seen:
+            seen.add(dep)
+            todo.extend(stages[dep].deps)
+    return seen
+
+
+def _upstream_totals(stages, results, name):
+    """Timing totals of the stages upstream of name, each counted once"""
+    totals = {}
+    for dep in _upstream(stages, name):
+        for stage, (seconds, calls) in results[dep].stages.items():
+            entry = totals.setdefault(stage, [0.0, 0])
+            entry[0] += seconds
+            entry[1] += calls
+    return totals
+
+
+def run_stages(stages, threads=None, processes=None, on_result=None, log=print_log):
+    """
+    Run stages in dependency order, overlapping everything that can overlap.
+    Args:
+        stages: Iterable of Stage
+        threads: Thread pool size; None lets the executor choose
+        processes: Process pool size; None means one per PROCESS stage, capped at the CPU count
+        on_result: Optional callback(StageResult) as each stage finishes or is skipped
+    Returns:
+        dict mapping stage name to StageResult
+    Raises:
+        ValueError for unknown dependencies or a dependency cycle
+    """
+    stages = {stage.name: stage for stage in stages}
+    for stage in stages.values():
+        missing = [dep for dep in stage.deps if dep not in stages]
+        if missing:
+            raise ValueError(f"Stage '{stage.name}' depends on unknown stage(s): {', '.join(missing)}")
+
+    if processes is None:
+        process_stages = sum(1 for stage in stages.values() if stage.executor == PROCESS)
+        processes = max(1, min(process_stages, os.cpu_count() or 1))
+
+    results = {}
+    pending = dict(stages)
+    running = {}
+
+    def finish(result):
+        results[result.name] = result
+        if on_result:
+            on_result(result)
+
+    with ThreadPoolExecutor(max_workers=threads) as thread_pool:
+        process_pool = None
+        try:
+            while pending or running:
+                # Skip stages whose dependencies failed, start the ones that are ready
+                for name, stage in list(pending.items()):
+                    failed = [dep for dep in stage.deps if dep in results and results[dep].status != "ok"]
+                    if failed:
+                        del pending[name]
+                        log(f"Skipping {name}: {', '.join(failed)} did not complete", "WARN")
+                        finish(StageResult(name, "skipped", 0.0, None, f"dependency failed: {', '.join(failed)}", {}))
+                        continue
+                    if all(dep in results for dep in stage.deps):
+                        del pending[name]
+                        kwargs = {dep: results[dep].value for dep in stage.deps}
+                        inherited = _upstream_totals(stages, results, name)
+                        if stage.executor == PROCESS:
+                            if process_pool is None:
+                                process_pool = ProcessPoolExecutor(max_workers=processes)
+                            future = process_pool.submit(_timed_call, stage.func, kwargs, inherited)
+                        else:
+                            future = thread_pool.submit(_timed_call, stage.func, kwargs, inherited)
+                        running[future] = name
+                        log(f"Started {name} ({stage.executor})")
+
+                if not running:
+                    if pending:
+                        raise ValueError(f"Dependency cycle between stages: {', '.join(sorted(pending))}")
+                    break
+
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    name = running.pop(future)
+                    try:
+                        value, seconds, totals = future.result()
+                        finish(StageResult(name, "ok", seconds, value, None, totals))
+                    except Exception as e:
+                        log(f"{name} failed: {e}", "ERROR")
+                        log("".join(traceback.format_exception(e)).rstrip(), "ERROR")
+                        finish(StageResult(name, "failed", 0.0, None, str(e), {}))
+        finally:
+            if process_pool is not None:
+                process_pool.shutdown()
+
+    return results
+
+
+# ---------------------------------------------------------------------------
+# Report stages
+
+
+def parse_manifests(paths, workers=None, cache_dir=CACHE_DIR):
+    """
+    Read every existing Manifest.pdf in paths once (same file content is parsed once).
+    A file that can't be read is logged and left out; the report stages then read it
+    themselves and report the error the usual way.
+    Returns:
+        dict mapping str(path) to its read_manifest_rows() result
+    """
+    from reportprocessor import cache
+    from reportprocessor.manifest import read_manifest_rows
+
+    parsed = {}
+    by_digest = {}
+    for path in paths:
+        path = Path(path)
+        if not path.exists() or str(path) in parsed:
+            continue
+        try:
+            digest = cache.file_digest(path)
+            if digest not in by_digest:
+                by_digest[digest] = read_manifest_rows(path, workers=workers, cache_dir=cache_dir)
+        except Exception as e:
+            print_log(f"Error processing PDF {path}: {e}", "ERROR")
+            continue
+        parsed[str(path)] = by_digest[digest]
+    return parsed
+
+
+def _pickup_manifest():
+    return PICKUP_INPUT_DIR / "Manifest.pdf"
+
+
+def _cancel_manifest():
+    return Path(CANCEL_PICKUP_DIR) / "Manifest.pdf"
+
+
+def build_report_stages(pickup=True, returns=True, cancellation=True, pivot_output=None, returns_mode=None,
+                        cancel_window=None):
+    """
+    Stages for the selected reports.
+    pickup:       manifest_parse -+-> pickup <- pickup_csv, manifest_snapshot
+    cancellation: manifest_parse -+-> cancellation_meesho -+-> cancellation <- cancellation_flipkart
+    returns:      returns
+    pivot_output is passed to the pickup engine ("png", "sheet" or "both"; its PIVOT_OUTPUT when None),
+    returns_mode to the returns engine ("full" or "delta"; its REPORT_MODE when None),
+    cancel_window to the Flipkart cancellation stage (a CancelWindow; today when None).
+    Returns:
+        (stages, names of the stages that produce the report files)
+    """
+    from reportprocessor import pickup as pickup_engine
+    from reportprocessor import returns as returns_engine
+    from reportprocessor import cancellation as cancellation_engine
+
+    stages = []
+    reports = []
+
+    manifests = []
+    if pickup:
+        manifests.append(_pickup_manifest())
+    if cancellation:
+        manifests.append(_cancel_manifest())
+    if manifests:
+        # a thread stage: the parse fans large manifests out to its own page
+        # pool, which must not be nested inside a pool worker
+        parse = partial(parse_manifests, manifests, pickup_engine.PDF_WORKERS)
+        stages.append(Stage("manifest_parse", parse, (), THREAD))
+
+    if pickup:
+        def pickup_csv():
+            return pickup_engine.collect_csv_sources(pivot_output=pivot_output)
+
+        def manifest_snapshot():
+            # Renders alongside manifest_parse; waited for here so its timing is recorded with this stage
+            if not _pickup_manifest().exists():
+                return None
+            snapshot = pickup_engine.start_manifest_snapshot(_pickup_manifest())
+            snapshot.result()
+            return snapshot
+
+        def pickup_report(pickup_csv, manifest_parse, manifest_snapshot):
+            csv_ids, pivot_tables = pickup_csv
+            return pickup_engine.process_pickup(
+                csv_ids=csv_ids, pivot_tables=pivot_tables, pivot_output=pivot_output,
+                manifest_rows=manifest_parse.get(str(_pickup_manifest())), snapshot=manifest_snapshot)
+
+        stages.append(Stage("pickup_csv", pickup_csv, (), THREAD))
+        stages.append(Stage("manifest_snapshot", manifest_snapshot, (), THREAD))
+        stages.append(Stage("pickup", pickup_report, ("pickup_csv", "manifest_parse", "manifest_snapshot"), THREAD))
+        reports.append("pickup")
+
+    if returns:
+        stages.append(Stage("returns", partial(returns_engine.process_returns, report_mode=returns_mode), (), THREAD))
+        reports.append("returns")
+
+    if cancellation:
+        def cancellation_meesho(manifest_parse):
+            return cancellation_engine.process_meesho_data(
+                manifest_rows=manifest_parse.get(str(_cancel_manifest())))
+
+        def cancellation_report(cancellation_meesho, cancellation_flipkart):
+            # The report's timing run; it starts with the Meesho, Flipkart and manifest stages' totals
+            with timing.run("cancellation") as active:
+                combined_df = cancellation_engine.combine_cancelled_data(cancellation_meesho, cancellation_flipkart)
+                active.output = cancellation_engine.report_cancellations(combined_df)
+                return active.output
+
+        stages.append(Stage("cancellation_flipkart", partial(cancellation_engine.process_flipkart_data, window=cancel_window),
+                            (), THREAD))
+        stages.append(Stage("cancellation_meesho", cancellation_meesho, ("manifest_parse",), THREAD))
+        stages.append(Stage("cancellation", cancellation_report, ("cancellation_meesho", "cancellation_flipkart"), THREAD))
+        reports.append("cancellation")
+
+    return stages, reports
@@ -0,0 +1,140 @@
+"""
+Pillow renderer for the pickup pivot images.
+
+Draws the same layout as the matplotlib table: a bold borderless title row, a
+bold "SKU | Count" header and one bordered row per SKU, with the SKU column
+four times as wide as the Count column. Text is measured from per-character
+advances cached per font, so laying out thousands of rows doesn't go back to
+FreeType for every string; the image is grayscale and sized to its content.
+"""
+import threading
+from functools import lru_cache
+from pathlib import Path
+
+from PIL import Image, ImageDraw, ImageFont
+
+# Output resolution and format for the pivot images ("png", "jpeg" or "webp")
+PIVOT_DPI = 150
+PIVOT_FORMAT = "png"
+
+FONT_SIZE_PT = 12
+TITLE_SIZE_PT = 14
+
+FORMAT_SUFFIX = {"png": ".png", "jpeg": ".jpg", "webp": ".webp"}
+SAVE_OPTIONS = {"png": {"compress_level": 1}, "jpeg": {"quality": 90}, "webp": {"quality": 90}}
+
+# Regular and bold fonts to try, in order (DejaVu ships with matplotlib and most Linux installs, Arial with Windows)
+FONT_CANDIDATES = {
+    False: ("DejaVuSans.ttf", "arial.ttf", "LiberationSans-Regular.ttf"),
+    True: ("DejaVuSans-Bold.ttf", "arialbd.ttf", "LiberationSans-Bold.ttf"),
+}
+
+_metrics_lock = threading.Lock()
+
+
+@lru_cache(maxsize=None)
+def load_font(size_px, bold=False):
+    for name in FONT_CANDIDATES[bold]:
+        try:
+            return ImageFont.truetype(name, size_px)
+        except OSError:
+            continue
+    return ImageFont.load_default(size_px)
+
+
+class FontMetrics:
+    """Text widths from cached per-character advances for one font"""
+
+    def __init__(self, font):
+        self.font = font
+        self.advances = {}
+        ascent, descent = font.getmetrics()
+        self.height = ascent + descent
+
+    def width(self, text):
+        advances = self.advances
+        missing = [ch for ch in set(text) if ch not in advances]
+        if missing:
+            with _metrics_lock:
+                for ch in missing:
+                    advances[ch] = self.font.getlength(ch)
+        return sum(advances[ch] for ch in text)
+
+
+@lru_cache(maxsize=None)
+def font_metrics(size_px, bold=False):
+    return FontMetrics(load_font(size_px, bold))
+
+
+def output_path(filename, fmt=None):
+    """filename with the suffix that matches the image format"""
+    fmt = (fmt or PIVOT_FORMAT).lower()
+    return Path(filename).with_suffix(FORMAT_SUFFIX[fmt])
+
+
+def render_pivot_table(title, rows, filename, dpi=None, fmt=None):
+    """
+    Draw title, a "SKU | Count" header and rows into an image file.
+    Args:
+        rows: Sequence of (sku, count) pairs
+        filename: Target path; its suffix is replaced to match fmt
+        dpi: Pixels per inch (PIVOT_DPI when None); fonts are sized in points
+        fmt: "png", "jpeg" or "webp" (PIVOT_FORMAT when None)
+    Returns:
+        Path of the written image
+    """
+    dpi = dpi or PIVOT_DPI
+    fmt = (fmt or PIVOT_FORMAT).lower()
+    if fmt not in FORMAT_SUFFIX:
+        raise ValueError(f"Unsupported pivot image format: {fmt}")
+
+    scale = dpi / 72
+    body = font_metrics(round(FONT_SIZE_PT * scale))
+    bold = font_metrics(round(FONT_SIZE_PT * scale), bold=True)
+    title_font = font_metrics(round(TITLE_SIZE_PT * scale), bold=True)
+
+    pad = round(0.5 * FONT_SIZE_PT * scale)
+    line = max(1, round(0.4 * scale))
+    row_height = round(body.height * 1.6)
+    title_height = round(title_font.height * 2.2)
+
+    cells = [(str(sku), str(count)) for sku, count in rows]
+    sku_width = max([body.width(sku) for sku, _ in cells] + [bold.width("SKU")]) + 2 * pad
+    count_width = max([body.width(count) for _, count in cells] + [bold.width("Count")]) + 2 * pad
+    # Same 0.8 / 0.2 split as the matplotlib table
+    sku_width = max(sku_width, 4 * count_width, title_font.width(title) + 2 * pad - count_width)
+    count_width = max(count_width, sku_width / 4)
+    sku_width, count_width = round(sku_width), round(count_width)
+
+    margin = pad
+    width = 2 * margin + sku_width + count_width
+    height = 2 * margin + title_height + row_height * (len(cells) + 1)
+
+    image = Image.new("L", (width, height), 255)
+    draw = ImageDraw.Draw(image)
+
+    left = margin
+    split = left + sku_width
+    right = split + count_width
+
+    # Title row: no borders
+    draw.text(((left + right) / 2, margin + title_height / 2), title, font=title_font.font, fill=0, anchor="mm")
+
+    top = margin + title_height
+    table = [("SKU", "Count")] + cells
+    for idx, (sku, count) in enumerate(table):
+        y0 = top + idx * row_height
+        y_mid = y0 + row_height / 2
+        metrics = bold if idx == 0 else body
+        draw.text(((left + split) / 2, y_mid), sku, font=metrics.font, fill=0, anchor="mm")
+        draw.text(((split + right) / 2, y_mid), count, font=metrics.font, fill=0, anchor="mm")
+        draw.line([(left, y0), (right, y0)], fill=0, width=line)
+
+    bottom = top + row_height * len(table)
+    draw.line([(left, bottom), (right, bottom)], fill=0, width=line)
+    for x in (left, split, right):
+        draw.line([(x, top), (x, bottom)], fill=0, width=line)
+
+    path = output_path(filename, fmt)
+    image.save(path, format=fmt.upper(), dpi=(dpi, dpi), **SAVE_OPTIONS[fmt])
+    return path
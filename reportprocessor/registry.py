@@ -0,0 +1,130 @@
+"""
+Loading of the GUI module files, and deferred imports of the heavy libraries.
+
+The homepage loads each module file once through ModuleRegistry and reuses it
+on later navigations. The module files reach the engines (and with them pandas,
+openpyxl, pdfplumber, pypdfium2 and Pillow) through LazyModule, so opening
+a screen only costs the GUI imports; the heavy imports happen when processing
+starts, or earlier in the background through prewarm(). matplotlib is only
+imported when the matplotlib pivot renderer is selected, so it isn't prewarmed.
+"""
+import importlib
+import importlib.util
+import os
+import sys
+import threading
+import time
+
+# Imported by prewarm(), heaviest first
+PREWARM_MODULES = (
+    "pandas",
+    "openpyxl",
+    "pdfplumber",
+    "pypdfium2",
+    "PIL.Image",
+    "PIL.ImageDraw",
+    "PIL.ImageFont",
+    "reportprocessor.pickup",
+    "reportprocessor.returns",
+    "reportprocessor.cancellation",
+)
+
+
+class LazyModule:
+    """Stands in for a module and imports it on first attribute access"""
+
+    def __init__(self, name):
+        self._lazy_name = name
+
+    def __getattr__(self, attr):
+        # import_module is a dict lookup once loaded, and takes the import lock while loading
+        return getattr(importlib.import_module(self._lazy_name), attr)
+
+    def __repr__(self):
+        return f"<LazyModule {self._lazy_name!r}>"
+
+
+class ModuleRegistry:
+    """Loads module files once and hands out the cached module on later calls"""
+
+    def __init__(self):
+        self._modules = {}  # absolute path -> (mtime, module)
+        self._lock = threading.Lock()
+        self.load_times = {}  # module name -> seconds taken by the last real load
+
+    def load(self, module_file):
+        """
+        Return the module defined by module_file, executing it only on first use
+        (or after the file changed on disk).
+        Raises:
+            ImportError if no module spec can be built for the file; any error raised by the module itself
+        """
+        path = os.path.abspath(module_file)
+        mtime = os.path.getmtime(path)
+
+        with self._lock:
+            cached = self._modules.get(path)
+            if cached and cached[0] == mtime:
+                return cached[1]
+
+            name = os.path.splitext(os.path.basename(path))[0]
+            spec = importlib.util.spec_from_file_location(name, path)
+            if spec is None:
+                raise ImportError(f"Could not load spec for {module_file}")
+            module = importlib.util.module_from_spec(spec)
+
+            # Add the module's directory to sys.path temporarily
+            original_path = sys.path.copy()
+            module_dir = os.path.dirname(path)
+            if module_dir not in sys.path:
+                sys.path.insert(0, module_dir)
+
+            start = time.perf_counter()
+            try:
+                spec.loader.exec_module(module)
+            finally:
+                # Restore original sys.path
+                sys.path = original_path
+
+            self.load_times[name] = time.perf_counter() - start
+            self._modules[path] = (mtime, module)
+            return module
+
+    def is_loaded(self, module_file):
+        """Whether load() would return the cached module, i.e. the file is unchanged since it was loaded"""
+        path = os.path.abspath(module_file)
+        cached = self._modules.get(path)
+        try:
+            return cached is not None and cached[0] == os.path.getmtime(path)
+        except OSError:
+            return False
+
+
+def prewarm(modules=PREWARM_MODULES):
+    """
+    Import modules so they are ready when processing starts; failures are ignored
+    (the real import reports them later).
+    Returns:
+        dict mapping module name to import seconds (None if the import failed)
+    """
+    timings = {}
+    for name in modules:
+        start = time.perf_counter()
+        try:
+            importlib.import_module(name)
+            timings[name] = time.perf_counter() - start
+        except Exception:
+            timings[name] = None
+    return timings
+
+
+def prewarm_in_background(modules=PREWARM_MODULES, on_done=None):
+    """Run prewarm() on a daemon thread; on_done(timings) is called from that thread"""
+    def run():
+        timings = prewarm(modules)
+        if on_done:
+            on_done(timings)
+
+    thread = threading.Thread(target=run, name="prewarm-imports", daemon=True)
+    thread.start()
+    return thread
@@ -0,0 +1,318 @@
+"""
+Returns reconciliation engine.
+
+Consolidates the Meesho, Flipkart KC/LL and SellerFlex return exports into the
+"Data" sheet of the ReturnsReconcileReport template.
+"""
+import os
+import shutil
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import datetime
+
+import pandas as pd
+from openpyxl import load_workbook
+
+from reportprocessor import timing
+from reportprocessor.ingest import read_source, iter_source
+from reportprocessor.logs import print_log, no_progress
+from reportprocessor.paths import RETURNS_INPUT_DIR, RETURNS_TEMPLATE, RETURNS_OUTPUT_FILE, RETURNS_STORE_FILE
+from reportprocessor.returnstore import ReturnStore, STATUS_CHANGE_HEADER
+from reportprocessor.sources import returns_sources, normalize
+from reportprocessor.xlsxstream import write_rows_into_template, TemplateLayoutError
+
+# "stream" merges rows into the template without loading it; "openpyxl" is the original load/write/save path
+OUTPUT_ENGINE = "stream"
+
+# "frame" loads each export whole and concatenates; "chunked" streams CHUNK_ROWS rows at a time
+# from every export into the output sheet, so memory stays flat however large the exports are;
+# "auto" chunks when any export is larger than CHUNKED_ABOVE_BYTES
+CONSOLIDATION = "auto"
+CHUNK_ROWS = 50_000
+CHUNKED_ABOVE_BYTES = 100 * 1024 * 1024
+
+# Threads loading the exports in frame mode (None = one per source)
+SOURCE_WORKERS = None
+
+# "full" writes every row of the day's exports; "delta" checks them against the return
+# store (RETURNS_STORE_FILE) and writes only new and status-changed returns to "Data",
+# plus a STATUS_SHEET listing the status changes. Both record the day's rows in the store
+REPORT_MODE = "full"
+STATUS_SHEET = "Status Changes"
+
+FINAL_COLUMNS = [
+    "Return TID", "Return Type", "SKU", "Units", "Courier Partner",
+    "Sales Channel", "OID", "Forward TID", "Status of Return at the time of Capture",
+    "Cx Subject", "Cx Comment"
+]
+
+
+def load_source(input_dir, source):
+    """One export read with its schema and normalized to FINAL_COLUMNS"""
+    return normalize(read_source(input_dir / source.file, source.schema), source, FINAL_COLUMNS)
+
+
+def progress_slice(idx, count):
+    """(start, width) of source idx's share of the 0.2 - 1.0 progress range"""
+    width = 0.8 / count
+    return 0.2 + width * idx, width
+
+
+def write_report(final_df, output_excel_path, template_path=RETURNS_TEMPLATE, log=print_log):
+    """Write final_df into the template's "Data" sheet from A2 and stamp today's date in O7/O8"""
+    write_rows(final_df.itertuples(index=False, name=None), output_excel_path, template_path, log)
+
+
+def write_rows(rows, output_excel_path, template_path=RETURNS_TEMPLATE, log=print_log):
+    """write_report() for an iterable of row tuples, consumed once"""
+    today_str = datetime.today().strftime('%d-%m-%Y')
+
+    if OUTPUT_ENGINE == "stream":
+        try:
+            # Template read, cell writes and save happen in one streaming pass
+            with timing.stage(timing.CELL_WRITE):
+                write_rows_into_template(
+                    template_path, output_excel_path, "Data",
+                    rows,
+                    start_row=2,
+                    cells={"O7": today_str, "O8": today_str}
+                )
+            return
+        except TemplateLayoutError as e:
+            log(f"⚠️ Streaming writer can't handle this template ({e}); using openpyxl")
+
+    # Copy template to output location
+    shutil.copy(template_path, output_excel_path)
+
+    # Load workbook and write data
+    with timing.stage(timing.WORKBOOK_LOAD):
+        wb = load_workbook(output_excel_path)
+    ws = wb["Data"]
+
+    # Write rows starting from A2
+    with timing.stage(timing.CELL_WRITE):
+        for row_idx, row in enumerate(rows, start=2):
+            for col_idx, value in enumerate(row, start=1):
+                ws.cell(row=row_idx, column=col_idx, value=value)
+
+    # Add current date to O7 and O8
+    ws["O7"] = today_str
+    ws["O8"] = today_str
+
+    with timing.stage(timing.WORKBOOK_SAVE):
+        wb.save(output_excel_path)
+
+
+def use_chunked(input_dir, sources, consolidation=None):
+    """Whether process_returns should stream the exports in chunks (see CONSOLIDATION)"""
+    consolidation = consolidation or CONSOLIDATION
+    if consolidation != "auto":
+        return consolidation == "chunked"
+    paths = [input_dir / source.file for source in sources]
+    return any(path.exists() and os.path.getsize(path) > CHUNKED_ABOVE_BYTES for path in paths)
+
+
+def chunked_rows(input_dir, sources, log=print_log, progress=no_progress, counts=None):
+    """
+    Yield final-layout row tuples from every export in turn, CHUNK_ROWS rows at a time.
+    A source that fails before yielding any rows is logged and skipped. One that fails
+    part-way can't take back the rows it already yielded, so it fails the whole run.
+    Args:
+        counts: Optional dict filled with label -> rows yielded, per source
+    Raises:
+        Exception if a source fails after some of its rows were yielded
+    """
+    for idx, source in enumerate(sources):
+        label = source.label
+        value, width = progress_slice(idx, len(sources))
+        progress(value, f"Processing {label} data...")
+        log(f"📄 Processing {label} returns data...")
+
+        rows = 0
+        try:
+            for chunk, fraction in iter_source(input_dir / source.file, source.schema, CHUNK_ROWS):
+                yield from normalize(chunk, source, FINAL_COLUMNS).itertuples(index=False, name=None)
+                rows += len(chunk)
+                progress(value + width * fraction, f"Processing {label} data... {rows:,} rows")
+        except Exception as e:
+            if not rows:
+                log(f"❌ Error processing {label} file: {e}")
+                continue
+            if counts is not None:
+                counts[label] = rows
+            raise Exception(f"Error processing {label} file after {rows} records: {e}") from e
+
+        if counts is not None:
+            counts[label] = rows
+        log(f"✅ {label}: {rows} records processed")
+
+
+def write_full_report(rows, output_path, template_path=RETURNS_TEMPLATE, store_path=RETURNS_STORE_FILE,
+                      log=print_log, check_loaded=None):
+    """
+    write_rows() that also records the rows in the return store, CHUNK_ROWS at a time
+    as they are written, so a later delta run compares against full runs too.
+    The store is only updated once the report is saved.
+    Args:
+        check_loaded: Optional callable run after the report is saved; raising from it leaves the store unchanged
+    """
+    with ReturnStore(store_path) as store:
+        batch = []
+
+        def recorded():
+            for row in rows:
+                batch.append(row)
+                if len(batch) >= CHUNK_ROWS:
+                    store.stage(batch)
+                    batch.clear()
+                yield row
+
+        write_rows(recorded(), output_path, template_path, log)
+        store.stage(batch)
+        if check_loaded:
+            check_loaded()
+        store.commit_run()
+        log(f"🗂️ Return store: {store.staged} rows recorded")
+
+
+def write_status_sheet(output_path, rows):
+    """Add (or replace) STATUS_SHEET in the saved report with the store's status changes"""
+    with timing.stage(timing.WORKBOOK_LOAD):
+        wb = load_workbook(output_path)
+    if STATUS_SHEET in wb.sheetnames:
+        del wb[STATUS_SHEET]
+    ws = wb.create_sheet(STATUS_SHEET)
+    with timing.stage(timing.CELL_WRITE):
+        ws.append(STATUS_CHANGE_HEADER)
+        for row in rows:
+            ws.append(list(row))
+    with timing.stage(timing.WORKBOOK_SAVE):
+        wb.save(output_path)
+
+
+def write_delta_report(rows, output_path, template_path=RETURNS_TEMPLATE, store_path=RETURNS_STORE_FILE,
+                       log=print_log, check_loaded=None):
+    """
+    Compare rows with the return store, write the new and status-changed ones to the
+    report plus the status-diff sheet, then record the day's rows in the store.
+    The store is only updated once the report is saved.
+    Args:
+        check_loaded: Optional callable run after rows are consumed; raising from it aborts before anything is written
+    Returns:
+        ReturnStore.diff() counts
+    Raises:
+        Exception if the new, changed and seen rows don't add up to the rows read (the full report's rows)
+    """
+    with ReturnStore(store_path) as store:
+        total = store.stage(rows)
+        if check_loaded:
+            check_loaded()
+        counts = store.diff()
+        log(f"🗂️ Return store: {counts['new']} new, {counts['changed']} status changed, {counts['seen']} already seen")
+        if counts["keyless"]:
+            log(f"⚠️ {counts['keyless']} rows without a Return TID are always reported as new")
+        if counts["duplicates"]:
+            log(f"⚠️ {counts['duplicates']} rows repeat a Return TID already in today's exports; "
+                "each is reported, the store keeps the last")
+        if counts["new"] + counts["changed"] + counts["seen"] != total:
+            raise Exception(f"Return store comparison accounts for {counts['new'] + counts['changed'] + counts['seen']} "
+                            f"of {total} rows; report not written")
+
+        write_rows(store.delta_rows(), output_path, template_path, log)
+        write_status_sheet(output_path, store.status_changes())
+        store.commit_run()
+    return counts
+
+
+@timing.timed_run("returns")
+def process_returns(input_dir=RETURNS_INPUT_DIR, template_path=RETURNS_TEMPLATE, output_path=RETURNS_OUTPUT_FILE,
+                    log=print_log, progress=no_progress, consolidation=None, sources=None, report_mode=None,
+                    store_path=RETURNS_STORE_FILE):
+    """
+    Build the Returns Reconcile Report.
+    A source that fails to load is logged and skipped. In frame mode the exports
+    are loaded concurrently and concatenated in registry order; in chunked mode a
+    source that fails part-way through fails the run (see chunked_rows).
+    Args:
+        consolidation: "frame", "chunked" or "auto"; CONSOLIDATION when None
+        sources: ReturnSource list; the registry's returns sources when None
+        report_mode: "full" or "delta"; REPORT_MODE when None
+        store_path: Return store; delta mode compares against it, both modes record the day's rows
+    Returns:
+        Path of the saved workbook
+    Raises:
+        Exception if no source could be processed, a chunked source fails part-way, or the report can't be written
+    """
+    log("🚀 Starting returns reconciliation process...")
+
+    # Create output directory
+    output_path.parent.mkdir(parents=True, exist_ok=True)
+
+    progress(0.1, "Initializing processing...")
+    sources = sources if sources is not None else returns_sources()
+
+    delta = (report_mode or REPORT_MODE) == "delta"
+
+    if use_chunked(input_dir, sources, consolidation):
+        log(f"📦 Streaming the exports in chunks of {CHUNK_ROWS:,} rows...")
+        counts = {}
+
+        def check_loaded():
+            if not counts:
+                raise Exception("No data was successfully processed from any source")
+
+        rows = chunked_rows(input_dir, sources, log, progress, counts)
+        if delta:
+            write_delta_report(rows, output_path, template_path, store_path, log, check_loaded)
+        else:
+            try:
+                write_full_report(rows, output_path, template_path, store_path, log, check_loaded)
+            except Exception:
+                # Don't leave a partial report behind
+                log(f"❌ Returns report discarded after {sum(counts.values())} records")
+                output_path.unlink(missing_ok=True)
+                raise
+
+        progress(1.0, "✅ Processing completed successfully!")
+        log(f"✅ Total records processed: {sum(counts.values())}")
+        log(f"✅ Output saved to: {output_path}")
+        return output_path
+
+    loaded = {}
+
+    with ThreadPoolExecutor(max_workers=SOURCE_WORKERS or max(1, len(sources))) as pool:
+        futures = {}
+        for idx, source in enumerate(sources):
+            log(f"📄 Processing {source.label} returns data...")
+            futures[pool.submit(timing.bind(load_source), input_dir, source)] = idx
+
+        for done, future in enumerate(as_completed(futures), start=1):
+            idx = futures[future]
+            label = sources[idx].label
+            progress(0.2 + 0.7 * done / len(sources), f"Processed {label} data")
+            try:
+                loaded[idx] = future.result()
+                log(f"✅ {label}: {len(loaded[idx])} records processed")
+            except Exception as e:
+                log(f"❌ Error processing {label} file: {e}")
+
+    # Registry order, whatever order the loads finished in
+    all_data = [loaded[idx] for idx in sorted(loaded)]
+
+    # Combine all data
+    progress(0.9, "Consolidating data and generating report...")
+    log("🔄 Combining all data sources...")
+
+    if not all_data:
+        raise Exception("No data was successfully processed from any source")
+
+    final_df = pd.concat(all_data, ignore_index=True)
+
+    if delta:
+        write_delta_report(final_df.itertuples(index=False, name=None), output_path, template_path, store_path, log)
+    else:
+        write_full_report(final_df.itertuples(index=False, name=None), output_path, template_path, store_path, log)
+
+    progress(1.0, "✅ Processing completed successfully!")
+    log(f"✅ Total records processed: {len(final_df)}")
+    log(f"✅ Output saved to: {output_path}")
+    return output_path
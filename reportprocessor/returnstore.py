@@ -0,0 +1,170 @@
+"""
+Persistent store of every return seen by the Returns report (SQLite).
+
+Each run stages the day's consolidated rows, compares them with the store by
+(Return TID, Sales Channel) and then upserts them. The comparison sorts rows
+into new returns, returns whose status changed and returns already seen with
+the same status, so the report can carry only the rows that need attention.
+
+Every staged row is compared on its own: a Return TID that appears twice in a
+day is checked (and reported) twice, and the store keeps its last row. Rows
+without a Return TID can't be matched from one run to the next; they are always
+reported as new and never stored.
+"""
+import math
+import sqlite3
+from datetime import datetime
+
+# Store columns, in FINAL_COLUMNS order
+COLUMNS = [
+    "return_tid", "return_type", "sku", "units", "courier_partner",
+    "sales_channel", "oid", "forward_tid", "status",
+    "cx_subject", "cx_comment"
+]
+
+STATUS_CHANGE_HEADER = ["Return TID", "Sales Channel", "Previous Status", "Current Status", "First Seen", "Last Seen"]
+
+_SCHEMA = f"""
+CREATE TABLE IF NOT EXISTS returns (
+    tid_key TEXT NOT NULL,
+    channel_key TEXT NOT NULL,
+    {", ".join(COLUMNS)},
+    first_seen TEXT NOT NULL,
+    last_seen TEXT NOT NULL,
+    status_changed TEXT,
+    PRIMARY KEY (tid_key, channel_key)
+) WITHOUT ROWID;
+"""
+
+
+def _key(value):
+    """Text key for an ID cell: 1234.0 and "1234" both become "1234", missing becomes "" """
+    if value is None:
+        return ""
+    if isinstance(value, float):
+        if math.isnan(value):
+            return ""
+        if value.is_integer():
+            return str(int(value))
+    return str(value).strip()
+
+
+def _value(value):
+    """Cell value as sqlite3 can bind it (numpy scalars to Python, NaN to NULL)"""
+    if value is None:
+        return None
+    if hasattr(value, "item"):
+        value = value.item()
+    if isinstance(value, float) and math.isnan(value):
+        return None
+    return value
+
+
+class ReturnStore:
+    """
+    One run against the store:
+        with ReturnStore(path) as store:
+            store.stage(rows)
+            counts = store.diff()
+            ... write store.delta_rows() / store.status_changes() ...
+            store.commit_run()
+    stage() can be called more than once to stage rows in batches. Nothing is
+    changed in the store until commit_run().
+    """
+
+    def __init__(self, path):
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self.path = path
+        self.staged = 0
+        self.conn = sqlite3.connect(str(path))
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.executescript(_SCHEMA)
+        self.conn.execute(f"CREATE TEMP TABLE incoming (seq INTEGER PRIMARY KEY, tid_key TEXT, channel_key TEXT, "
+                          f"{', '.join(COLUMNS)})")
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        self.conn.close()
+
+    def stage(self, rows):
+        """
+        Load the day's rows (FINAL_COLUMNS tuples) into the run, every row kept in order
+        after any rows staged before.
+        Returns:
+            Number of rows read
+        """
+        start = self.staged
+
+        def records():
+            for row in rows:
+                self.staged += 1
+                values = [_value(v) for v in row]
+                yield (self.staged, _key(values[0]), _key(values[5]), *values)
+
+        placeholders = ", ".join("?" * (len(COLUMNS) + 3))
+        self.conn.executemany(f"INSERT INTO incoming VALUES ({placeholders})", records())
+        return self.staged - start
+
+    def diff(self):
+        """
+        Classify the staged rows against the store.
+        Returns:
+            dict with "new", "changed" and "seen" counts (adding up to the staged rows), plus
+            "keyless" (rows without a Return TID, counted as new) and "duplicates" (rows
+            repeating the key of an earlier row that day)
+        """
+        self.conn.execute("DROP TABLE IF EXISTS temp.delta")
+        self.conn.execute("""
+            CREATE TEMP TABLE delta AS
+            SELECT i.*, r.status AS previous_status, r.first_seen AS first_seen,
+                   CASE WHEN r.tid_key IS NULL THEN 'new' ELSE 'changed' END AS kind
+            FROM incoming i LEFT JOIN returns r
+                ON i.tid_key != '' AND r.tid_key = i.tid_key AND r.channel_key = i.channel_key
+            WHERE r.tid_key IS NULL OR r.status IS NOT i.status
+            ORDER BY i.seq
+        """)
+        counts = dict(self.conn.execute("SELECT kind, COUNT(*) FROM delta GROUP BY kind").fetchall())
+        # Counted from the store rather than by difference, so a row lost on the way shows up in the totals
+        seen = self.conn.execute("""
+            SELECT COUNT(*) FROM incoming i JOIN returns r ON r.tid_key = i.tid_key AND r.channel_key = i.channel_key
+            WHERE i.tid_key != '' AND r.status IS i.status
+        """).fetchone()[0]
+        keyless = self.conn.execute("SELECT COUNT(*) FROM incoming WHERE tid_key = ''").fetchone()[0]
+        duplicates = self.conn.execute("""
+            SELECT COALESCE(SUM(n - 1), 0) FROM (
+                SELECT COUNT(*) AS n FROM incoming WHERE tid_key != '' GROUP BY tid_key, channel_key HAVING n > 1)
+        """).fetchone()[0]
+        return {"new": counts.get("new", 0), "changed": counts.get("changed", 0), "seen": seen,
+                "keyless": keyless, "duplicates": duplicates}
+
+    def delta_rows(self):
+        """New and status-changed rows as FINAL_COLUMNS tuples, in staging order"""
+        return self.conn.execute(f"SELECT {', '.join(COLUMNS)} FROM delta ORDER BY rowid")
+
+    def status_changes(self, run_date=None):
+        """Rows for the status-diff sheet (STATUS_CHANGE_HEADER) of the returns whose status changed"""
+        run_date = run_date or datetime.today().strftime('%Y-%m-%d')
+        return self.conn.execute(
+            "SELECT return_tid, sales_channel, previous_status, status, first_seen, ? "
+            "FROM delta WHERE kind = 'changed' ORDER BY rowid", (run_date,))
+
+    def commit_run(self, run_date=None):
+        """Upsert the staged rows into the store: the last row of each Return TID, rows without one left out"""
+        run_date = run_date or datetime.today().strftime('%Y-%m-%d')
+        updates = ", ".join(f"{col} = excluded.{col}" for col in COLUMNS)
+        with self.conn:
+            self.conn.execute(f"""
+                INSERT INTO returns (tid_key, channel_key, {', '.join(COLUMNS)}, first_seen, last_seen, status_changed)
+                SELECT tid_key, channel_key, {', '.join(COLUMNS)}, :day, :day, NULL FROM incoming
+                WHERE seq IN (SELECT MAX(seq) FROM incoming WHERE tid_key != '' GROUP BY tid_key, channel_key)
+                ON CONFLICT (tid_key, channel_key) DO UPDATE SET
+                    status_changed = CASE WHEN returns.status IS NOT excluded.status THEN :day ELSE returns.status_changed END,
+                    {updates},
+                    last_seen = :day
+            """, {"day": run_date})
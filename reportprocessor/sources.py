@@ -0,0 +1,73 @@
+"""
+Registry of the marketplace exports each report reads.
+
+The channels are described in sources.json (next to this module): for Returns
+the file name, header offset, column map, column types and the constant
+columns to add; for Pickup the file, tracking column and pivot columns. A
+sources.json in the application folder replaces the bundled one, so a new
+marketplace is a config entry rather than a code change.
+"""
+import json
+from collections import namedtuple
+from functools import lru_cache
+from pathlib import Path
+
+from reportprocessor.ingest import CsvSchema
+from reportprocessor.paths import SOURCES_OVERRIDE
+
+BUNDLED_SOURCES = Path(__file__).with_name("sources.json")
+
+# label: name used in logs and progress
+# file: export file name in the input folder
+# schema: CsvSchema the export is read with
+# constants: {output column: value} added to every row
+# copies: {output column: column it duplicates}
+ReturnSource = namedtuple("ReturnSource", "label file schema constants copies")
+
+
+def sources_file():
+    return SOURCES_OVERRIDE if SOURCES_OVERRIDE.exists() else BUNDLED_SOURCES
+
+
+@lru_cache(maxsize=None)
+def load_registry(path=None):
+    """Parsed registry file (sources_file() when path is None)"""
+    with open(path or sources_file(), encoding="utf-8") as f:
+        return json.load(f)
+
+
+def returns_sources(path=None):
+    """ReturnSource for every "returns" entry, in processing order"""
+    sources = []
+    for entry in load_registry(path)["returns"]:
+        schema = CsvSchema(
+            columns=entry["columns"],
+            text=tuple(entry.get("text", ())),
+            categories=tuple(entry.get("categories", ())),
+            numeric=tuple(entry.get("numeric", ())),
+            skiprows=entry.get("skiprows", 0),
+        )
+        sources.append(ReturnSource(entry["label"], entry["file"], schema,
+                                    entry.get("constants", {}), entry.get("copies", {})))
+    return sources
+
+
+def pickup_sources(path=None):
+    """The "pickup" entries as {file: {"tracking_column", "source_name", "pivot_columns"}}"""
+    return {
+        entry["file"]: {
+            "tracking_column": entry["tracking_column"],
+            "source_name": entry["source_name"],
+            "pivot_columns": tuple(entry["pivot_columns"]),
+        }
+        for entry in load_registry(path)["pickup"]
+    }
+
+
+def normalize(df, source, columns):
+    """Add source's constant and copied columns to df and return it laid out as columns"""
+    df = df.assign(**source.constants)
+    for target, column in source.copies.items():
+        df[target] = df[column]
+    # Columns the source doesn't provide come out empty
+    return df.reindex(columns=columns)
@@ -0,0 +1,97 @@
+"""
+Sortable, filterable window onto a DataFrame, for the GUI previews.
+
+The view keeps the positions of the rows that pass the filter, in sort order,
+and formats only the rows asked for (the ones on screen), so a preview stays
+responsive however many rows the frame has. Sorting and filtering are
+vectorized pandas/numpy operations over whole columns.
+"""
+import numpy as np
+
+
+class TableView:
+    """
+    view = TableView(df)
+    view.set_filter("flipkart")        # rows containing the text in any column
+    view.sort_by("SKU")                # again to reverse
+    len(view)                          # rows passing the filter
+    view.rows(start, count)            # display strings for one window of them
+    """
+
+    def __init__(self, df):
+        self.df = df.reset_index(drop=True)
+        self.columns = list(self.df.columns)
+        self.sort_column = None
+        self.ascending = True
+        self.filter_text = ""
+        self.filter_column = None
+        self._mask = None
+        self._orders = {}  # (column, ascending) -> row positions in that order
+        self._lower = {}  # column -> lowercased display text, built the first time a filter needs it
+        self.positions = np.arange(len(self.df))
+
+    def __len__(self):
+        return len(self.positions)
+
+    @property
+    def total(self):
+        """Rows in the frame, filtered or not"""
+        return len(self.df)
+
+    def set_filter(self, text, column=None):
+        """Keep the rows whose column (any column when None) contains text, ignoring case; "" clears"""
+        self.filter_text = text.strip()
+        self.filter_column = column
+        needle = self.filter_text.lower()
+        if not needle:
+            self._mask = None
+        else:
+            mask = np.zeros(len(self.df), dtype=bool)
+            for name in ([column] if column is not None else self.columns):
+                mask |= self._lowered(name).str.contains(needle, regex=False).to_numpy(dtype=bool)
+            self._mask = mask
+        self._update()
+
+    def sort_by(self, column, ascending=None):
+        """Sort on column; ascending=None flips the order when it is already the sort column"""
+        if ascending is None:
+            ascending = not self.ascending if column == self.sort_column else True
+        self.sort_column, self.ascending = column, ascending
+        self._update()
+
+    def rows(self, start, count):
+        """Display strings for rows start to start + count of the view (empty cells as "")"""
+        window = self.df.iloc[self.positions[start:start + count]]
+        cells = [_display(window[name]).tolist() for name in self.columns]
+        return list(zip(*cells))
+
+    def _lowered(self, column):
+        if column not in self._lower:
+            self._lower[column] = _display(self.df[column]).str.lower()
+        return self._lower[column]
+
+    def _order(self, column, ascending):
+        key = (column, ascending)
+        if key not in self._orders:
+            values = self.df[column]
+            try:
+                ordered = values.sort_values(ascending=ascending, kind="stable", na_position="last")
+            except TypeError:
+                # Mixed types (numbers and text in one column): sort on the displayed text
+                ordered = _display(values).sort_values(ascending=ascending, kind="stable")
+            self._orders[key] = ordered.index.to_numpy()
+        return self._orders[key]
+
+    def _update(self):
+        if self.sort_column is None:
+            positions = np.arange(len(self.df))
+        else:
+            positions = self._order(self.sort_column, self.ascending)
+        if self._mask is not None:
+            positions = positions[self._mask[positions]]
+        self.positions = positions
+
+
+def _display(series):
+    """series as text, missing values as "" """
+    return series.astype(object).where(series.notna(), "").astype(str)
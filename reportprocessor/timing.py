@@ -0,0 +1,269 @@
+"""
+Per-stage timing for the report engines.
+
+An engine run is wrapped in run() (or decorated with timed_run()); inside it,
+steps are wrapped in stage("csv_read") or decorated with timed("csv_read").
+Each stage adds up its wall time and call count for the run; a stage entered
+with no run active costs next to nothing and records nothing. Work handed to a
+thread pool keeps recording into the run when the callable is wrapped with
+bind().
+
+When the run ends its breakdown is logged and written as JSON next to the
+report, e.g. Output/Pickup_Report_01-01-2025.timing.json:
+    {"run": "pickup", "status": "ok", "seconds": 9.87, "output": "...",
+     "stages": {"csv_read": {"seconds": 1.23, "calls": 4}, ...}, "profile": null}
+Stages that run on several threads at once, or nest (a chunked CSV read inside
+a streamed cell write), can add up to more than the run.
+
+Pipeline stages that feed a report (the manifest parse, the CSV ingest) run
+under collect() instead; the report's run then starts with the stage totals of
+the work it depended on, so its breakdown is complete in every mode.
+
+Set PROFILE to "cprofile" or "pyinstrument" to also profile the run's own
+thread, saved beside the JSON (.prof / .html).
+"""
+import contextvars
+import functools
+import inspect
+import json
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime
+from pathlib import Path
+
+from reportprocessor.logs import print_log
+
+# None, "cprofile" or "pyinstrument" (falls back to cProfile when pyinstrument isn't installed)
+PROFILE = None
+PROFILERS = ("cprofile", "pyinstrument")
+
+# Stage names used by the engines
+CSV_READ = "csv_read"
+PDF_PARSE = "pdf_parse"
+PIVOT_RENDER = "pivot_render"
+WORKBOOK_LOAD = "workbook_load"
+CELL_WRITE = "cell_write"
+WORKBOOK_SAVE = "workbook_save"
+
+_current = contextvars.ContextVar("reportprocessor_run", default=None)
+
+
+class Run:
+    """Stage totals of one engine run; safe to record into from several threads"""
+
+    def __init__(self, name, output=None, detached=False):
+        self.name = name
+        self.output = output
+        self.started = datetime.now()
+        self.seconds = 0.0
+        self.status = "ok"
+        self.error = None
+        self.profile = None
+        self.stages = {}  # stage -> [seconds, calls], in the order first seen
+        # A collect() run: engine runs started inside it still time and report themselves
+        self.detached = detached
+        self.inherited = {}
+        self._lock = threading.Lock()
+
+    def add(self, stage, seconds):
+        with self._lock:
+            totals = self.stages.setdefault(stage, [0.0, 0])
+            totals[0] += seconds
+            totals[1] += 1
+
+    def merge(self, stages):
+        """Add stage totals ({stage: [seconds, calls]}) recorded elsewhere, e.g. in a worker process"""
+        with self._lock:
+            for stage, (seconds, calls) in stages.items():
+                totals = self.stages.setdefault(stage, [0.0, 0])
+                totals[0] += seconds
+                totals[1] += calls
+
+    def totals(self):
+        """Copy of the stage totals, {stage: [seconds, calls]}; picklable"""
+        with self._lock:
+            return {stage: list(totals) for stage, totals in self.stages.items()}
+
+    def report(self):
+        """The run as a JSON-ready dict"""
+        return {
+            "run": self.name,
+            "started": self.started.isoformat(timespec="seconds"),
+            "status": self.status,
+            "error": self.error,
+            "seconds": round(self.seconds, 3),
+            "output": str(self.output) if self.output is not None else None,
+            "stages": {stage: {"seconds": round(seconds, 3), "calls": calls}
+                       for stage, (seconds, calls) in self.stages.items()},
+            "profile": str(self.profile) if self.profile is not None else None,
+        }
+
+    def breakdown(self):
+        """Log lines for the breakdown, slowest stage first"""
+        lines = [f"Stage timings for {self.name} ({self.seconds:.2f} s total):"]
+        for stage, (seconds, calls) in sorted(self.stages.items(), key=lambda item: -item[1][0]):
+            lines.append(f"  {stage:<14} {seconds:8.2f} s  ({calls} call{'s' if calls != 1 else ''})")
+        return lines
+
+
+def current():
+    """The active Run in this context, or None"""
+    return _current.get()
+
+
+def report_path(output):
+    """Where the JSON report for a run writing output goes"""
+    output = Path(output)
+    return output.with_name(f"{output.stem}.timing.json")
+
+
+@contextmanager
+def stage(name):
+    """Add the time spent in the block to stage name of the active run"""
+    active = _current.get()
+    if active is None:
+        yield
+        return
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        active.add(name, time.perf_counter() - start)
+
+
+def timed(name):
+    """Decorator form of stage()"""
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with stage(name):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def bind(func):
+    """func bound to the current context, for thread pools: its stages record into this run"""
+    return functools.partial(contextvars.copy_context().run, func)
+
+
+@contextmanager
+def collect(inherited=None):
+    """
+    Record the stages of a block that is not an engine run itself, e.g. a pipeline stage
+    whose result feeds a report. An engine run started inside still reports itself,
+    starting with inherited (stage totals of the work it depends on) plus whatever the
+    block recorded before it. Yields the collecting Run.
+    """
+    collector = Run(None, detached=True)
+    collector.inherited = inherited or {}
+    token = _current.set(collector)
+    try:
+        yield collector
+    finally:
+        _current.reset(token)
+
+
+@contextmanager
+def run(name, log=print_log, output=None):
+    """
+    Time an engine run. Set the yielded Run's output to the report path once it is known;
+    the JSON report (and profile) are written next to it.
+    Inside an active run this yields that run and records nothing extra.
+    """
+    outer = _current.get()
+    if outer is not None and not outer.detached:
+        yield outer
+        return
+
+    active = Run(name, output)
+    if outer is not None:
+        active.merge(outer.inherited)
+        active.merge(outer.totals())
+    token = _current.set(active)
+    profiler = _start_profiler(log)
+    start = time.perf_counter()
+    try:
+        yield active
+    except BaseException as e:
+        active.status, active.error = "failed", str(e)
+        raise
+    finally:
+        active.seconds = time.perf_counter() - start
+        _current.reset(token)
+        _finish(active, profiler, log)
+
+
+def timed_run(name, output=None):
+    """
+    Decorator form of run() for engine entry points. The function's `log` argument is
+    used for the breakdown; a path it returns becomes the run's output (else output).
+    """
+    def decorator(func):
+        signature = inspect.signature(func)
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            bound = signature.bind(*args, **kwargs)
+            bound.apply_defaults()
+            with run(name, bound.arguments.get("log", print_log), output) as active:
+                result = func(*args, **kwargs)
+                if isinstance(result, (str, Path)):
+                    active.output = result
+                return result
+        return wrapper
+    return decorator
+
+
+def _start_profiler(log):
+    if PROFILE is None:
+        return None
+    if PROFILE == "pyinstrument":
+        try:
+            from pyinstrument import Profiler
+            profiler = Profiler()
+            profiler.start()
+            return profiler
+        except ImportError:
+            log("pyinstrument is not installed; profiling with cProfile instead", "WARN")
+        except RuntimeError as e:
+            log(f"Profiler not started: {e}", "WARN")
+            return None
+
+    import cProfile
+    profiler = cProfile.Profile()
+    try:
+        profiler.enable()
+    except ValueError as e:
+        # Another profiler is already active (e.g. a concurrent run)
+        log(f"Profiler not started: {e}", "WARN")
+        return None
+    return profiler
+
+
+def _finish(active, profiler, log):
+    """Stop the profiler, write the JSON report and profile next to the output, log the breakdown"""
+    if profiler is not None:
+        if hasattr(profiler, "disable"):
+            profiler.disable()
+        else:
+            profiler.stop()
+
+    if active.output is not None:
+        path = report_path(active.output)
+        try:
+            if profiler is not None:
+                if hasattr(profiler, "dump_stats"):
+                    active.profile = path.with_name(f"{Path(active.output).stem}.prof")
+                    profiler.dump_stats(active.profile)
+                else:
+                    active.profile = path.with_name(f"{Path(active.output).stem}.profile.html")
+                    active.profile.write_text(profiler.output_html(), encoding="utf-8")
+            path.parent.mkdir(parents=True, exist_ok=True)
+            path.write_text(json.dumps(active.report(), indent=2), encoding="utf-8")
+        except OSError as e:
+            log(f"Timing report not written: {e}", "WARN")
+
+    for line in active.breakdown():
+        log(line)
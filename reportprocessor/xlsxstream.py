@@ -0,0 +1,238 @@
+"""
+Streaming writer that merges data rows into one sheet of an existing .xlsx template.
+
+The template is never loaded as a workbook. Every part of the package is copied
+unchanged except the target sheet, whose XML is rewritten row by row: template
+rows and cells are kept (values, styles, formulas), data cells are laid over
+them (a missing value leaves the template cell as it is), and the rows are streamed straight into the output zip. Memory use stays
+flat no matter how many rows are written.
+
+Strings are written as inline strings, so the shared-string table is untouched.
+The workbook is flagged for a full recalculation on open, so formulas on other
+sheets pick up the new data.
+"""
+import math
+import re
+import shutil
+import zipfile
+from datetime import date, datetime
+from numbers import Number
+from xml.etree import ElementTree
+from xml.sax.saxutils import escape
+
+NS_MAIN = "http://schemas.openxmlformats.org/spreadsheetml/2006/main"
+NS_REL = "http://schemas.openxmlformats.org/officeDocument/2006/relationships"
+NS_PKG_REL = "http://schemas.openxmlformats.org/package/2006/relationships"
+
+_ROW_RE = re.compile(r"<row\b([^>]*?)(?:/>|>(.*?)</row>)", re.S)
+_CELL_RE = re.compile(r"<c\b([^>]*?)(?:/>|>.*?</c>)", re.S)
+_ATTR_RE = re.compile(r'(\w+)="([^"]*)"')
+_COORD_RE = re.compile(r"([A-Z]+)(\d+)")
+_ILLEGAL_XML_RE = re.compile(r"[\x00-\x08\x0b\x0c\x0e-\x1f]")
+
+
+class TemplateLayoutError(ValueError):
+    """The template sheet uses XML this writer does not handle; use openpyxl instead"""
+
+
+def column_letter(idx):
+    letters = ""
+    while idx:
+        idx, rem = divmod(idx - 1, 26)
+        letters = chr(65 + rem) + letters
+    return letters
+
+
+def column_index(letters):
+    idx = 0
+    for ch in letters:
+        idx = idx * 26 + ord(ch) - 64
+    return idx
+
+
+def _is_missing(value):
+    try:
+        return value is None or value != value
+    except TypeError:
+        # pandas.NA refuses to be used as a bool
+        return True
+
+
+def _is_bool(value):
+    # numpy.bool_ isn't a bool (or a Number); its dtype kind is "b"
+    return isinstance(value, bool) or getattr(getattr(value, "dtype", None), "kind", None) == "b"
+
+
+def _cell_xml(ref, value, style=None):
+    """XML for one cell, or None when the value is missing and the template cell should stay"""
+    style_attr = f' s="{style}"' if style is not None else ""
+    if _is_missing(value) or value == "":
+        return None
+    if _is_bool(value):
+        return f'<c r="{ref}"{style_attr} t="b"><v>{int(value)}</v></c>'
+    if isinstance(value, Number):
+        if isinstance(value, float) and math.isinf(value):
+            return None
+        return f'<c r="{ref}"{style_attr}><v>{value}</v></c>'
+    if isinstance(value, (datetime, date)):
+        value = value.isoformat()
+    text = escape(_ILLEGAL_XML_RE.sub("", str(value)))
+    return f'<c r="{ref}"{style_attr} t="inlineStr"><is><t xml:space="preserve">{text}</t></is></c>'
+
+
+def _sheet_part(zf, sheet_name):
+    """Zip member name of the worksheet called sheet_name"""
+    workbook = ElementTree.fromstring(zf.read("xl/workbook.xml"))
+    rel_id = None
+    for sheet in workbook.iter(f"{{{NS_MAIN}}}sheet"):
+        if sheet.get("name") == sheet_name:
+            rel_id = sheet.get(f"{{{NS_REL}}}id")
+            break
+    if rel_id is None:
+        raise KeyError(f"Sheet '{sheet_name}' not found in template")
+
+    rels = ElementTree.fromstring(zf.read("xl/_rels/workbook.xml.rels"))
+    for rel in rels.iter(f"{{{NS_PKG_REL}}}Relationship"):
+        if rel.get("Id") == rel_id:
+            target = rel.get("Target")
+            return target.lstrip("/") if target.startswith("/") else f"xl/{target}"
+    raise KeyError(f"No relationship for sheet '{sheet_name}'")
+
+
+def _split_sheet(xml):
+    """Split sheet XML into (head, template rows, tail) around <sheetData>"""
+    empty = re.search(r"<sheetData\s*/>", xml)
+    if empty:
+        return xml[:empty.start()] + "<sheetData>", {}, "</sheetData>" + xml[empty.end():]
+
+    start = re.search(r"<sheetData\b[^>]*>", xml)
+    end = xml.rfind("</sheetData>")
+    if not start or end < 0:
+        raise TemplateLayoutError("Sheet XML has no <sheetData> element")
+
+    rows = {}
+    for row_match in _ROW_RE.finditer(xml, start.end(), end):
+        attrs = dict(_ATTR_RE.findall(row_match.group(1)))
+        if "r" not in attrs:
+            raise TemplateLayoutError("Template rows without explicit row numbers are not supported")
+        attrs.pop("spans", None)
+        cells = {}
+        for cell_match in _CELL_RE.finditer(row_match.group(2) or ""):
+            cell_attrs = dict(_ATTR_RE.findall(cell_match.group(1)))
+            coord = _COORD_RE.fullmatch(cell_attrs.get("r", ""))
+            if not coord:
+                raise TemplateLayoutError("Template cells without explicit references are not supported")
+            cells[column_index(coord.group(1))] = (cell_match.group(0), cell_attrs.get("s"))
+        rows[int(attrs["r"])] = (attrs, cells)
+    return xml[:start.end()], rows, xml[end:]
+
+
+def _row_xml(row_num, attrs, cells):
+    attr_text = "".join(f' {key}="{value}"' for key, value in attrs.items() if key != "r")
+    body = "".join(xml for _, xml in sorted(cells.items()) if xml)
+    if not body and not attr_text:
+        return ""
+    return f'<row r="{row_num}"{attr_text}>{body}</row>'
+
+
+def _stream_rows(template_rows, data_rows, start_row, overrides):
+    """Yield row XML: template rows in order, with data rows and overrides laid over them"""
+    pending = sorted(set(template_rows) | {row for row, _ in overrides})
+
+    def merged(row_num, data):
+        attrs, cells = template_rows.get(row_num, ({}, {}))
+        row_cells = {col: xml for col, (xml, _) in cells.items()}
+
+        def lay(col, value):
+            style = cells[col][1] if col in cells else None
+            xml = _cell_xml(f"{column_letter(col)}{row_num}", value, style)
+            if xml is not None:
+                row_cells[col] = xml
+
+        if data is not None:
+            for col, value in enumerate(data, start=1):
+                lay(col, value)
+        for (o_row, col), value in overrides.items():
+            if o_row == row_num:
+                lay(col, value)
+        return _row_xml(row_num, attrs, row_cells)
+
+    idx = 0
+    for row_num, data in enumerate(data_rows, start=start_row):
+        while idx < len(pending) and pending[idx] < row_num:
+            yield merged(pending[idx], None)
+            idx += 1
+        if idx < len(pending) and pending[idx] == row_num:
+            idx += 1
+        yield merged(row_num, data)
+    for pending_row in pending[idx:]:
+        yield merged(pending_row, None)
+
+
+def _set_full_calc_on_load(workbook_xml):
+    if "<calcPr" in workbook_xml:
+        if "fullCalcOnLoad" in workbook_xml:
+            return re.sub(r'fullCalcOnLoad="[^"]*"', 'fullCalcOnLoad="1"', workbook_xml)
+        return workbook_xml.replace("<calcPr", '<calcPr fullCalcOnLoad="1"', 1)
+    # calcPr has to come before these elements in the workbook schema
+    follower = re.search(r"<(oleSize|customWorkbookViews|pivotCaches|smartTagPr|smartTagTypes|webPublishing"
+                         r"|fileRecoveryPr|webPublishObjects|extLst)\b|</workbook>", workbook_xml)
+    return workbook_xml[:follower.start()] + '<calcPr fullCalcOnLoad="1"/>' + workbook_xml[follower.start():]
+
+
+def write_rows_into_template(template_path, output_path, sheet_name, data_rows, start_row=2, cells=None):
+    """
+    Copy template_path to output_path with data_rows streamed into sheet_name.
+    Args:
+        data_rows: Iterable of row sequences; row i lands at start_row + i from column A
+        start_row: First row that receives data (row 1 is normally the template header)
+        cells: Optional dict of "O7"-style coordinate -> value written on top of everything
+    Returns:
+        Number of data rows written
+    """
+    overrides = {}
+    for coord, value in (cells or {}).items():
+        match = _COORD_RE.fullmatch(coord)
+        overrides[(int(match.group(2)), column_index(match.group(1)))] = value
+
+    counter = {"rows": 0}
+
+    def counted(rows):
+        for row in rows:
+            counter["rows"] += 1
+            yield row
+
+    with zipfile.ZipFile(template_path) as src:
+        sheet_part = _sheet_part(src, sheet_name)
+        head, template_rows, tail = _split_sheet(src.read(sheet_part).decode("utf-8"))
+        # The row count isn't known up front; the dimension element is optional
+        head = re.sub(r"<dimension\b[^>]*/>", "", head, count=1)
+
+        with zipfile.ZipFile(output_path, "w", zipfile.ZIP_DEFLATED) as dst:
+            for item in src.infolist():
+                name = item.filename
+                if name == "xl/calcChain.xml":
+                    # Excel rebuilds the calculation chain; a stale one triggers repair prompts
+                    continue
+                if name == sheet_part:
+                    with dst.open(name, "w", force_zip64=True) as out:
+                        out.write(head.encode("utf-8"))
+                        for row_xml in _stream_rows(template_rows, counted(data_rows), start_row, overrides):
+                            if row_xml:
+                                out.write(row_xml.encode("utf-8"))
+                        out.write(tail.encode("utf-8"))
+                elif name == "xl/workbook.xml":
+                    dst.writestr(item, _set_full_calc_on_load(src.read(name).decode("utf-8")))
+                elif name == "[Content_Types].xml":
+                    content_types = src.read(name).decode("utf-8")
+                    content_types = re.sub(r'<Override[^>]*PartName="/xl/calcChain.xml"[^>]*/>', "", content_types)
+                    dst.writestr(item, content_types)
+                elif name == "xl/_rels/workbook.xml.rels":
+                    rels = src.read(name).decode("utf-8")
+                    rels = re.sub(r'<Relationship[^>]*Target="[^"]*calcChain.xml"[^>]*/>', "", rels)
+                    dst.writestr(item, rels)
+                else:
+                    with src.open(item) as data, dst.open(item, "w") as out:
+                        shutil.copyfileobj(data, out)
+
+    return counter["rows"]